@@ -0,0 +1,11 @@
+"""
+公共渲染模块
+贪吃蛇、格斗游戏和启动器共享的渲染缓存、字体和数据存储
+"""
+
+from .font_registry import FontRegistry, font_registry
+from .sprite_atlas import SpriteAtlas, sprite_atlas
+from .stats_store import StatsStore
+from .text_cache import TextCache, text_cache
+
+__all__ = ['FontRegistry', 'font_registry', 'SpriteAtlas', 'sprite_atlas', 'StatsStore', 'TextCache', 'text_cache']
@@ -0,0 +1,120 @@
+"""
+字体注册表
+只查找一次支持中文的字体，并共享各字号的 Font 对象
+"""
+
+import json
+import os
+import pygame
+from typing import Dict, List, Optional
+
+# 候选字体文件（直接检查路径，不需要查询系统字体表）
+CJK_FONT_PATHS = [
+    "C:\\Windows\\Fonts\\simhei.ttf",
+    "C:\\Windows\\Fonts\\msyh.ttc",
+    "C:\\Windows\\Fonts\\msyh.ttf",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/System/Library/Fonts/STHeiti Medium.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/usr/share/fonts/wenquanyi/wqy-microhei/wqy-microhei.ttc",
+]
+
+# 候选字体名（交给 pygame.font.match_font 查询系统字体表）
+CJK_FONT_NAMES = [
+    "simhei",
+    "microsoftyahei",
+    "pingfangsc",
+    "notosanscjksc",
+    "notosanscjk",
+    "wenquanyimicrohei",
+    "wenquanyizenhei",
+    "droidsansfallback",
+]
+
+class FontRegistry:
+    """字体注册表
+
+    第一次需要字体时按候选路径、候选字体名的顺序查找中文字体，
+    结果写入磁盘缓存，下次启动直接读取，不再调用 match_font
+    （Linux 上它会调用 fontconfig，非常慢）。同一字号的 Font 对象
+    只创建一次，所有调用方共享；找不到中文字体时退回默认字体。
+    """
+
+    def __init__(self, cache_file: str = 'font_cache.json',
+                 paths: Optional[List[str]] = None,
+                 names: Optional[List[str]] = None):
+        self.cache_file = cache_file
+        self.paths = list(CJK_FONT_PATHS if paths is None else paths)
+        self.names = list(CJK_FONT_NAMES if names is None else names)
+        self._path = None
+        self._resolved = False
+        self._fonts: Dict[int, pygame.font.Font] = {}
+
+    def _candidates(self) -> List[str]:
+        """全部候选（候选变化后磁盘缓存失效）"""
+        return self.paths + self.names
+
+    def _load_cache(self) -> bool:
+        """读取磁盘缓存，缓存有效时返回True"""
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if not isinstance(data, dict) or data.get('candidates') != self._candidates():
+            return False
+        path = data.get('path')
+        if path is not None and not os.path.exists(path):
+            return False
+        self._path = path
+        return True
+
+    def _save_cache(self):
+        """写入磁盘缓存"""
+        try:
+            with open(self.cache_file, 'w') as f:
+                json.dump({'candidates': self._candidates(), 'path': self._path}, f)
+        except OSError:
+            pass  # 忽略保存错误
+
+    def _discover(self) -> Optional[str]:
+        """查找支持中文的字体文件"""
+        for path in self.paths:
+            if os.path.exists(path):
+                return path
+        try:
+            return pygame.font.match_font(self.names)
+        except Exception:
+            return None
+
+    def resolve(self) -> Optional[str]:
+        """中文字体路径（没有时返回None）"""
+        if not self._resolved:
+            if not self._load_cache():
+                self._path = self._discover()
+                self._save_cache()
+            self._resolved = True
+        return self._path
+
+    def get(self, size: int) -> pygame.font.Font:
+        """获取指定字号的共享字体"""
+        font = self._fonts.get(size)
+        if font is None:
+            path = self.resolve()
+            try:
+                font = pygame.font.Font(path, size)
+            except (pygame.error, OSError):
+                font = pygame.font.Font(None, size)
+            self._fonts[size] = font
+        return font
+
+    def clear(self):
+        """丢弃已创建的字体（pygame.font 重新初始化后调用）"""
+        self._fonts.clear()
+
+# 全局共享字体注册表
+font_registry = FontRegistry()
@@ -0,0 +1,91 @@
+"""
+半透明精灵图集
+"""
+
+import pygame
+from collections import OrderedDict
+from typing import Tuple, Union
+
+class SpriteAtlas:
+    """半透明精灵图集
+
+    按 (形状, 尺寸, 颜色, 量化透明度, 圆角) 缓存预渲染的 SRCALPHA 精灵，
+    超出容量时淘汰最久未使用的精灵。热路径直接 blit 缓存中的精灵，
+    不再每帧创建临时表面。
+    """
+
+    def __init__(self, max_sprites: int = 2048, alpha_step: int = 5):
+        self.max_sprites = max_sprites
+        self.alpha_step = alpha_step
+        self._sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        # 透明度量化查找表
+        self._alpha_table = [self._quantize(alpha) for alpha in range(256)]
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    def _quantize(self, alpha: int) -> int:
+        """把透明度量化到 alpha_step 的整数倍（可见的不会变为全透明）"""
+        quantized = min(255, round(alpha / self.alpha_step) * self.alpha_step)
+        if alpha and not quantized:
+            quantized = self.alpha_step
+        return quantized
+
+    def quantize_alpha(self, alpha: int) -> int:
+        """量化透明度"""
+        return self._alpha_table[max(0, min(255, int(alpha)))]
+
+    def get(self, shape: str, size: Union[int, Tuple[int, int]],
+            color: Tuple[int, int, int], alpha: int,
+            border_radius: int = 0, quantize: bool = True) -> pygame.Surface:
+        """获取精灵
+
+        shape 为 'circle'（size 为半径）、'ellipse' 或 'rect'（size 为宽高）。
+        调用方已经自行量化透明度时传 quantize=False，避免二次量化。
+        """
+        if alpha.__class__ is not int or not 0 <= alpha <= 255:
+            alpha = max(0, min(255, int(alpha)))
+        if quantize:
+            alpha = self._alpha_table[alpha]
+        if color.__class__ is not tuple or len(color) != 3:
+            color = tuple(color[:3])
+        key = (shape, size, color, alpha, border_radius)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self._sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        sprite = self._render(shape, size, color, alpha, border_radius)
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.max_sprites:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def _render(self, shape: str, size, color: Tuple[int, int, int], alpha: int,
+                border_radius: int) -> pygame.Surface:
+        """预渲染一个精灵"""
+        if shape == 'circle':
+            sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, (*color, alpha), (size, size), size)
+        elif shape == 'ellipse':
+            sprite = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.ellipse(sprite, (*color, alpha), (0, 0, size[0], size[1]))
+        elif shape == 'rect':
+            sprite = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(sprite, (*color, alpha), (0, 0, size[0], size[1]),
+                             border_radius=border_radius)
+        else:
+            raise ValueError(f"未知的精灵形状: {shape}")
+        return sprite
+
+    def clear(self):
+        """清空图集"""
+        self._sprites.clear()
+
+# 全局共享图集
+sprite_atlas = SpriteAtlas()
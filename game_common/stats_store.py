@@ -0,0 +1,207 @@
+"""
+统计数据存储
+内存中批量修改，后台线程原子写入快照，追加式日志用于崩溃恢复
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+class StatsStore:
+    """统计数据存储
+
+    调用方直接修改 data 字典，在需要持久化时调用 commit()：与上次提交
+    相比变化的键以绝对值的形式追加到日志（一行一个JSON对象，只是一次
+    很小的追加写），然后由后台线程等待 delay 秒合并突发的多次提交，
+    再写临时文件、fsync、os.replace 原子替换快照，最后截掉已经写进
+    快照的日志。
+
+    日志记录的是绝对值而不是增量，所以即使在替换快照之后、截断日志
+    之前崩溃，重放旧日志也只会得到和快照相同的值。加载时先读快照再按
+    顺序重放日志，崩溃时写了一半的最后一行会被丢弃。
+    """
+
+    def __init__(self, path: str, defaults: Optional[Dict[str, Any]] = None,
+                 delay: float = 0.5):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.delay = delay
+        self.data = dict(defaults or {})
+
+        self._committed = {}
+        self._journal_size = 0
+        self._version = 0
+        self._written = 0
+        self._closed = False
+        self._thread = None
+        self._cond = threading.Condition()
+
+    def load(self) -> Dict[str, Any]:
+        """读取快照并重放日志，返回 data"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if isinstance(snapshot, dict):
+                self.data.update(snapshot)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"统计数据读取失败，使用默认值: {e}")
+
+        replayed = self._replay_journal()
+        self._committed = dict(self.data)
+
+        # 有日志说明上次没来得及写快照，后台补写一次
+        if replayed:
+            with self._cond:
+                self._version += 1
+                self._cond.notify()
+            self._start()
+        return self.data
+
+    def _replay_journal(self) -> int:
+        """按顺序重放日志，丢弃写了一半的尾部，返回重放的条数"""
+        try:
+            with open(self.journal_path, 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            print(f"统计日志读取失败: {e}")
+            return 0
+
+        valid = 0
+        count = 0
+        for line in content.splitlines(keepends=True):
+            if not line.endswith(b'\n'):
+                break
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            if isinstance(entry, dict):
+                self.data.update(entry)
+                count += 1
+            valid += len(line)
+
+        # 截掉损坏的尾部，后续追加的日志才能正常解析
+        if valid < len(content):
+            try:
+                os.truncate(self.journal_path, valid)
+            except OSError as e:
+                print(f"统计日志修复失败: {e}")
+        self._journal_size = valid
+        return count
+
+    def commit(self):
+        """提交 data 中的修改：写日志并安排后台写快照"""
+        changes = {key: value for key, value in self.data.items()
+                   if key not in self._committed or self._committed[key] != value}
+        if not changes:
+            return
+
+        line = (json.dumps(changes, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._cond:
+            try:
+                with open(self.journal_path, 'ab') as f:
+                    f.write(line)
+                self._journal_size += len(line)
+            except OSError as e:
+                print(f"统计日志写入失败: {e}")
+            # 通过JSON复制一份，之后调用方再修改 data 不会影响待写的快照
+            self._committed.update(json.loads(line))
+            self._version += 1
+            self._cond.notify()
+        self._start()
+
+    def _start(self):
+        """按需启动后台写入线程"""
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(target=self._writer, name='stats-writer', daemon=True)
+            self._thread.start()
+
+    def _writer(self):
+        """后台写入线程：合并突发提交后写快照"""
+        while True:
+            with self._cond:
+                while not self._closed and self._version == self._written:
+                    self._cond.wait()
+                if self._version == self._written:
+                    return
+
+                # 合并突发：等待 delay 秒内的后续提交（关闭时立即写）
+                deadline = time.monotonic() + self.delay
+                while not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        """原子写入快照，然后截掉已写入快照的日志"""
+        with self._cond:
+            snapshot = dict(self._committed)
+            version = self._version
+            mark = self._journal_size
+
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            # 日志里仍有这些修改，下次启动时可以恢复
+            print(f"统计数据保存失败: {e}")
+            with self._cond:
+                self._written = version
+                self._cond.notify_all()
+            return
+
+        with self._cond:
+            self._compact_journal(mark)
+            self._written = version
+            self._cond.notify_all()
+
+    def _compact_journal(self, mark: int):
+        """删除日志前 mark 字节（已经写入快照），保留之后追加的部分"""
+        try:
+            if self._journal_size == mark:
+                if os.path.exists(self.journal_path):
+                    os.remove(self.journal_path)
+                self._journal_size = 0
+                return
+
+            with open(self.journal_path, 'rb') as f:
+                f.seek(mark)
+                tail = f.read()
+            temp_path = self.journal_path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(tail)
+            os.replace(temp_path, self.journal_path)
+            self._journal_size = len(tail)
+        except OSError as e:
+            print(f"统计日志整理失败: {e}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待所有已提交的修改写入快照，返回是否在超时前完成"""
+        with self._cond:
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._version == self._written, timeout)
+
+    def close(self):
+        """提交剩余修改，立即写入快照并停止后台线程"""
+        self.commit()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._version != self._written:
+            self._write_snapshot()
@@ -0,0 +1,53 @@
+"""
+文字表面缓存
+"""
+
+import pygame
+from collections import OrderedDict
+from typing import Tuple
+
+class TextCache:
+    """文字表面缓存
+
+    按 (字体, 文字, 颜色, 抗锯齿) 缓存 font.render 的结果，超出容量时
+    淘汰最久未使用的表面。HUD和菜单上的文字大多每帧都一样，命中缓存
+    就省掉了字形光栅化（中文字体尤其慢）。返回的表面是共享的，
+    调用方不能修改它（例如 set_alpha），需要修改时自行 copy()。
+    """
+
+    def __init__(self, max_surfaces: int = 512):
+        self.max_surfaces = max_surfaces
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def render(self, font: pygame.font.Font, text: str, color: Tuple[int, ...],
+               antialias: bool = True) -> pygame.Surface:
+        """渲染文字（带缓存）"""
+        if color.__class__ is not tuple:
+            color = tuple(color)
+        key = (id(font), text, color, antialias)
+        entry = self._surfaces.get(key)
+        # 缓存中保存字体引用，保证 id 不会被新字体复用
+        if entry is not None and entry[0] is font:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = (font, surface)
+        self._surfaces.move_to_end(key)
+        if len(self._surfaces) > self.max_surfaces:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """清空缓存"""
+        self._surfaces.clear()
+
+# 全局共享文字缓存
+text_cache = TextCache()
@@ -11,6 +11,9 @@ import sys
 import os
 from typing import Tuple
 
+from game_common.sprite_atlas import sprite_atlas
+from game_common.text_cache import text_cache
+
 class GameCard:
     """游戏卡片类"""
     def __init__(self, x: int, y: int, width: int, height: int, 
@@ -56,11 +59,8 @@ class GameCard:
             glow_alpha = int(self.glow_intensity * 50)
             for i in range(glow_size):
                 glow_rect = scaled_rect.inflate(i * 4, i * 4)
-                glow_surface = pygame.Surface(glow_rect.size, pygame.SRCALPHA)
-                glow_color = (*self.colors['accent'], max(0, glow_alpha - i * 5))
-                pygame.draw.rect(glow_surface, glow_color, 
-                               (0, 0, glow_rect.width, glow_rect.height), 
-                               border_radius=15)
+                glow_surface = sprite_atlas.get('rect', glow_rect.size, self.colors['accent'],
+                                                max(0, glow_alpha - i * 5), border_radius=15)
                 screen.blit(glow_surface, glow_rect.topleft)
         
         # 卡片背景
@@ -75,14 +75,14 @@ class GameCard:
         self.draw_icon(screen, scaled_rect)
         
         # 标题
-        title_surface = font_title.render(self.title, True, self.colors['text_primary'])
+        title_surface = text_cache.render(font_title, self.title, self.colors['text_primary'])
         title_rect = title_surface.get_rect()
         title_rect.centerx = scaled_rect.centerx
         title_rect.y = scaled_rect.y + scaled_rect.height * 0.6
         screen.blit(title_surface, title_rect)
         
         # 描述
-        desc_surface = font_desc.render(self.description, True, self.colors['text_secondary'])
+        desc_surface = text_cache.render(font_desc, self.description, self.colors['text_secondary'])
         desc_rect = desc_surface.get_rect()
         desc_rect.centerx = scaled_rect.centerx
         desc_rect.y = title_rect.bottom + 10
@@ -90,7 +90,7 @@ class GameCard:
         
         # 悬停时显示启动提示
         if self.hover:
-            hint_surface = font_desc.render("点击启动游戏", True, self.colors['accent_hover'])
+            hint_surface = text_cache.render(font_desc, "点击启动游戏", self.colors['accent_hover'])
             hint_rect = hint_surface.get_rect()
             hint_rect.centerx = scaled_rect.centerx
             hint_rect.y = desc_rect.bottom + 15
@@ -7,6 +7,9 @@ import sys
 import random
 from typing import List
 
+from game_common.font_registry import font_registry
+from game_common.text_cache import text_cache
+
 from .particle_effects import Particle
 from .game_card import GameCard
 
@@ -39,20 +42,13 @@ class GameLauncher:
         pygame.display.set_caption("🎮 游戏盒子 - Game Launcher")
         self.clock = pygame.time.Clock()
 
-        # 字体设置
-        try:
-            # 尝试加载中文字体
-            font_path = "C:\\Windows\\Fonts\\simhei.ttf"
-            self.font_title = pygame.font.Font(font_path, 48)
-            self.font_large = pygame.font.Font(font_path, 36)
-            self.font_medium = pygame.font.Font(font_path, 24)
-            self.font_small = pygame.font.Font(font_path, 18)
-        except:
+        # 字体设置（由字体注册表统一查找和共享中文字体）
+        if not font_registry.resolve():
             print("无法加载中文字体，使用默认字体")
-            self.font_title = pygame.font.Font(None, 48)
-            self.font_large = pygame.font.Font(None, 36)
-            self.font_medium = pygame.font.Font(None, 24)
-            self.font_small = pygame.font.Font(None, 18)
+        self.font_title = font_registry.get(48)
+        self.font_large = font_registry.get(36)
+        self.font_medium = font_registry.get(24)
+        self.font_small = font_registry.get(18)
 
         # 粒子系统
         self.particles: List[Particle] = []
@@ -134,15 +130,15 @@ class GameLauncher:
         """绘制标题"""
         # 主标题
         title_text = "游戏盒子"
-        title_surface = self.font_title.render(title_text, True, COLORS['text_primary'])
+        title_surface = text_cache.render(self.font_title, title_text, COLORS['text_primary'])
         title_rect = title_surface.get_rect()
         title_rect.centerx = WINDOW_WIDTH // 2
         title_rect.y = 50
 
         # 标题发光效果
         for i in range(3):
-            glow_surface = self.font_title.render(title_text, True,
-                                                (*COLORS['accent'], 100 - i * 30))
+            glow_surface = text_cache.render(self.font_title, title_text,
+                                             (*COLORS['accent'], 100 - i * 30))
             glow_rect = title_rect.copy()
             glow_rect.x += i - 1
             glow_rect.y += i - 1
@@ -152,7 +148,7 @@ class GameLauncher:
 
         # 副标题
         subtitle_text = "选择你想要游玩的游戏"
-        subtitle_surface = self.font_medium.render(subtitle_text, True, COLORS['text_secondary'])
+        subtitle_surface = text_cache.render(self.font_medium, subtitle_text, COLORS['text_secondary'])
         subtitle_rect = subtitle_surface.get_rect()
         subtitle_rect.centerx = WINDOW_WIDTH // 2
         subtitle_rect.y = title_rect.bottom + 20
@@ -167,7 +163,7 @@ class GameLauncher:
 
         y_offset = WINDOW_HEIGHT - 80
         for text in footer_texts:
-            surface = self.font_small.render(text, True, COLORS['text_secondary'])
+            surface = text_cache.render(self.font_small, text, COLORS['text_secondary'])
             rect = surface.get_rect()
             rect.centerx = WINDOW_WIDTH // 2
             rect.y = y_offset
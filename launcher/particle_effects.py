@@ -6,6 +6,8 @@ import pygame
 import random
 from typing import Tuple
 
+from game_common.sprite_atlas import sprite_atlas
+
 class Particle:
     """粒子效果类"""
     def __init__(self, x: float, y: float):
@@ -25,10 +27,8 @@ class Particle:
     def draw(self, screen: pygame.Surface, particle_color: Tuple[int, int, int]):
         if self.life > 0:
             alpha = int((self.life / self.max_life) * 100)
-            color = (*particle_color, alpha)
             size = max(1, int(self.size * (self.life / self.max_life)))
             
-            # 创建临时表面用于透明度
-            temp_surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(temp_surface, color, (size, size), size)
-            screen.blit(temp_surface, (int(self.x - size), int(self.y - size)))
+            # 从共享图集取半透明精灵
+            sprite = sprite_atlas.get('circle', size, particle_color, alpha)
+            screen.blit(sprite, (int(self.x - size), int(self.y - size)))
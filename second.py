@@ -4,6 +4,9 @@ import random
 import numpy as np 
 import emoji
 
+from game_common.font_registry import font_registry
+from game_common.text_cache import text_cache
+
 # 游戏常量
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -460,26 +463,12 @@ def play_sound(name):
     if name in LOADED_SOUNDS and LOADED_SOUNDS[name]:
         LOADED_SOUNDS[name].play()
 
-# 字体
-try:
-    font_path_simhei = pygame.font.match_font("simhei") # 尝试查找SimHei
-    if font_path_simhei:
-        font = pygame.font.Font(font_path_simhei, 30)
-        print(f"成功加载 SimHei 字体: {font_path_simhei}")
-    else:
-        raise pygame.error("SimHei not found by match_font")
-except pygame.error:
-    try:
-        # 尝试其他常见中文字体 for Windows
-        font_path_msyh = pygame.font.match_font("microsoftyahei")
-        if font_path_msyh:
-            font = pygame.font.Font(font_path_msyh, 30)
-            print(f"成功加载 Microsoft YaHei 字体: {font_path_msyh}")
-        else:
-            raise pygame.error("Microsoft YaHei not found")
-    except pygame.error:
-        font = pygame.font.Font(None, 30) # 备用字体
-        print("警告: 未找到 SimHei 或 Microsoft YaHei 字体，使用默认字体。中文字符可能无法正确显示。")
+# 字体（中文字体只查找一次，结果缓存在磁盘上）
+font = font_registry.get(30)
+if font_registry.resolve():
+    print(f"成功加载中文字体: {font_registry.resolve()}")
+else:
+    print("警告: 未找到中文字体，使用默认字体。中文字符可能无法正确显示。")
 
 
 class Stickman(pygame.sprite.Sprite):
@@ -1448,12 +1437,12 @@ def draw_health_bars(player1, player2, game_mode="vs_ai"):
     pygame.draw.rect(screen, (50, 50, 50), (30, 55, bar_width, energy_bar_height))
     pygame.draw.rect(screen, BLUE, (30, 55, bar_width * energy_ratio_p1, energy_bar_height))
     
-    p1_text = font.render(f"P1: {int(player1.health)}/{player1.max_health}", True, WHITE)
+    p1_text = text_cache.render(font, f"P1: {int(player1.health)}/{player1.max_health}", WHITE)
     screen.blit(p1_text, (30, 5))
     
     # 显示连击数
     if hasattr(player1, 'combo_count') and player1.combo_count > 1:
-        combo_text = font.render(f"连击: {player1.combo_count}", True, YELLOW)
+        combo_text = text_cache.render(font, f"连击: {player1.combo_count}", YELLOW)
         screen.blit(combo_text, (30, 70))
 
     # 玩家2/AI状态栏 (右上角)
@@ -1468,12 +1457,12 @@ def draw_health_bars(player1, player2, game_mode="vs_ai"):
     pygame.draw.rect(screen, BLUE, (SCREEN_WIDTH - bar_width - 30, 55, bar_width * energy_ratio_p2, energy_bar_height))
     
     p2_label = "AI" if game_mode == "vs_ai" else "P2"
-    p2_text = font.render(f"{p2_label}: {int(player2.health)}/{player2.max_health}", True, WHITE)
+    p2_text = text_cache.render(font, f"{p2_label}: {int(player2.health)}/{player2.max_health}", WHITE)
     screen.blit(p2_text, (SCREEN_WIDTH - bar_width - 30, 5))
     
     # 显示AI状态（仅AI模式）
     if game_mode == "vs_ai" and hasattr(player2, 'ai_state'):
-        ai_state_text = font.render(f"AI: {player2.ai_state}", True, CYAN)
+        ai_state_text = text_cache.render(font, f"AI: {player2.ai_state}", CYAN)
         screen.blit(ai_state_text, (SCREEN_WIDTH - bar_width - 30, 70))
 
 def draw_controls_help():
@@ -1486,14 +1475,7 @@ def draw_controls_help():
     ]
 
     # 创建小字体用于帮助信息
-    try:
-        font_path_simhei = pygame.font.match_font("simhei")
-        if font_path_simhei:
-            help_font = pygame.font.Font(font_path_simhei, 16)
-        else:
-            raise pygame.error("SimHei not found")
-    except pygame.error:
-        help_font = pygame.font.Font(None, 16)
+    help_font = font_registry.get(16)
 
     # 自适应位置，确保帮助信息在屏幕底部
     help_start_y = max(SCREEN_HEIGHT - 90, SCREEN_HEIGHT - len(help_texts) * 20 - 10)
@@ -1512,13 +1494,7 @@ def check_attack_collisions(attacker, defender):
 
 def display_message(message, size=60, y_offset=0): # Added y_offset
     """在屏幕中央显示消息"""
-    local_font = None
-    try:
-        font_path_simhei = pygame.font.match_font("simhei")
-        if font_path_simhei: local_font = pygame.font.Font(font_path_simhei, size)
-        else: raise pygame.error("SimHei not found")
-    except pygame.error:
-        local_font = pygame.font.Font(None, size)
+    local_font = font_registry.get(size)
 
     text_surface = local_font.render(message, True, WHITE)
     text_rect = text_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + y_offset)) # Apply y_offset
@@ -1560,14 +1536,7 @@ def draw_character_selection_screen(selected_p1=None, selected_p2=None, mouse_po
 
     # 标题 - 在最上方居中，使用更小的字体
     title_y = frame_y + 35
-    try:
-        font_path_simhei = pygame.font.match_font("simhei")
-        if font_path_simhei:
-            title_font = pygame.font.Font(font_path_simhei, 36)
-        else:
-            raise pygame.error("SimHei not found")
-    except pygame.error:
-        title_font = pygame.font.Font(None, 36)
+    title_font = font_registry.get(36)
 
     title_text = title_font.render("选择角色", True, WHITE)
     title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, title_y))
@@ -1622,14 +1591,7 @@ def draw_character_selection_screen(selected_p1=None, selected_p2=None, mouse_po
 
         # 角色名称 - 使用更小的字体
         config = CHARACTER_CONFIGS[char_type]
-        try:
-            font_path_simhei = pygame.font.match_font("simhei")
-            if font_path_simhei:
-                name_font = pygame.font.Font(font_path_simhei, 22)
-            else:
-                raise pygame.error("SimHei not found")
-        except pygame.error:
-            name_font = pygame.font.Font(None, 22)
+        name_font = font_registry.get(22)
 
         name_text = name_font.render(config["name"], True, WHITE)
         name_rect = name_text.get_rect(center=(x, y + 100))
@@ -1643,16 +1605,8 @@ def draw_character_selection_screen(selected_p1=None, selected_p2=None, mouse_po
     tips_y = frame_y + frame_height - 80
 
     # 创建小字体
-    try:
-        font_path_simhei = pygame.font.match_font("simhei")
-        if font_path_simhei:
-            tip_font = pygame.font.Font(font_path_simhei, 20)
-            tip_font_small = pygame.font.Font(font_path_simhei, 16)
-        else:
-            raise pygame.error("SimHei not found")
-    except pygame.error:
-        tip_font = pygame.font.Font(None, 20)
-        tip_font_small = pygame.font.Font(None, 16)
+    tip_font = font_registry.get(20)
+    tip_font_small = font_registry.get(16)
 
     if game_mode == "vs_player":
         tip1_text = tip_font.render("P1: 点击选择角色 | P2: 右键选择角色", True, WHITE)
@@ -1688,18 +1642,9 @@ def draw_character_info_panel(character_type):
     pygame.draw.rect(screen, WHITE, panel_rect, 2)
 
     # 创建不同大小的字体
-    try:
-        font_path_simhei = pygame.font.match_font("simhei")
-        if font_path_simhei:
-            info_font = pygame.font.Font(font_path_simhei, 20)
-            stat_font = pygame.font.Font(font_path_simhei, 16)
-            skill_font = pygame.font.Font(font_path_simhei, 14)
-        else:
-            raise pygame.error("SimHei not found")
-    except pygame.error:
-        info_font = pygame.font.Font(None, 20)
-        stat_font = pygame.font.Font(None, 16)
-        skill_font = pygame.font.Font(None, 14)
+    info_font = font_registry.get(20)
+    stat_font = font_registry.get(16)
+    skill_font = font_registry.get(14)
 
     # 角色名称和描述
     name_text = info_font.render(f"{config['name']} - {config['description']}", True, WHITE)
@@ -1989,7 +1934,7 @@ def draw_skill_cooldowns(player1, player2):
                 pygame.draw.rect(screen, GREEN, (x, y, 40, 30))
 
         # 技能名称
-        skill_text = font.render(skill_names[i], True, WHITE)
+        skill_text = text_cache.render(font, skill_names[i], WHITE)
         text_rect = skill_text.get_rect(center=(x + 20, y + 15))
         screen.blit(skill_text, text_rect)
 
@@ -2016,7 +1961,7 @@ def draw_skill_cooldowns(player1, player2):
                 pygame.draw.rect(screen, GREEN, (x, y, 40, 30))
 
         # 技能名称
-        skill_text = font.render(skill_names[i], True, WHITE)
+        skill_text = text_cache.render(font, skill_names[i], WHITE)
         text_rect = skill_text.get_rect(center=(x + 20, y + 15))
         screen.blit(skill_text, text_rect)
 
@@ -2076,14 +2021,7 @@ def draw_shop_screen(mouse_pos=None):
     pygame.draw.rect(screen, GOLD, (shop_x, shop_y, shop_width, shop_height), 4)
 
     # 标题和金币显示
-    try:
-        font_path_simhei = pygame.font.match_font("simhei")
-        if font_path_simhei:
-            title_font = pygame.font.Font(font_path_simhei, 36)
-        else:
-            raise pygame.error("SimHei not found")
-    except pygame.error:
-        title_font = pygame.font.Font(None, 36)
+    title_font = font_registry.get(36)
 
     title_text = title_font.render("装备商店", True, WHITE)
     title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, shop_y + 30))
@@ -2143,18 +2081,9 @@ def draw_shop_screen(mouse_pos=None):
             pygame.draw.rect(screen, WHITE, equipment_rect, 2)
 
         # 装备图标和名称
-        try:
-            font_path_simhei = pygame.font.match_font("simhei")
-            if font_path_simhei:
-                icon_font = pygame.font.Font(font_path_simhei, 32)
-                name_font = pygame.font.Font(font_path_simhei, 18)
-                desc_font = pygame.font.Font(font_path_simhei, 14)
-            else:
-                raise pygame.error("SimHei not found")
-        except pygame.error:
-            icon_font = pygame.font.Font(None, 32)
-            name_font = pygame.font.Font(None, 18)
-            desc_font = pygame.font.Font(None, 14)
+        icon_font = font_registry.get(32)
+        name_font = font_registry.get(18)
+        desc_font = font_registry.get(14)
 
         icon_text = icon_font.render(config["icon"], True, WHITE)
         icon_rect = icon_text.get_rect(center=(x + spacing_x//2 - 10, y + 30))
@@ -2181,14 +2110,7 @@ def draw_shop_screen(mouse_pos=None):
         screen.blit(status_text, status_rect)
 
     # 操作提示
-    try:
-        font_path_simhei = pygame.font.match_font("simhei")
-        if font_path_simhei:
-            tip_font = pygame.font.Font(font_path_simhei, 20)
-        else:
-            raise pygame.error("SimHei not found")
-    except pygame.error:
-        tip_font = pygame.font.Font(None, 20)
+    tip_font = font_registry.get(20)
 
     tip_text = tip_font.render("ESC - 返回主菜单", True, WHITE)
     screen.blit(tip_text, (shop_x + 20, shop_y + shop_height - 30))
@@ -2209,20 +2131,10 @@ def draw_boss_selection_screen(mouse_pos=None):
     pygame.draw.rect(screen, RED, (boss_x, boss_y, boss_width, boss_height), 4)
 
     # 标题
-    try:
-        font_path_simhei = pygame.font.match_font("simhei")
-        if font_path_simhei:
-            title_font = pygame.font.Font(font_path_simhei, 36)
-            name_font = pygame.font.Font(font_path_simhei, 28)
-            desc_font = pygame.font.Font(font_path_simhei, 18)
-            tip_font = pygame.font.Font(font_path_simhei, 20)
-        else:
-            raise pygame.error("SimHei not found")
-    except pygame.error:
-        title_font = pygame.font.Font(None, 36)
-        name_font = pygame.font.Font(None, 28)
-        desc_font = pygame.font.Font(None, 18)
-        tip_font = pygame.font.Font(None, 20)
+    title_font = font_registry.get(36)
+    name_font = font_registry.get(28)
+    desc_font = font_registry.get(18)
+    tip_font = font_registry.get(20)
 
     title_text = title_font.render("Boss挑战模式", True, WHITE)
     title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, boss_y + 30))
@@ -3,6 +3,28 @@
 包含完整的贪吃蛇游戏功能
 """
 
-from .game_core import UltimateSnakeGame
+from importlib import import_module
 
-__all__ = ['UltimateSnakeGame']
+# 导出名 -> 所在子模块。用到时才导入：无头运行模拟器、回放和向量化
+# 环境时不会加载渲染层（pygame、字体、音效）；python -m 运行子模块时
+# 也不会出现子模块被提前导入的警告
+_EXPORTS = {
+    'UltimateSnakeGame': 'game_core',
+    'SnakeSimulator': 'simulator',
+    'Replay': 'replay',
+    'ReplayRecorder': 'replay',
+    'ReplayPlayer': 'replay',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
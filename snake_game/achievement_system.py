@@ -4,6 +4,7 @@
 
 import pygame
 import time
+from typing import List
 
 class AchievementSystem:
     """成就系统"""
@@ -37,8 +38,9 @@ class AchievementSystem:
         self.notifications = [n for n in self.notifications 
                             if current_time - n['time'] < n['duration']]
     
-    def render_notifications(self, screen: pygame.Surface, font: pygame.font.Font):
-        """渲染通知"""
+    def render_notifications(self, screen: pygame.Surface, font: pygame.font.Font) -> List[pygame.Rect]:
+        """渲染通知，返回绘制过的区域"""
+        drawn = []
         for i, notification in enumerate(self.notifications):
             alpha = max(0, min(255, int((notification['duration'] - 
                                        (time.time() - notification['time'])) * 255)))
@@ -52,8 +54,9 @@ class AchievementSystem:
             bg_surface = pygame.Surface((text_rect.width + 20, text_rect.height + 10))
             bg_surface.set_alpha(alpha // 2)
             bg_surface.fill((0, 0, 0))
-            screen.blit(bg_surface, (text_rect.x - 10, text_rect.y - 5))
+            drawn.append(screen.blit(bg_surface, (text_rect.x - 10, text_rect.y - 5)))
             
             # 文本
             text_surface.set_alpha(alpha)
             screen.blit(text_surface, text_rect)
+        return drawn
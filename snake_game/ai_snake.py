@@ -2,63 +2,86 @@
 AI蛇系统
 """
 
-import random
-from typing import List, Tuple
+from collections import deque
+from typing import Optional, Tuple
+
 from .enums import Direction
+from .snake_body import SnakeBody
+from .occupancy import OccupancyGrid, BLOCKING
+from .pathfinding import PathPlanner, UNREACHABLE
 
 class AISnake:
-    """AI蛇（简单的路径查找）"""
-    
-    def __init__(self, start_pos: Tuple[int, int], grid_size: int):
-        self.body = [start_pos]
+    """AI蛇（基于占用网格的A*寻路）
+
+    strategy 不为 None 时由它决定方向（例如 HamiltonianStrategy，由
+    SnakeSimulator 的 ai_strategy 参数创建），它需要提供
+    next_direction(body, food_pos, direction)。
+    """
+
+    def __init__(self, start_pos: Tuple[int, int], grid: OccupancyGrid,
+                 planner: Optional[PathPlanner] = None, strategy=None):
+        self.body = SnakeBody([start_pos])
         self.direction = Direction.RIGHT
-        self.grid_size = grid_size
+        self.grid = grid
+        self.planner = planner if planner is not None else PathPlanner(grid)
+        self.strategy = strategy
         self.target = None
-    
-    def find_path_to_food(self, food_pos: Tuple[int, int], obstacles: List[Tuple[int, int]]) -> Direction:
-        """简单的A*路径查找"""
+
+        # 缓存的路径：只有头尾变化时沿用，目标或墙壁变化、下一步被挡时重新规划
+        self.path = deque()
+        self._wall_version = -1
+
+    def _path_still_valid(self, food_pos: Tuple[int, int]) -> bool:
+        """检查缓存路径能否继续使用"""
+        if not self.path or self.target != food_pos:
+            return False
+        if self._wall_version != self.grid.wall_version:
+            return False
         head_x, head_y = self.body[0]
-        food_x, food_y = food_pos
-        
-        # 简化版：朝着食物方向移动，避开障碍物
-        dx = food_x - head_x
-        dy = food_y - head_y
-        
-        # 优先级：距离更近的方向
-        possible_moves = []
-        
-        if dx > 0:
-            possible_moves.append((Direction.RIGHT, abs(dx)))
-        elif dx < 0:
-            possible_moves.append((Direction.LEFT, abs(dx)))
-        
-        if dy > 0:
-            possible_moves.append((Direction.DOWN, abs(dy)))
-        elif dy < 0:
-            possible_moves.append((Direction.UP, abs(dy)))
-        
-        # 按距离排序
-        possible_moves.sort(key=lambda x: x[1], reverse=True)
-        
-        # 检查每个方向是否安全
-        for direction, _ in possible_moves:
-            new_x = head_x + direction.value[0]
-            new_y = head_y + direction.value[1]
-            
-            # 检查边界
-            if (0 <= new_x < self.grid_size and 0 <= new_y < self.grid_size):
-                # 检查是否撞到自己或障碍物
-                if (new_x, new_y) not in self.body and (new_x, new_y) not in obstacles:
-                    return direction
-        
-        # 如果没有安全路径，随机选择
-        safe_directions = []
+        next_x, next_y = self.path[0]
+        if abs(next_x - head_x) + abs(next_y - head_y) != 1:
+            return False
+        return not self.grid.has(next_x, next_y, BLOCKING)
+
+    def _is_safe(self, pos: Tuple[int, int]) -> bool:
+        """走到该格子后是否还有足够的活动空间（避免钻进死路）"""
+        needed = len(self.body) + 1
+        return self.planner.reachable_area(pos, BLOCKING, needed) >= needed
+
+    def find_path_to_food(self, food_pos: Tuple[int, int]) -> Direction:
+        """寻找朝向食物的下一步方向"""
+        head_x, head_y = self.body[0]
+
+        if not self._path_still_valid(food_pos):
+            path = self.planner.astar((head_x, head_y), food_pos)
+            self.path = deque(path or ())
+            self.target = food_pos
+            self._wall_version = self.grid.wall_version
+
+        if self.path and self._is_safe(self.path[0]):
+            next_x, next_y = self.path.popleft()
+            return Direction((next_x - head_x, next_y - head_y))
+
+        # 没有安全路径：选择活动空间最大、离食物最近的方向
+        self.path.clear()
+        field = self.planner.distance_field(food_pos)
+        best_direction = None
+        best_key = None
         for direction in Direction:
             new_x = head_x + direction.value[0]
             new_y = head_y + direction.value[1]
-            
-            if (0 <= new_x < self.grid_size and 0 <= new_y < self.grid_size):
-                if (new_x, new_y) not in self.body and (new_x, new_y) not in obstacles:
-                    safe_directions.append(direction)
-        
-        return random.choice(safe_directions) if safe_directions else Direction.RIGHT
+            if not self.grid.in_bounds(new_x, new_y):
+                continue
+            if self.grid.has(new_x, new_y, BLOCKING):
+                continue
+
+            area = self.planner.reachable_area((new_x, new_y), BLOCKING, len(self.body) + 1)
+            distance = field[self.grid.index(new_x, new_y)]
+            if distance == UNREACHABLE:
+                distance = len(field)
+            key = (-area, distance)
+            if best_key is None or key < best_key:
+                best_key = key
+                best_direction = direction
+
+        return best_direction if best_direction is not None else self.direction
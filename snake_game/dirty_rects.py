@@ -0,0 +1,70 @@
+"""
+脏矩形跟踪
+"""
+
+import pygame
+from typing import Iterable, List, Optional, Tuple
+
+class DirtyRectTracker:
+    """脏矩形跟踪器
+
+    记录本帧需要重绘的格子和屏幕区域。格子矩形向外扩展 padding 像素，
+    覆盖发光效果溢出的部分；标记为易变的区域（粒子、通知等）会保留到
+    下一帧，保证它们移走后旧位置被擦除。
+    """
+
+    def __init__(self, grid_size: int, padding: int = 4, max_rects: int = 200):
+        self.grid_size = grid_size
+        self.padding = padding
+        self.max_rects = max_rects
+        self.cells = set()
+        self.rects = []
+        self.full_redraw = True
+        self._volatile = []
+        self._previous = []
+
+    def request_full_redraw(self):
+        """下一帧整屏重绘"""
+        self.full_redraw = True
+
+    def mark_cell(self, pos: Tuple[int, int]):
+        """标记一个格子需要重绘"""
+        self.cells.add(pos)
+
+    def mark_cells(self, cells: Iterable[Tuple[int, int]]):
+        """标记多个格子需要重绘"""
+        self.cells.update(cells)
+
+    def mark_rect(self, rect: Optional[pygame.Rect], volatile: bool = False):
+        """标记一个屏幕区域需要重绘"""
+        if rect is None:
+            return
+        self.rects.append(rect)
+        if volatile:
+            self._volatile.append(rect)
+
+    def cell_rect(self, pos: Tuple[int, int]) -> pygame.Rect:
+        """格子对应的屏幕矩形（含发光溢出）"""
+        size = self.grid_size
+        pad = self.padding
+        return pygame.Rect(pos[0] * size - pad, pos[1] * size - pad,
+                           size + pad * 2, size + pad * 2)
+
+    def collect(self) -> List[pygame.Rect]:
+        """取出本帧的脏矩形（包含上一帧的易变区域），并开始新的一帧"""
+        rects = [self.cell_rect(pos) for pos in self.cells]
+        rects.extend(self.rects)
+        rects.extend(self._previous)
+        self._previous = self._volatile
+        self._volatile = []
+        self.cells = set()
+        self.rects = []
+        return rects
+
+    def finish_full_redraw(self):
+        """整屏重绘完成：丢弃累积的脏区域，保留易变区域供下一帧擦除"""
+        self._previous = self._volatile
+        self._volatile = []
+        self.cells = set()
+        self.rects = []
+        self.full_redraw = False
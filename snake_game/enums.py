@@ -21,6 +21,7 @@ class GameMode(Enum):
     BATTLE = "对战模式"
     SURVIVAL = "生存模式"
     ZEN = "禅意模式"
+    FEAST = "盛宴模式"
 
 class PowerUpType(Enum):
     """道具类型"""
@@ -32,6 +33,11 @@ class PowerUpType(Enum):
     TELEPORT = "传送"
     FREEZE = "冰冻"
 
+@dataclass
+class Food:
+    """食物类"""
+    pos: Tuple[int, int]
+
 @dataclass
 class PowerUp:
     """道具类"""
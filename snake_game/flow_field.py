@@ -0,0 +1,109 @@
+"""
+共享流场
+多条AI蛇追逐同一批食物时，只做一次多源BFS，所有AI直接读取下一步方向
+"""
+
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from .enums import Direction
+from .occupancy import OccupancyGrid, WALL, BLOCKING
+from .pathfinding import UNREACHABLE
+
+# 方向编码顺序与 Direction 枚举一致：UP, DOWN, LEFT, RIGHT
+DIRECTIONS = list(Direction)
+
+# 邻居不可达或越界时使用的距离
+FAR = np.iinfo(np.int32).max
+
+class FlowField:
+    """共享流场
+
+    以所有食物为源点，在只考虑墙壁的网格上做向量化的多源BFS，
+    并预先计算每个格子四个方向按距离从近到远的排序。只有食物集合或
+    墙壁变化时才重新计算，规划开销是每次食物变化一遍网格，
+    与AI蛇数量无关。
+    """
+
+    def __init__(self, grid: OccupancyGrid):
+        self.grid = grid
+        self.sources = None
+        self._wall_version = -1
+        self.distance = None
+        self.neighbor_distance = None
+        self.order = None
+
+    def update(self, sources: Iterable[Tuple[int, int]]) -> bool:
+        """食物或墙壁变化时重新计算流场，返回是否重新计算"""
+        key = tuple(sorted(sources))
+        if key == self.sources and self._wall_version == self.grid.wall_version:
+            return False
+
+        self.sources = key
+        self._wall_version = self.grid.wall_version
+        self._compute(key)
+        return True
+
+    def _compute(self, sources: Tuple[Tuple[int, int], ...]):
+        """向量化多源BFS"""
+        height, width = self.grid.height, self.grid.width
+        passable = (self.grid.as_array() & WALL) == 0
+
+        distance = np.full((height, width), UNREACHABLE, dtype=np.int32)
+        frontier = np.zeros((height, width), dtype=bool)
+        for x, y in sources:
+            frontier[y, x] = True
+        distance[frontier] = 0
+        visited = frontier.copy()
+
+        step = 0
+        while frontier.any():
+            step += 1
+            expanded = np.zeros_like(frontier)
+            expanded[1:, :] |= frontier[:-1, :]
+            expanded[:-1, :] |= frontier[1:, :]
+            expanded[:, 1:] |= frontier[:, :-1]
+            expanded[:, :-1] |= frontier[:, 1:]
+            expanded &= passable
+            expanded &= ~visited
+            distance[expanded] = step
+            visited |= expanded
+            frontier = expanded
+
+        # 每个格子四个邻居的距离（越界或不可达为FAR）
+        reachable = np.where(distance == UNREACHABLE, FAR, distance)
+        neighbor = np.full((height, width, 4), FAR, dtype=np.int32)
+        neighbor[1:, :, 0] = reachable[:-1, :]   # UP
+        neighbor[:-1, :, 1] = reachable[1:, :]   # DOWN
+        neighbor[:, 1:, 2] = reachable[:, :-1]   # LEFT
+        neighbor[:, :-1, 3] = reachable[:, 1:]   # RIGHT
+
+        self.distance = distance
+        self.neighbor_distance = neighbor
+        self.order = np.argsort(neighbor, axis=2, kind='stable').astype(np.uint8)
+
+    def next_direction(self, pos: Tuple[int, int]) -> Optional[Direction]:
+        """读取某格子下山最快且当前未被挡住的方向
+
+        优先选择走过去之后还有空闲出口的邻居，避免一步走进死角。
+        """
+        if self.order is None:
+            return None
+
+        grid = self.grid
+        x, y = pos
+        fallback = None
+        for code in self.order[y, x].tolist():
+            if self.neighbor_distance[y, x, code] == FAR:
+                break
+            dx, dy = DIRECTIONS[code].value
+            nx, ny = x + dx, y + dy
+            if grid.has(nx, ny, BLOCKING):
+                continue
+            if fallback is None:
+                fallback = DIRECTIONS[code]
+            for ex, ey in ((nx, ny - 1), (nx, ny + 1), (nx - 1, ny), (nx + 1, ny)):
+                if (ex, ey) != (x, y) and grid.in_bounds(ex, ey) and not grid.has(ex, ey, BLOCKING):
+                    return DIRECTIONS[code]
+        return fallback
@@ -3,27 +3,67 @@
 """
 
 import pygame
+import numpy as np
 import random
 import math
 import time
-import json
 import os
-from typing import List, Tuple, Dict, Optional
+import threading
+from typing import Iterable, List, Tuple, Dict, Optional
 
-from .enums import Direction, GameMode, PowerUpType, PowerUp
+from .enums import Direction, GameMode, PowerUpType, PowerUp, Food
 from .particle_system import ParticleEffect
 from .snake_skin import SnakeSkin
-from .ai_snake import AISnake
 from .sound_manager import SoundManager
 from .achievement_system import AchievementSystem
-
-# 初始化pygame
-pygame.init()
+from .simulator import SnakeSimulator
+from .occupancy import SNAKE, AI_SNAKE, WALL, FOOD, POWERUP
+from .dirty_rects import DirtyRectTracker
+from .viewport import Camera, ChunkSurfaceCache
+from .leaderboard import Leaderboard, GameRecord
+from .replay import ReplayRecorder, ReplayPlayer, TICK_DT, MAX_FRAME_TIME, EVENT_PAUSE, EVENT_RESUME
+from game_common.font_registry import font_registry
+from game_common.sprite_atlas import sprite_atlas
+from game_common.stats_store import StatsStore
+from game_common.text_cache import text_cache
+
+# 道具图标（简单文字）
+POWERUP_ICONS = {
+    PowerUpType.SPEED_BOOST: "S",
+    PowerUpType.SLOW_MOTION: "T",
+    PowerUpType.INVINCIBLE: "I",
+    PowerUpType.DOUBLE_SCORE: "2",
+    PowerUpType.SHRINK: "↓",
+    PowerUpType.TELEPORT: "T",
+    PowerUpType.FREEZE: "F"
+}
+
+# 大棋盘外的底色
+OUTSIDE_COLOR = (10, 10, 20)
+
+# 方向键
+DIRECTION_KEYS = {
+    pygame.K_UP: Direction.UP,
+    pygame.K_DOWN: Direction.DOWN,
+    pygame.K_LEFT: Direction.LEFT,
+    pygame.K_RIGHT: Direction.RIGHT
+}
 
 class UltimateSnakeGame:
-    """无敌蛇王主游戏类"""
-    
-    def __init__(self):
+    """无敌蛇王主游戏类（SnakeSimulator之上的渲染层）
+
+    render_mode 为 'full' 时每帧整屏重绘；为 'dirty' 时只重绘变化的格子
+    和UI区域，并用 pygame.display.update(rects) 提交，适合软件渲染的
+    低端设备。
+    """
+
+    # 粒子数超过该值时脏矩形模式退回整屏重绘
+    DIRTY_PARTICLE_LIMIT = 200
+
+    def __init__(self, render_mode: str = 'full'):
+        # 初始化pygame
+        pygame.init()
+
         # 基础设置
         self.WINDOW_WIDTH = 1200
         self.WINDOW_HEIGHT = 800
@@ -35,31 +75,54 @@ class UltimateSnakeGame:
         self.screen = pygame.display.set_mode((self.WINDOW_WIDTH, self.WINDOW_HEIGHT))
         pygame.display.set_caption("🐍 无敌蛇王 - Ultimate Snake Game")
         
+        # 渲染模式
+        if render_mode not in ('full', 'dirty'):
+            raise ValueError(f"未知的渲染模式: {render_mode}")
+        self.render_mode = render_mode
+        # 整屏重绘时在逻辑帧之间插值蛇的位置（脏矩形模式按格子重绘，不插值）
+        self.interpolate = render_mode == 'full'
+        self.dirty_rects = DirtyRectTracker(self.GRID_SIZE)
+        self._dirty_view_key = None
+        self._last_heads = []
+        self._background = None
+        self._background_key = None
+        self._food_tile = None
+
+        # 大棋盘：摄像机跟随蛇头，背景按块绘制并缓存
+        self.board_sizes = [(self.GRID_WIDTH, self.GRID_HEIGHT), (500, 500), (2000, 2000)]
+        self.board_index = 0
+        self.camera = None
+        self.chunk_cache = ChunkSurfaceCache(self.render_chunk)
+
         # 游戏组件
         self.particle_system = ParticleEffect()
         self.snake_skin = SnakeSkin()
         self.sound_manager = SoundManager()
         self.achievements = AchievementSystem()
         
-        # 字体 - 使用支持中文的字体
-        try:
-            font_path = "C:\\Windows\\Fonts\\simhei.ttf"  # 使用黑体
-            self.font_large = pygame.font.Font(font_path, 48)
-            self.font_medium = pygame.font.Font(font_path, 36)
-            self.font_small = pygame.font.Font(font_path, 24)
-        except:
-            # 如果加载失败，退回到默认字体
+        # 字体 - 使用支持中文的字体（由字体注册表统一查找和共享）
+        if not font_registry.resolve():
             print("无法加载中文字体，使用默认字体")
-            self.font_large = pygame.font.Font(None, 48)
-            self.font_medium = pygame.font.Font(None, 36)
-            self.font_small = pygame.font.Font(None, 24)
+        self.font_large = font_registry.get(48)
+        self.font_medium = font_registry.get(36)
+        self.font_small = font_registry.get(24)
         
-        # 墙壁 (需要在reset_game之前初始化)
-        self.walls = []
-        
-        # 游戏状态
+        # 游戏状态（模拟部分由SnakeSimulator负责，使用模拟时间，暂停时计时也暂停）
         self.game_mode = GameMode.CLASSIC
-        self.game_state = 'menu'  # menu, playing, paused, game_over
+        self.game_state = 'menu'  # menu, loading, playing, paused, game_over
+        self.create_sim(self.GRID_WIDTH, self.GRID_HEIGHT)
+
+        # 大棋盘迷宫在后台线程生成（首次生成要几秒），期间显示加载画面；
+        # 同一个迷宫正在生成时不再重复启动线程
+        self.maze_loader: Optional[threading.Thread] = None
+        self.maze_threads: Dict[Tuple, threading.Thread] = {}
+        self.loading_started = 0.0
+
+        # 录像：模拟按固定的 TICK_DT 逐帧推进，每局用新种子，输入按帧号记录
+        self.recorder = ReplayRecorder()
+        self.replay_dir = 'replays'
+        self.sim_tick = 0
+        self.sim_accumulator = 0.0
         self.reset_game()
         
         # 菜单系统
@@ -67,161 +130,86 @@ class UltimateSnakeGame:
         self.menu_selected = 0
         
         # 统计数据
-        self.stats = {
+        self.stats_store = StatsStore('snake_stats.json', {
             'games_played': 0,
             'total_food_eaten': 0,
             'highest_score': 0,
             'total_playtime': 0
-        }
+        })
         self.load_stats()
+
+        # 每局历史和各模式排行榜（SQLite，后台线程读写）
+        self.leaderboard = Leaderboard('snake_history.db', [mode.name for mode in GameMode])
     
-    def reset_game(self):
-        """重置游戏"""
-        # 蛇的初始化
-        center_x = self.GRID_WIDTH // 2
-        center_y = self.GRID_HEIGHT // 2
-        self.snake_body = [(center_x, center_y)]
-        self.snake_direction = Direction.RIGHT
-        self.grow_pending = 0
-        
-        # AI蛇（对战模式）
-        self.ai_snake = AISnake((center_x, center_y + 5), self.GRID_HEIGHT)
-        
-        # 食物和道具
-        self.food_pos = self.generate_food()
-        self.powerups = []
-        self.active_effects = {}
-        
-        # 游戏参数
-        self.score = 0
-        self.speed = 5
-        self.base_speed = 5
-        self.level = 1
-        self.food_eaten = 0
-        
-        # 时间管理
-        self.game_time = 0
-        self.last_move_time = 0
-        self.last_powerup_spawn = 0
-        
-        # 特殊效果
-        self.screen_shake = 0
-        self.invincible = False
-        self.frozen = False
-        
-        # 迷宫模式的墙壁
-        self.walls = []
-        if self.game_mode == GameMode.MAZE:
-            self.generate_maze()
-    
-    def generate_food(self) -> Tuple[int, int]:
-        """生成食物位置"""
-        while True:
-            x = random.randint(0, self.GRID_WIDTH - 1)
-            y = random.randint(0, self.GRID_HEIGHT - 1)
-            if (x, y) not in self.snake_body and (x, y) not in self.walls:
-                return (x, y)
-    
-    def generate_maze(self):
-        """生成迷宫"""
-        self.walls = []
-        
-        # 简单的迷宫生成：随机放置墙壁
-        wall_count = (self.GRID_WIDTH * self.GRID_HEIGHT) // 8
-        
-        for _ in range(wall_count):
-            x = random.randint(1, self.GRID_WIDTH - 2)
-            y = random.randint(1, self.GRID_HEIGHT - 2)
-            
-            # 确保不在蛇的位置
-            if (x, y) not in self.snake_body:
-                self.walls.append((x, y))
-    
-    def spawn_powerup(self):
-        """生成道具"""
-        if len(self.powerups) >= 3:  # 最多3个道具
-            return
-        
-        # 随机选择道具类型
-        powerup_type = random.choice(list(PowerUpType))
-        
-        # 道具颜色
-        colors = {
-            PowerUpType.SPEED_BOOST: (255, 100, 100),
-            PowerUpType.SLOW_MOTION: (100, 100, 255),
-            PowerUpType.INVINCIBLE: (255, 255, 0),
-            PowerUpType.DOUBLE_SCORE: (255, 165, 0),
-            PowerUpType.SHRINK: (255, 0, 255),
-            PowerUpType.TELEPORT: (0, 255, 255),
-            PowerUpType.FREEZE: (200, 200, 255)
-        }
-        
-        # 生成位置
-        while True:
-            x = random.randint(0, self.GRID_WIDTH - 1)
-            y = random.randint(0, self.GRID_HEIGHT - 1)
-            if ((x, y) not in self.snake_body and 
-                (x, y) != self.food_pos and 
-                (x, y) not in self.walls):
-                
-                powerup = PowerUp(
-                    pos=(x, y),
-                    type=powerup_type,
-                    color=colors[powerup_type],
-                    lifetime=15.0  # 15秒后消失
-                )
-                self.powerups.append(powerup)
-                break
-
-    def apply_powerup(self, powerup: PowerUp):
-        """应用道具效果"""
-        effect_type = powerup.type
-        duration = powerup.effect_duration
-
-        self.active_effects[effect_type] = time.time() + duration
-        self.achievements.used_powerups.add(effect_type)
-
-        if effect_type == PowerUpType.SPEED_BOOST:
-            self.speed = min(30, self.base_speed * 2)
-        elif effect_type == PowerUpType.SLOW_MOTION:
-            self.speed = max(3, self.base_speed // 2)
-        elif effect_type == PowerUpType.INVINCIBLE:
-            self.invincible = True
-        elif effect_type == PowerUpType.SHRINK:
-            if len(self.snake_body) > 3:
-                self.snake_body = self.snake_body[:len(self.snake_body)//2]
-        elif effect_type == PowerUpType.TELEPORT:
-            # 随机传送蛇头
-            new_pos = self.generate_food()
-            self.snake_body[0] = new_pos
-        elif effect_type == PowerUpType.FREEZE:
-            self.frozen = True
-
-        self.sound_manager.play('powerup')
-
-        # 检查道具大师成就
-        if len(self.achievements.used_powerups) >= len(PowerUpType):
-            self.achievements.check_achievement('powerup_master')
-
-    def update_effects(self):
-        """更新道具效果"""
-        current_time = time.time()
-        expired_effects = []
+    def create_sim(self, width: int, height: int):
+        """按棋盘大小创建模拟器"""
+        self.set_sim(SnakeSimulator(width, height))
+
+    def set_sim(self, sim: SnakeSimulator):
+        """切换到给定的模拟器（大棋盘同时创建摄像机）"""
+        self.sim = sim
+        if self.render_mode == 'dirty':
+            sim.grid.track_changes()
+        self.chunk_cache.clear()
+        self.camera = None
+        if sim.large_board:
+            self.camera = Camera((self.WINDOW_WIDTH, self.WINDOW_HEIGHT),
+                                 (sim.GRID_WIDTH * self.GRID_SIZE, sim.GRID_HEIGHT * self.GRID_SIZE))
+
+    def board_size_for(self, mode: GameMode) -> Tuple[int, int]:
+        """某模式使用的棋盘大小（对战模式的AI寻路需要整张网格，固定使用窗口大小）"""
+        if mode == GameMode.BATTLE:
+            return self.board_sizes[0]
+        return self.board_sizes[self.board_index]
 
-        for effect_type, end_time in self.active_effects.items():
-            if current_time > end_time:
-                expired_effects.append(effect_type)
+    def reset_game(self):
+        """重置游戏
+
+        迷宫还不在内存中时（大棋盘首次生成要几秒）先进入加载状态，由
+        后台线程准备迷宫，准备好后 update_loading 再开始这一局。
+        """
+        size = self.board_size_for(self.game_mode)
+        if (self.sim.GRID_WIDTH, self.sim.GRID_HEIGHT) != size:
+            self.create_sim(*size)
+        self.sim.game_mode = self.game_mode
+        self.round_seed = random.getrandbits(64)
+        self.sim.rng.seed(self.round_seed)
 
-        for effect_type in expired_effects:
-            del self.active_effects[effect_type]
+        if self.game_mode == GameMode.MAZE:
+            key = self.sim.peek_maze()
+            if not self.sim.maze.is_loaded(*key):
+                maze = self.sim.maze
+                thread = self.maze_threads.get((id(maze), key))
+                if thread is None or not thread.is_alive():
+                    thread = threading.Thread(target=maze.get, args=key, daemon=True)
+                    thread.start()
+                    self.maze_threads = {k: t for k, t in self.maze_threads.items() if t.is_alive()}
+                    self.maze_threads[(id(maze), key)] = thread
+                self.maze_loader = thread
+                self.loading_started = time.time()
+                self.game_state = 'loading'
+                return
+        self.start_round()
+
+    def update_loading(self):
+        """加载状态：后台迷宫生成完成后开始这一局"""
+        if self.maze_loader is not None and not self.maze_loader.is_alive():
+            self.maze_loader = None
+            self.game_state = 'playing'
+            self.start_round()
+
+    def start_round(self):
+        """用已经播种的模拟器开始新的一局"""
+        self.sim.reset()
+        self.sim_tick = 0
+        self.sim_accumulator = 0.0
+        self.powerups_used = set()
+        self.recorder.start(self.round_seed, self.game_mode, self.snake_skin.current_skin,
+                            self.sim.GRID_WIDTH, self.sim.GRID_HEIGHT)
 
-            # 移除效果
-            if effect_type in [PowerUpType.SPEED_BOOST, PowerUpType.SLOW_MOTION]:
-                self.speed = self.base_speed
-            elif effect_type == PowerUpType.INVINCIBLE:
-                self.invincible = False
-            elif effect_type == PowerUpType.FREEZE:
-                self.frozen = False
+        # 特殊效果
+        self.screen_shake = 0
+        self.dirty_rects.request_full_redraw()
 
     def handle_input(self, event):
         """处理输入"""
@@ -245,69 +233,56 @@ class UltimateSnakeGame:
 
                     if len(self.achievements.used_skins) >= len(skins):
                         self.achievements.check_achievement('shapeshifter')
+                elif event.key == pygame.K_b:
+                    # 切换棋盘大小
+                    self.board_index = (self.board_index + 1) % len(self.board_sizes)
 
             elif self.game_state == 'playing':
                 # 方向控制
-                if event.key == pygame.K_UP and self.snake_direction != Direction.DOWN:
-                    self.snake_direction = Direction.UP
-                elif event.key == pygame.K_DOWN and self.snake_direction != Direction.UP:
-                    self.snake_direction = Direction.DOWN
-                elif event.key == pygame.K_LEFT and self.snake_direction != Direction.RIGHT:
-                    self.snake_direction = Direction.LEFT
-                elif event.key == pygame.K_RIGHT and self.snake_direction != Direction.LEFT:
-                    self.snake_direction = Direction.RIGHT
+                direction = DIRECTION_KEYS.get(event.key)
+                if direction is not None:
+                    if self.sim.change_direction(direction):
+                        self.recorder.record_direction(self.sim_tick, direction)
                 elif event.key == pygame.K_p:
                     self.game_state = 'paused'
+                    self.recorder.record(self.sim_tick, EVENT_PAUSE)
                 elif event.key == pygame.K_ESCAPE:
                     self.game_state = 'menu'
+                    self.save_replay()
 
             elif self.game_state == 'paused':
                 if event.key == pygame.K_p:
                     self.game_state = 'playing'
+                    self.recorder.record(self.sim_tick, EVENT_RESUME)
                 elif event.key == pygame.K_ESCAPE:
                     self.game_state = 'menu'
+                    self.save_replay()
 
             elif self.game_state == 'game_over':
                 if event.key == pygame.K_r:
-                    self.reset_game()
                     self.game_state = 'playing'
+                    self.reset_game()
                 elif event.key == pygame.K_ESCAPE:
                     self.game_state = 'menu'
 
+            elif self.game_state == 'loading':
+                if event.key == pygame.K_ESCAPE:
+                    # 后台线程继续生成，结果留在缓存中，下次进入时直接使用
+                    self.maze_loader = None
+                    self.game_state = 'menu'
+
     def update_game(self, dt: float):
         """更新游戏逻辑"""
         if self.game_state != 'playing':
             return
 
-        self.game_time += dt
-
-        # 更新道具效果
-        self.update_effects()
-
-        # 检查生存成就
-        if self.game_time > 300:  # 5分钟
-            self.achievements.check_achievement('survivor')
-
-        # 生成道具
-        if (time.time() - self.last_powerup_spawn > 10 and
-            random.random() < 0.3):  # 30%概率每10秒
-            self.spawn_powerup()
-            self.last_powerup_spawn = time.time()
-
-        # 更新道具
-        for powerup in self.powerups[:]:
-            powerup.lifetime -= dt
-            if powerup.lifetime <= 0:
-                self.powerups.remove(powerup)
-
-        # 移动蛇（如果没有被冰冻）
-        if not self.frozen and time.time() - self.last_move_time > 1.0 / self.speed:
-            self.move_snake()
-            self.last_move_time = time.time()
-
-        # 更新AI蛇（对战模式）
-        if self.game_mode == GameMode.BATTLE:
-            self.update_ai_snake()
+        # 按固定步长推进模拟并处理模拟事件（与录像回放的步进完全一致）
+        self.sim_accumulator += min(dt, MAX_FRAME_TIME)
+        while self.sim_accumulator >= TICK_DT and self.game_state == 'playing':
+            self.sim_accumulator -= TICK_DT
+            self.sim.update(TICK_DT)
+            self.sim_tick += 1
+            self.process_sim_events()
 
         # 更新粒子系统
         self.particle_system.update(dt)
@@ -316,132 +291,52 @@ class UltimateSnakeGame:
         if self.screen_shake > 0:
             self.screen_shake -= dt * 10
 
-    def move_snake(self):
-        """移动蛇"""
-        # 计算新头部位置
-        head_x, head_y = self.snake_body[0]
-        dx, dy = self.snake_direction.value
-        new_head = (head_x + dx, head_y + dy)
-
-        # 边界处理
-        if self.game_mode == GameMode.CLASSIC:
-            # 经典模式：穿墙
-            new_head = (new_head[0] % self.GRID_WIDTH, new_head[1] % self.GRID_HEIGHT)
-        else:
-            # 其他模式：撞墙死亡
-            if (new_head[0] < 0 or new_head[0] >= self.GRID_WIDTH or
-                new_head[1] < 0 or new_head[1] >= self.GRID_HEIGHT):
-                if not self.invincible:
-                    self.game_over()
-                    return
-                else:
-                    # 无敌状态下反弹
-                    new_head = (head_x, head_y)
-                    self.snake_direction = Direction((-dx, -dy))
-
-        # 检查撞到自己
-        if new_head in self.snake_body[1:] and not self.invincible:
-            self.game_over()
-            return
-
-        # 检查撞到墙壁
-        if new_head in self.walls and not self.invincible:
-            self.game_over()
-            return
-
-        # 添加新头部
-        self.snake_body.insert(0, new_head)
-
-        # 添加尾迹效果
-        head_pixel_x = new_head[0] * self.GRID_SIZE + self.GRID_SIZE // 2
-        head_pixel_y = new_head[1] * self.GRID_SIZE + self.GRID_SIZE // 2
-        self.particle_system.add_trail(head_pixel_x, head_pixel_y,
-                                     self.snake_skin.skins[self.snake_skin.current_skin]['head'])
-
-        # 检查吃到食物
-        if new_head == self.food_pos:
-            self.eat_food()
-        else:
-            # 检查吃到道具
-            for powerup in self.powerups[:]:
-                if new_head == powerup.pos:
-                    self.apply_powerup(powerup)
-                    self.powerups.remove(powerup)
-
-                    # 粒子效果
-                    pixel_x = powerup.pos[0] * self.GRID_SIZE + self.GRID_SIZE // 2
-                    pixel_y = powerup.pos[1] * self.GRID_SIZE + self.GRID_SIZE // 2
-                    self.particle_system.add_explosion(pixel_x, pixel_y, powerup.color, 20)
-                    break
-
-            # 移除尾部（如果没有待生长的段）
-            if self.grow_pending > 0:
-                self.grow_pending -= 1
-            else:
-                self.snake_body.pop()
-
-    def eat_food(self):
-        """吃到食物"""
-        self.score += 10 * self.level
-
-        # 双倍分数效果
-        if PowerUpType.DOUBLE_SCORE in self.active_effects:
-            self.score += 10 * self.level
-
-        self.food_eaten += 1
-        self.stats['total_food_eaten'] += 1
-        self.grow_pending += 1
-
-        # 生成新食物
-        self.food_pos = self.generate_food()
-
-        # 增加速度和等级
-        if self.food_eaten % 5 == 0:
-            self.level += 1
-            self.base_speed = min(25, self.base_speed + 1)
-            if PowerUpType.SPEED_BOOST not in self.active_effects and PowerUpType.SLOW_MOTION not in self.active_effects:
-                self.speed = self.base_speed
-
-        # 音效和粒子效果
-        self.sound_manager.play('eat')
-        food_pixel_x = self.food_pos[0] * self.GRID_SIZE + self.GRID_SIZE // 2
-        food_pixel_y = self.food_pos[1] * self.GRID_SIZE + self.GRID_SIZE // 2
-        self.particle_system.add_explosion(food_pixel_x, food_pixel_y, (255, 255, 0), 15)
-
-        # 检查成就
-        self.achievements.check_achievement('first_food', self.food_eaten >= 1)
-        self.achievements.check_achievement('century', self.food_eaten >= 100)
-
-        if self.speed >= 25:
-            self.achievements.check_achievement('speed_demon')
-
-    def update_ai_snake(self):
-        """更新AI蛇"""
-        # 简单AI：朝食物移动
-        obstacles = self.snake_body + self.walls
-        new_direction = self.ai_snake.find_path_to_food(self.food_pos, obstacles)
-
-        if new_direction:
-            self.ai_snake.direction = new_direction
-
-            # 移动AI蛇
-            head_x, head_y = self.ai_snake.body[0]
-            dx, dy = self.ai_snake.direction.value
-            new_head = (head_x + dx, head_y + dy)
-
-            # 边界检查
-            if (0 <= new_head[0] < self.GRID_WIDTH and
-                0 <= new_head[1] < self.GRID_HEIGHT and
-                new_head not in self.ai_snake.body and
-                new_head not in self.walls):
-
-                self.ai_snake.body.insert(0, new_head)
-
-                # 检查AI吃到食物
-                if new_head == self.food_pos:
-                    self.food_pos = self.generate_food()
-                else:
-                    self.ai_snake.body.pop()
+    def process_sim_events(self):
+        """把模拟事件转换为音效、粒子效果、成就和统计"""
+        sim = self.sim
+        for event_type, data in sim.drain_events():
+            if event_type == 'move':
+                # 添加尾迹效果
+                head_pixel_x = data[0] * self.GRID_SIZE + self.GRID_SIZE // 2
+                head_pixel_y = data[1] * self.GRID_SIZE + self.GRID_SIZE // 2
+                self.particle_system.add_trail(head_pixel_x, head_pixel_y,
+                                             self.snake_skin.skins[self.snake_skin.current_skin]['head'])
+
+            elif event_type == 'eat':
+                self.stats['total_food_eaten'] += 1
+
+                # 音效和粒子效果
+                self.sound_manager.play('eat')
+                food_pixel_x = data[0] * self.GRID_SIZE + self.GRID_SIZE // 2
+                food_pixel_y = data[1] * self.GRID_SIZE + self.GRID_SIZE // 2
+                self.particle_system.add_explosion(food_pixel_x, food_pixel_y, (255, 255, 0), 15)
+
+                # 检查成就
+                self.achievements.check_achievement('first_food', sim.food_eaten >= 1)
+                self.achievements.check_achievement('century', sim.food_eaten >= 100)
+
+                if sim.speed >= 25:
+                    self.achievements.check_achievement('speed_demon')
+
+            elif event_type == 'powerup':
+                self.achievements.used_powerups.add(data.type)
+                self.powerups_used.add(data.type.name)
+                self.sound_manager.play('powerup')
+
+                # 检查道具大师成就
+                if len(self.achievements.used_powerups) >= len(PowerUpType):
+                    self.achievements.check_achievement('powerup_master')
+
+                # 粒子效果
+                pixel_x = data.pos[0] * self.GRID_SIZE + self.GRID_SIZE // 2
+                pixel_y = data.pos[1] * self.GRID_SIZE + self.GRID_SIZE // 2
+                self.particle_system.add_explosion(pixel_x, pixel_y, data.color, 20)
+
+            elif event_type == 'survived':
+                self.achievements.check_achievement('survivor')
+
+            elif event_type == 'game_over':
+                self.game_over()
 
     def game_over(self):
         """游戏结束"""
@@ -452,198 +347,506 @@ class UltimateSnakeGame:
         self.screen_shake = 1.0
 
         # 爆炸效果
-        for segment in self.snake_body:
+        for segment in self.sim.snake_body:
             pixel_x = segment[0] * self.GRID_SIZE + self.GRID_SIZE // 2
             pixel_y = segment[1] * self.GRID_SIZE + self.GRID_SIZE // 2
             self.particle_system.add_explosion(pixel_x, pixel_y, (255, 0, 0), 10)
 
         # 更新统计
-        if self.score > self.stats['highest_score']:
-            self.stats['highest_score'] = self.score
+        if self.sim.score > self.stats['highest_score']:
+            self.stats['highest_score'] = self.sim.score
 
         self.save_stats()
-
-    def save_stats(self):
-        """保存统计数据"""
+        self.save_replay()
+
+        # 记录本局历史（入队后由后台线程写入数据库）
+        self.leaderboard.record(GameRecord(
+            mode=self.game_mode.name,
+            skin=self.snake_skin.current_skin,
+            score=self.sim.score,
+            level=self.sim.level,
+            length=len(self.sim.snake_body),
+            duration=self.sim.game_time,
+            powerups=','.join(sorted(self.powerups_used))
+        ))
+
+    def save_replay(self):
+        """结束录制并把这一局的录像保存到录像目录"""
+        replay = self.recorder.finish(self.sim, self.sim_tick)
+        if replay is None or not replay.ticks:
+            return
+        name = f"{time.strftime('%Y%m%d_%H%M%S')}_{replay.mode.name.lower()}_{replay.seed:016x}.snkr"
         try:
-            with open('snake_stats.json', 'w') as f:
-                json.dump(self.stats, f)
-        except:
+            os.makedirs(self.replay_dir, exist_ok=True)
+            replay.save(os.path.join(self.replay_dir, name))
+        except OSError:
             pass  # 忽略保存错误
 
+    def save_stats(self):
+        """保存统计数据（追加日志后由后台线程写入，不阻塞游戏循环）"""
+        self.stats_store.commit()
+
     def load_stats(self):
-        """加载统计数据"""
-        try:
-            if os.path.exists('snake_stats.json'):
-                with open('snake_stats.json', 'r') as f:
-                    self.stats.update(json.load(f))
-        except:
-            pass  # 忽略加载错误
+        """加载统计数据（快照加日志恢复）"""
+        self.stats = self.stats_store.load()
+
+    def draw_background(self, area: Optional[pygame.Rect] = None, offset: Tuple[int, int] = (0, 0)):
+        """绘制背景、网格线和墙壁（给定area时只恢复该区域）"""
+        layer = self.get_background_layer()
+        if area is not None:
+            self.screen.blit(layer, area, area)
+            return
 
-    def render_game(self):
-        """渲染游戏"""
-        # 屏幕震动效果
-        shake_x = shake_y = 0
-        if self.screen_shake > 0:
-            shake_x = random.randint(-int(self.screen_shake * 10), int(self.screen_shake * 10))
-            shake_y = random.randint(-int(self.screen_shake * 10), int(self.screen_shake * 10))
+        self.screen.blit(layer, offset)
+
+        # 震动时图层移开后露出的边缘（图层多出的一行一列是网格线的端点）
+        shake_x, shake_y = offset
+        if shake_x > 0:
+            self.screen.fill((20, 20, 40), (0, 0, shake_x, self.WINDOW_HEIGHT))
+        elif shake_x < -1:
+            self.screen.fill((20, 20, 40), (self.WINDOW_WIDTH + shake_x + 1, 0, -shake_x - 1, self.WINDOW_HEIGHT))
+        if shake_y > 0:
+            self.screen.fill((20, 20, 40), (0, 0, self.WINDOW_WIDTH, shake_y))
+        elif shake_y < -1:
+            self.screen.fill((20, 20, 40), (0, self.WINDOW_HEIGHT + shake_y + 1, self.WINDOW_WIDTH, -shake_y - 1))
+
+    def get_background_layer(self) -> pygame.Surface:
+        """静态背景图层（背景色、网格线和墙壁）
+
+        只在墙壁（wall_version）、游戏模式或格子大小变化时重新合成，
+        每帧只需一次贴图。
+        """
+        sim = self.sim
+        key = (sim.grid.wall_version, sim.game_mode, self.GRID_SIZE)
+        if self._background is not None and self._background_key == key:
+            return self._background
+
+        layer = pygame.Surface((self.WINDOW_WIDTH + 1, self.WINDOW_HEIGHT + 1)).convert()
 
         # 背景
-        self.screen.fill((20, 20, 40))
+        layer.fill((20, 20, 40))
 
         # 网格线（可选）
-        if self.game_mode == GameMode.ZEN:
+        if sim.game_mode == GameMode.ZEN:
             for x in range(0, self.WINDOW_WIDTH, self.GRID_SIZE):
-                pygame.draw.line(self.screen, (40, 40, 60),
-                               (x + shake_x, shake_y), (x + shake_x, self.WINDOW_HEIGHT + shake_y))
+                pygame.draw.line(layer, (40, 40, 60), (x, 0), (x, self.WINDOW_HEIGHT))
             for y in range(0, self.WINDOW_HEIGHT, self.GRID_SIZE):
-                pygame.draw.line(self.screen, (40, 40, 60),
-                               (shake_x, y + shake_y), (self.WINDOW_WIDTH + shake_x, y + shake_y))
+                pygame.draw.line(layer, (40, 40, 60), (0, y), (self.WINDOW_WIDTH, y))
 
         # 渲染墙壁
-        for wall in self.walls:
-            wall_rect = pygame.Rect(wall[0] * self.GRID_SIZE + shake_x,
-                                  wall[1] * self.GRID_SIZE + shake_y,
+        for wall in sim.walls:
+            wall_rect = pygame.Rect(wall[0] * self.GRID_SIZE, wall[1] * self.GRID_SIZE,
                                   self.GRID_SIZE, self.GRID_SIZE)
-            pygame.draw.rect(self.screen, (100, 100, 100), wall_rect)
-            pygame.draw.rect(self.screen, (150, 150, 150), wall_rect, 2)
-
-        # 渲染食物
-        food_rect = pygame.Rect(self.food_pos[0] * self.GRID_SIZE + shake_x,
-                              self.food_pos[1] * self.GRID_SIZE + shake_y,
-                              self.GRID_SIZE, self.GRID_SIZE)
-
-        # 食物发光效果
-        glow_rect = food_rect.inflate(6, 6)
-        temp_surface = pygame.Surface(glow_rect.size, pygame.SRCALPHA)
-        pygame.draw.ellipse(temp_surface, (255, 100, 100, 100),
-                          (0, 0, glow_rect.width, glow_rect.height))
-        self.screen.blit(temp_surface, glow_rect.topleft)
-
-        pygame.draw.ellipse(self.screen, (255, 50, 50), food_rect)
-        pygame.draw.ellipse(self.screen, (255, 150, 150), food_rect, 3)
-
-        # 渲染道具
-        for powerup in self.powerups:
-            powerup_rect = pygame.Rect(powerup.pos[0] * self.GRID_SIZE + shake_x,
-                                     powerup.pos[1] * self.GRID_SIZE + shake_y,
-                                     self.GRID_SIZE, self.GRID_SIZE)
-
-            # 道具闪烁效果
-            alpha = int(127 + 127 * math.sin(time.time() * 5))
-            temp_surface = pygame.Surface((self.GRID_SIZE, self.GRID_SIZE), pygame.SRCALPHA)
-            pygame.draw.ellipse(temp_surface, (*powerup.color, alpha),
-                              (0, 0, self.GRID_SIZE, self.GRID_SIZE))
-            self.screen.blit(temp_surface, powerup_rect.topleft)
-
-            # 道具图标（简单文字）
-            icon_text = {
-                PowerUpType.SPEED_BOOST: "S",
-                PowerUpType.SLOW_MOTION: "T",
-                PowerUpType.INVINCIBLE: "I",
-                PowerUpType.DOUBLE_SCORE: "2",
-                PowerUpType.SHRINK: "↓",
-                PowerUpType.TELEPORT: "T",
-                PowerUpType.FREEZE: "F"
-            }
-
-            icon = self.font_small.render(icon_text[powerup.type], True, (255, 255, 255))
-            icon_rect = icon.get_rect(center=powerup_rect.center)
-            self.screen.blit(icon, icon_rect)
-
-        # 渲染蛇
-        current_time = time.time()
-        for i, segment in enumerate(self.snake_body):
-            segment_rect = pygame.Rect(segment[0] * self.GRID_SIZE + shake_x,
-                                     segment[1] * self.GRID_SIZE + shake_y,
-                                     self.GRID_SIZE, self.GRID_SIZE)
-
-            is_head = (i == 0)
-            self.snake_skin.render_segment(self.screen, segment_rect, is_head,
-                                         i, len(self.snake_body), current_time)
+            pygame.draw.rect(layer, (100, 100, 100), wall_rect)
+            pygame.draw.rect(layer, (150, 150, 150), wall_rect, 2)
+
+        self._background = layer
+        self._background_key = key
+        self.dirty_rects.request_full_redraw()
+        return layer
+
+    def cells_in_area(self, area: pygame.Rect) -> Tuple[int, int, int, int]:
+        """与屏幕区域相交（含发光溢出）的格子范围 (x0, y0, x1, y1)，右下不含"""
+        pad = self.dirty_rects.padding
+        x0 = max(0, (area.left - pad) // self.GRID_SIZE)
+        y0 = max(0, (area.top - pad) // self.GRID_SIZE)
+        x1 = min(self.sim.GRID_WIDTH, (area.right + pad - 1) // self.GRID_SIZE + 1)
+        y1 = min(self.sim.GRID_HEIGHT, (area.bottom + pad - 1) // self.GRID_SIZE + 1)
+        return x0, y0, x1, y1
+
+    def cell_rect(self, pos: Tuple[int, int], offset: Tuple[int, int] = (0, 0)) -> pygame.Rect:
+        """格子对应的屏幕矩形"""
+        return pygame.Rect(pos[0] * self.GRID_SIZE + offset[0],
+                           pos[1] * self.GRID_SIZE + offset[1],
+                           self.GRID_SIZE, self.GRID_SIZE)
+
+    def get_food_tile(self) -> pygame.Surface:
+        """食物贴图（发光外圈加食物本体，预渲染一次，四周各比格子大3像素）"""
+        if self._food_tile is None or self._food_tile.get_width() != self.GRID_SIZE + 6:
+            tile = pygame.Surface((self.GRID_SIZE + 6, self.GRID_SIZE + 6), pygame.SRCALPHA)
+            # 直接画进透明表面，像素值与半透明精灵相同，不经过混合
+            pygame.draw.ellipse(tile, (255, 100, 100, 100), tile.get_rect())
+            food_rect = pygame.Rect(3, 3, self.GRID_SIZE, self.GRID_SIZE)
+            pygame.draw.ellipse(tile, (255, 50, 50), food_rect)
+            pygame.draw.ellipse(tile, (255, 150, 150), food_rect, 3)
+            self._food_tile = tile
+        return self._food_tile
+
+    def draw_food(self, food_rect: pygame.Rect):
+        """绘制食物"""
+        self.screen.blit(self.get_food_tile(), (food_rect.x - 3, food_rect.y - 3))
+
+    def draw_food_layer(self, offset: Tuple[int, int], region: Optional[Tuple[int, int, int, int]] = None):
+        """盛宴模式：按食物掩码一次性批量贴图（region 为格子范围，默认整个棋盘）"""
+        mask = self.sim.food_mask
+        if mask is None or not self.sim.food_count:
+            return
+        x0, y0, x1, y1 = region or (0, 0, self.sim.GRID_WIDTH, self.sim.GRID_HEIGHT)
+        ys, xs = np.nonzero(mask[y0:y1, x0:x1])
+        if not len(xs):
+            return
+        size = self.GRID_SIZE
+        pixel_x = (xs + x0) * size + (offset[0] - 3)
+        pixel_y = (ys + y0) * size + (offset[1] - 3)
+        tile = self.get_food_tile()
+        self.screen.blits([(tile, pos) for pos in zip(pixel_x.tolist(), pixel_y.tolist())],
+                          doreturn=False)
+
+    def draw_powerup(self, powerup: PowerUp, powerup_rect: pygame.Rect):
+        """绘制道具"""
+        # 道具闪烁效果
+        alpha = int(127 + 127 * math.sin(time.time() * 5))
+        blink = sprite_atlas.get('ellipse', (self.GRID_SIZE, self.GRID_SIZE), powerup.color, alpha)
+        self.screen.blit(blink, powerup_rect.topleft)
+
+        # 道具图标（简单文字）
+        icon = text_cache.render(self.font_small, POWERUP_ICONS[powerup.type], (255, 255, 255))
+        icon_rect = icon.get_rect(center=powerup_rect.center)
+        self.screen.blit(icon, icon_rect)
+
+    def draw_pickups(self, pickups: Iterable, offset: Tuple[int, int] = (0, 0)):
+        """绘制拾取物（食物在下层，道具在上层，与脏矩形重绘的顺序一致）"""
+        powerups = []
+        for pickup in pickups:
+            if isinstance(pickup, Food):
+                self.draw_food(self.cell_rect(pickup.pos, offset))
+            else:
+                powerups.append(pickup)
+        for powerup in powerups:
+            self.draw_powerup(powerup, self.cell_rect(powerup.pos, offset))
+
+    def snake_segment_rects(self, indices: List[int], offset: Tuple[int, int] = (0, 0),
+                            alpha: float = 1.0) -> List[pygame.Rect]:
+        """玩家蛇各段的屏幕矩形
+
+        alpha < 1 时在上一逻辑帧和当前逻辑帧之间插值：第 i 段上一帧
+        在第 i+1 段的位置，最后一段上一帧在刚移除的尾部。穿墙、传送等
+        跳跃超过一格的段不插值。
+        """
+        body = self.sim.snake_body
+        if alpha >= 1.0:
+            return [self.cell_rect(body[i], offset) for i in indices]
+
+        size = self.GRID_SIZE
+        last = len(body) - 1
+        previous_tail = self.sim.previous_tail
+        rects = []
+        for i in indices:
+            x, y = body[i]
+            if i < last:
+                px, py = body[i + 1]
+            else:
+                px, py = previous_tail if previous_tail is not None else (x, y)
+            if abs(x - px) + abs(y - py) == 1:
+                x = px + (x - px) * alpha
+                y = py + (y - py) * alpha
+            rects.append(pygame.Rect(round(x * size) + offset[0], round(y * size) + offset[1],
+                                     size, size))
+        return rects
+
+    def draw_snake(self, indices: List[int], current_time: float, offset: Tuple[int, int] = (0, 0),
+                   alpha: float = 1.0):
+        """按顺序绘制玩家蛇的若干段（indices 升序）：蛇头单独绘制，身体批量绘制"""
+        total = len(self.sim.snake_body)
+        rects = self.snake_segment_rects(indices, offset, alpha)
+        if indices and indices[0] == 0:
+            head_rect = rects[0]
+            self.snake_skin.render_head(self.screen, head_rect, self.sim.snake_direction)
 
             # 无敌效果
-            if self.invincible and is_head:
-                glow_rect = segment_rect.inflate(4, 4)
-                temp_surface = pygame.Surface(glow_rect.size, pygame.SRCALPHA)
+            if self.sim.invincible:
+                glow_rect = head_rect.inflate(4, 4)
                 alpha = int(100 + 100 * math.sin(time.time() * 10))
-                pygame.draw.rect(temp_surface, (255, 255, 0, alpha),
-                               (0, 0, glow_rect.width, glow_rect.height), border_radius=8)
-                self.screen.blit(temp_surface, glow_rect.topleft)
+                glow = sprite_atlas.get('rect', glow_rect.size, (255, 255, 0), alpha, border_radius=8)
+                self.screen.blit(glow, glow_rect.topleft)
+            indices = indices[1:]
+            rects = rects[1:]
 
-        # 渲染AI蛇（对战模式）
-        if self.game_mode == GameMode.BATTLE:
-            for i, segment in enumerate(self.ai_snake.body):
-                segment_rect = pygame.Rect(segment[0] * self.GRID_SIZE + shake_x,
-                                         segment[1] * self.GRID_SIZE + shake_y,
-                                         self.GRID_SIZE, self.GRID_SIZE)
+        self.snake_skin.render_body(self.screen, rects, indices, total, current_time)
+
+    def draw_ai_segment(self, segment_rect: pygame.Rect, is_head: bool):
+        """绘制AI蛇的一段"""
+        color = (255, 100, 100) if is_head else (200, 80, 80)
+        pygame.draw.rect(self.screen, color, segment_rect, border_radius=5)
 
-                color = (255, 100, 100) if i == 0 else (200, 80, 80)
-                pygame.draw.rect(self.screen, color, segment_rect, border_radius=5)
+    def render_overlays(self, offset: Tuple[int, int] = (0, 0)) -> List[pygame.Rect]:
+        """渲染粒子、UI和成就通知，返回这些每帧变化的区域"""
+        regions = []
 
-        # 渲染粒子效果
-        self.particle_system.render(self.screen)
+        # 渲染粒子效果（粒子使用棋盘像素坐标）
+        self.particle_system.render(self.screen, offset)
+        particle_bounds = self.particle_system.bounds()
+        if particle_bounds is not None:
+            regions.append(particle_bounds)
 
         # 渲染UI
-        self.render_ui()
+        regions.extend(self.render_ui())
 
         # 渲染成就通知
         current_time = time.time()
         self.achievements.update_notifications(current_time)
-        self.achievements.render_notifications(self.screen, self.font_small)
+        regions.extend(self.achievements.render_notifications(self.screen, self.font_small))
+        return regions
+
+    def render_game(self):
+        """渲染游戏"""
+        sim = self.sim
+
+        # 屏幕震动效果
+        shake = (0, 0)
+        if self.screen_shake > 0:
+            shake = (random.randint(-int(self.screen_shake * 10), int(self.screen_shake * 10)),
+                     random.randint(-int(self.screen_shake * 10), int(self.screen_shake * 10)))
+
+        alpha = sim.move_alpha if self.interpolate else 1.0
+        if self.camera is not None:
+            return self.render_board_view(shake, alpha)
+
+        # 背景、网格线和墙壁
+        self.draw_background(offset=shake)
+
+        # 渲染食物和道具（棋盘已满时没有食物）
+        self.draw_food_layer(shake)
+        self.draw_pickups(sim.pickups, shake)
+
+        # 渲染蛇
+        self.draw_snake(list(range(len(sim.snake_body))), time.time(), shake, alpha)
+
+        # 渲染AI蛇（对战模式）
+        for ai_snake in sim.ai_snakes:
+            for i, segment in enumerate(ai_snake.body):
+                self.draw_ai_segment(self.cell_rect(segment, shake), i == 0)
+
+        # 粒子、UI和成就通知
+        return self.render_overlays()
+
+    def render_board_view(self, shake: Tuple[int, int], alpha: float):
+        """渲染大棋盘：摄像机跟随蛇头，只绘制视口内的块和物体"""
+        sim = self.sim
+        camera = self.camera
+        camera.follow(self.snake_segment_rects([0], (0, 0), alpha)[0].center)
+        offset = (shake[0] - camera.x, shake[1] - camera.y)
+
+        # 背景块（震动时多画一圈，避免边缘露底）
+        self.draw_chunks(offset, margin=1 if shake != (0, 0) else 0)
+
+        # 视口裁剪（多留一格，覆盖插值和震动的偏移）
+        x0, y0, x1, y1 = camera.visible_cells(self.GRID_SIZE)
+        self.draw_food_layer(offset, (x0, y0, x1, y1))
+        self.draw_pickups(sim.pickups.in_region(x0, y0, x1, y1), offset)
+
+        indices = [i for i, (x, y) in enumerate(sim.snake_body) if x0 <= x < x1 and y0 <= y < y1]
+        self.draw_snake(indices, time.time(), offset, alpha)
+
+        return self.render_overlays(camera.offset)
+
+    def draw_chunks(self, offset: Tuple[int, int], margin: int = 0):
+        """绘制视口内的背景块，并提前绘制视口外一圈的块"""
+        sim = self.sim
+        self.chunk_cache.validate((sim.grid.wall_version, sim.game_mode, self.GRID_SIZE))
+        chunk_pixels = sim.grid.chunk_size * self.GRID_SIZE
+
+        self.screen.fill(OUTSIDE_COLOR)
+        for cx, cy in self.camera.visible_chunks(chunk_pixels, margin):
+            self.screen.blit(self.chunk_cache.get(cx, cy),
+                             (cx * chunk_pixels + offset[0], cy * chunk_pixels + offset[1]))
+        self.chunk_cache.prefetch(self.camera.visible_chunks(chunk_pixels, margin + 1))
+
+        # 棋盘边界
+        left, top = offset[0] - 1, offset[1] - 1
+        right = offset[0] + sim.GRID_WIDTH * self.GRID_SIZE
+        bottom = offset[1] + sim.GRID_HEIGHT * self.GRID_SIZE
+        for start, end in (((left, top), (right, top)), ((left, bottom), (right, bottom)),
+                           ((left, top), (left, bottom)), ((right, top), (right, bottom))):
+            pygame.draw.line(self.screen, (80, 80, 120), start, end)
+
+    def render_chunk(self, cx: int, cy: int) -> pygame.Surface:
+        """绘制大棋盘的一块背景（背景色、网格线和墙壁）"""
+        sim = self.sim
+        grid = sim.grid
+        size = self.GRID_SIZE
+        cells = grid.chunk_size
+        surface = pygame.Surface((cells * size, cells * size)).convert()
+        surface.fill(OUTSIDE_COLOR)
+
+        # 棋盘内的部分（右侧和底部的块可能不满）
+        width = min(cells, sim.GRID_WIDTH - cx * cells)
+        height = min(cells, sim.GRID_HEIGHT - cy * cells)
+        surface.fill((20, 20, 40), pygame.Rect(0, 0, width * size, height * size))
+
+        # 网格线（可选）
+        if sim.game_mode == GameMode.ZEN:
+            for i in range(width):
+                pygame.draw.line(surface, (40, 40, 60), (i * size, 0), (i * size, height * size))
+            for i in range(height):
+                pygame.draw.line(surface, (40, 40, 60), (0, i * size), (width * size, i * size))
+
+        # 墙壁（直接读取分块网格）
+        view = grid.chunk_array(cx, cy)
+        if view is not None:
+            ys, xs = np.nonzero(view & WALL)
+            for x, y in zip(xs.tolist(), ys.tolist()):
+                wall_rect = pygame.Rect(x * size, y * size, size, size)
+                pygame.draw.rect(surface, (100, 100, 100), wall_rect)
+                pygame.draw.rect(surface, (150, 150, 150), wall_rect, 2)
+        return surface
+
+    def render_game_dirty(self) -> Optional[List[pygame.Rect]]:
+        """脏矩形渲染：只重绘变化的格子和UI区域
+
+        返回需要提交的矩形列表；屏幕震动、大量粒子、状态切换或脏区域
+        过多时退回整屏重绘并返回None（调用方使用flip）。
+        """
+        sim = self.sim
+        tracker = self.dirty_rects
+        changes = sim.grid.drain_changes()
+        self.get_background_layer()
+
+        view_key = (sim.game_mode, self.snake_skin.current_skin)
+        if view_key != self._dirty_view_key:
+            self._dirty_view_key = view_key
+            tracker.request_full_redraw()
+        if self.screen_shake > 0 or len(self.particle_system) > self.DIRTY_PARTICLE_LIMIT:
+            tracker.request_full_redraw()
+
+        if not tracker.full_redraw:
+            width = sim.grid.width
+            tracker.mark_cells((i % width, i // width) for i in changes)
+
+            # 蛇头的眼睛随蛇头移动，旧蛇头变成身体；动态皮肤每帧都在变
+            if self.snake_skin.is_animated():
+                tracker.mark_cells(sim.snake_body)
+            elif len(sim.snake_body):
+                tracker.mark_cell(sim.snake_body.head)
+            tracker.mark_cells(self._last_heads)
+
+            # 道具一直在闪烁
+            tracker.mark_cells(powerup.pos for powerup in sim.pickups.of_kind(PowerUp))
+            for ai_snake in sim.ai_snakes:
+                tracker.mark_cell(ai_snake.body[0])
+
+            rects = tracker.collect()
+            if len(rects) > tracker.max_rects:
+                tracker.request_full_redraw()
+
+        if tracker.full_redraw:
+            regions = self.render_game()
+            for region in regions:
+                tracker.mark_rect(region, volatile=True)
+            tracker.finish_full_redraw()
+            self._remember_heads()
+            return None
+
+        screen_rect = self.screen.get_rect()
+        rects = [rect.clip(screen_rect) for rect in rects]
+        rects = [rect for rect in rects if rect.width and rect.height]
+        self.redraw_areas(rects)
+        self.screen.set_clip(None)
+
+        # 本帧新画的覆盖层也要提交；标记为易变只是为了下一帧擦除
+        for region in self.render_overlays():
+            tracker.mark_rect(region, volatile=True)
+            region = region.clip(screen_rect)
+            if region.width and region.height:
+                rects.append(region)
+        self._remember_heads()
+        return rects
+
+    def redraw_areas(self, rects: List[pygame.Rect]):
+        """按图层顺序重绘每个脏矩形内的背景、食物、道具和蛇"""
+        sim = self.sim
+        grid = sim.grid
+        snake_index = {}
+        for i, segment in enumerate(sim.snake_body):
+            snake_index.setdefault(segment, i)
+        ai_heads = {ai_snake.body[0] for ai_snake in sim.ai_snakes}
+        current_time = time.time()
+
+        for rect in rects:
+            self.screen.set_clip(rect)
+            self.draw_background(rect)
+
+            x0, y0, x1, y1 = self.cells_in_area(rect)
+            cells = [(x, y, grid.get(x, y)) for y in range(y0, y1) for x in range(x0, x1)]
+            for x, y, flags in cells:
+                if flags & FOOD:
+                    self.draw_food(self.cell_rect((x, y)))
+            for x, y, flags in cells:
+                if flags & POWERUP:
+                    self.draw_powerup(sim.pickups.get((x, y)), self.cell_rect((x, y)))
+            segments = sorted(snake_index[(x, y)] for x, y, flags in cells
+                              if flags & SNAKE and (x, y) in snake_index)
+            self.draw_snake(segments, current_time)
+            for x, y, flags in cells:
+                if flags & AI_SNAKE:
+                    self.draw_ai_segment(self.cell_rect((x, y)), (x, y) in ai_heads)
+
+    def _remember_heads(self):
+        """记录本帧的蛇头位置，下一帧它们会变成身体"""
+        heads = [ai_snake.body[0] for ai_snake in self.sim.ai_snakes]
+        if len(self.sim.snake_body):
+            heads.append(self.sim.snake_body.head)
+        self._last_heads = heads
+
+    def render_ui(self) -> List[pygame.Rect]:
+        """渲染用户界面，返回左侧面板和右上角各自覆盖的区域"""
+        sim = self.sim
+        drawn = []
 
-    def render_ui(self):
-        """渲染用户界面"""
         # 分数
-        score_text = self.font_medium.render(f"分数: {self.score}", True, (255, 255, 255))
-        self.screen.blit(score_text, (10, 10))
+        score_text = text_cache.render(self.font_medium, f"分数: {sim.score}", (255, 255, 255))
+        drawn.append(self.screen.blit(score_text, (10, 10)))
 
         # 等级
-        level_text = self.font_small.render(f"等级: {self.level}", True, (200, 200, 255))
-        self.screen.blit(level_text, (10, 50))
+        level_text = text_cache.render(self.font_small, f"等级: {sim.level}", (200, 200, 255))
+        drawn.append(self.screen.blit(level_text, (10, 50)))
 
         # 食物计数
-        food_text = self.font_small.render(f"食物: {self.food_eaten}", True, (255, 200, 200))
-        self.screen.blit(food_text, (10, 75))
+        food_text = text_cache.render(self.font_small, f"食物: {sim.food_eaten}", (255, 200, 200))
+        drawn.append(self.screen.blit(food_text, (10, 75)))
 
         # 速度
-        speed_text = self.font_small.render(f"速度: {self.speed}", True, (200, 255, 200))
-        self.screen.blit(speed_text, (10, 100))
+        speed_text = text_cache.render(self.font_small, f"速度: {sim.speed}", (200, 255, 200))
+        drawn.append(self.screen.blit(speed_text, (10, 100)))
 
         # 游戏模式
-        mode_text = self.font_small.render(f"模式: {self.game_mode.value}", True, (255, 255, 200))
-        self.screen.blit(mode_text, (10, 125))
+        mode_text = text_cache.render(self.font_small, f"模式: {sim.game_mode.value}", (255, 255, 200))
+        drawn.append(self.screen.blit(mode_text, (10, 125)))
 
         # 皮肤
-        skin_text = self.font_small.render(f"皮肤: {self.snake_skin.current_skin.title()}", True, (255, 200, 255))
-        self.screen.blit(skin_text, (10, 150))
+        skin_text = text_cache.render(self.font_small, f"皮肤: {self.snake_skin.current_skin.title()}", (255, 200, 255))
+        drawn.append(self.screen.blit(skin_text, (10, 150)))
 
         # 活跃效果
         y_offset = 180
-        for effect_type, end_time in self.active_effects.items():
-            remaining = max(0, end_time - time.time())
-            effect_text = self.font_small.render(f"{effect_type.value}: {remaining:.1f}s", True, (255, 255, 0))
-            self.screen.blit(effect_text, (10, y_offset))
+        for effect_type in sim.active_effects:
+            remaining = sim.effect_remaining(effect_type)
+            effect_text = text_cache.render(self.font_small, f"{effect_type.value}: {remaining:.1f}s", (255, 255, 0))
+            drawn.append(self.screen.blit(effect_text, (10, y_offset)))
             y_offset += 20
 
+        panel = drawn[0].unionall(drawn[1:])
+        drawn = []
+
         # 最高分（右上角）
-        high_score_text = self.font_small.render(f"最高分: {self.stats['highest_score']}", True, (255, 215, 0))
-        self.screen.blit(high_score_text, (self.WINDOW_WIDTH - 150, 10))
+        high_score_text = text_cache.render(self.font_small, f"最高分: {self.stats['highest_score']}", (255, 215, 0))
+        drawn.append(self.screen.blit(high_score_text, (self.WINDOW_WIDTH - 150, 10)))
 
         # 游戏时间
-        time_text = self.font_small.render(f"时间: {int(self.game_time)}s", True, (200, 200, 200))
-        self.screen.blit(time_text, (self.WINDOW_WIDTH - 150, 35))
+        time_text = text_cache.render(self.font_small, f"时间: {int(sim.game_time)}s", (200, 200, 200))
+        drawn.append(self.screen.blit(time_text, (self.WINDOW_WIDTH - 150, 35)))
+        return [panel, drawn[0].union(drawn[1])]
 
     def render_menu(self):
         """渲染主菜单"""
         self.screen.fill((10, 10, 30))
 
         # 标题
-        title = self.font_large.render("Hello,welcom to the King of Snake", True, (255, 255, 255))
+        title = text_cache.render(self.font_large, "Hello,welcom to the King of Snake", (255, 255, 255))
         title_rect = title.get_rect(center=(self.WINDOW_WIDTH // 2, 100))
         self.screen.blit(title, title_rect)
 
-        subtitle = self.font_medium.render("Ultimate Snake Game", True, (200, 200, 255))
+        subtitle = text_cache.render(self.font_medium, "Ultimate Snake Game", (200, 200, 255))
         subtitle_rect = subtitle.get_rect(center=(self.WINDOW_WIDTH // 2, 140))
         self.screen.blit(subtitle, subtitle_rect)
 
@@ -651,7 +854,7 @@ class UltimateSnakeGame:
         y_start = 200
         for i, mode in enumerate(self.menu_options):
             color = (255, 255, 0) if i == self.menu_selected else (255, 255, 255)
-            text = self.font_medium.render(mode.value, True, color)
+            text = text_cache.render(self.font_medium, mode.value, color)
             text_rect = text.get_rect(center=(self.WINDOW_WIDTH // 2, y_start + i * 50))
             self.screen.blit(text, text_rect)
 
@@ -663,13 +866,13 @@ class UltimateSnakeGame:
         # 控制说明
         controls = [
             "↑↓ 选择模式    Enter 开始游戏",
-            "S 切换皮肤     Esc 退出",
+            "S 切换皮肤     B 切换棋盘     Esc 退出",
             "P 暂停游戏     R 重新开始"
         ]
 
         y_start = self.WINDOW_HEIGHT - 150
         for i, control in enumerate(controls):
-            text = self.font_small.render(control, True, (150, 150, 150))
+            text = text_cache.render(self.font_small, control, (150, 150, 150))
             text_rect = text.get_rect(center=(self.WINDOW_WIDTH // 2, y_start + i * 25))
             self.screen.blit(text, text_rect)
 
@@ -682,14 +885,22 @@ class UltimateSnakeGame:
         ]
 
         for i, stat in enumerate(stats_text):
-            text = self.font_small.render(stat, True, (100, 200, 100))
+            text = text_cache.render(self.font_small, stat, (100, 200, 100))
             self.screen.blit(text, (50, stats_y + i * 20))
 
+        # 棋盘大小
+        width, height = self.board_size_for(self.menu_options[self.menu_selected])
+        board_text = text_cache.render(self.font_small, f"棋盘: {width}×{height}", (150, 200, 255))
+        self.screen.blit(board_text, (self.WINDOW_WIDTH - 200, 280))
+
+        # 当前模式排行榜（读取缓存的前N名）
+        self.render_leaderboard(self.menu_options[self.menu_selected], 50, 200)
+
         # 当前皮肤预览
         skin_preview_x = self.WINDOW_WIDTH - 200
         skin_preview_y = 200
 
-        preview_text = self.font_small.render("当前皮肤:", True, (255, 255, 255))
+        preview_text = text_cache.render(self.font_small, "当前皮肤:", (255, 255, 255))
         self.screen.blit(preview_text, (skin_preview_x, skin_preview_y))
 
         # 绘制皮肤预览
@@ -698,6 +909,42 @@ class UltimateSnakeGame:
             is_head = (i == 0)
             self.snake_skin.render_segment(self.screen, rect, is_head, i, 5, time.time())
 
+    def render_leaderboard(self, mode: GameMode, x: int, y: int, count: int = 5):
+        """渲染某模式的排行榜"""
+        title = text_cache.render(self.font_small, f"排行榜 - {mode.value}", (255, 215, 0))
+        self.screen.blit(title, (x, y))
+
+        records = self.leaderboard.top(mode.name)[:count]
+        if not records:
+            text = text_cache.render(self.font_small, "暂无记录", (120, 120, 120))
+            self.screen.blit(text, (x, y + 30))
+            return
+
+        for i, record in enumerate(records):
+            minutes, seconds = divmod(int(record.duration), 60)
+            line = f"{i + 1}. {record.score:>5}  长度{record.length}  {minutes}:{seconds:02d}"
+            color = (255, 255, 255) if i else (255, 215, 0)
+            text = text_cache.render(self.font_small, line, color)
+            self.screen.blit(text, (x, y + 30 + i * 25))
+
+    def render_loading(self):
+        """渲染加载画面（后台生成迷宫时）"""
+        self.screen.fill((10, 10, 30))
+
+        # 标题居中，后面的省略号单独绘制，点数变化时标题不会左右移动
+        elapsed = time.time() - self.loading_started
+        text = text_cache.render(self.font_large, "正在生成迷宫", (255, 255, 255))
+        text_rect = text.get_rect(center=(self.WINDOW_WIDTH // 2, self.WINDOW_HEIGHT // 2))
+        self.screen.blit(text, text_rect)
+        dots = '.' * (int(elapsed * 3) % 4)
+        if dots:
+            self.screen.blit(text_cache.render(self.font_large, dots, (255, 255, 255)), text_rect.topright)
+
+        hint = text_cache.render(self.font_small,
+                                 f"{self.sim.GRID_WIDTH}×{self.sim.GRID_HEIGHT}  已用 {int(elapsed)} 秒，Esc 返回主菜单",
+                                 (200, 200, 200))
+        self.screen.blit(hint, hint.get_rect(center=(self.WINDOW_WIDTH // 2, self.WINDOW_HEIGHT // 2 + 50)))
+
     def render_pause(self):
         """渲染暂停画面"""
         # 半透明遮罩
@@ -707,12 +954,12 @@ class UltimateSnakeGame:
         self.screen.blit(overlay, (0, 0))
 
         # 暂停文字
-        pause_text = self.font_large.render("游戏暂停", True, (255, 255, 255))
+        pause_text = text_cache.render(self.font_large, "游戏暂停", (255, 255, 255))
         pause_rect = pause_text.get_rect(center=(self.WINDOW_WIDTH // 2, self.WINDOW_HEIGHT // 2))
         self.screen.blit(pause_text, pause_rect)
 
         # 提示文字
-        hint_text = self.font_small.render("按 P 继续游戏，Esc 返回主菜单", True, (200, 200, 200))
+        hint_text = text_cache.render(self.font_small, "按 P 继续游戏，Esc 返回主菜单", (200, 200, 200))
         hint_rect = hint_text.get_rect(center=(self.WINDOW_WIDTH // 2, self.WINDOW_HEIGHT // 2 + 50))
         self.screen.blit(hint_text, hint_rect)
 
@@ -725,30 +972,30 @@ class UltimateSnakeGame:
         self.screen.blit(overlay, (0, 0))
 
         # 游戏结束文字
-        game_over_text = self.font_large.render("游戏结束", True, (255, 100, 100))
+        game_over_text = text_cache.render(self.font_large, "游戏结束", (255, 100, 100))
         game_over_rect = game_over_text.get_rect(center=(self.WINDOW_WIDTH // 2, self.WINDOW_HEIGHT // 2 - 100))
         self.screen.blit(game_over_text, game_over_rect)
 
         # 最终分数
-        score_text = self.font_medium.render(f"最终分数: {self.score}", True, (255, 255, 255))
+        score_text = text_cache.render(self.font_medium, f"最终分数: {self.sim.score}", (255, 255, 255))
         score_rect = score_text.get_rect(center=(self.WINDOW_WIDTH // 2, self.WINDOW_HEIGHT // 2 - 50))
         self.screen.blit(score_text, score_rect)
 
         # 统计信息
         stats = [
-            f"等级: {self.level}",
-            f"食物: {self.food_eaten}",
-            f"时间: {int(self.game_time)}秒",
-            f"蛇长: {len(self.snake_body)}"
+            f"等级: {self.sim.level}",
+            f"食物: {self.sim.food_eaten}",
+            f"时间: {int(self.sim.game_time)}秒",
+            f"蛇长: {len(self.sim.snake_body)}"
         ]
 
         for i, stat in enumerate(stats):
-            text = self.font_small.render(stat, True, (200, 200, 200))
+            text = text_cache.render(self.font_small, stat, (200, 200, 200))
             text_rect = text.get_rect(center=(self.WINDOW_WIDTH // 2, self.WINDOW_HEIGHT // 2 + i * 25))
             self.screen.blit(text, text_rect)
 
         # 提示文字
-        hint_text = self.font_small.render("按 R 重新开始，Esc 返回主菜单", True, (255, 255, 0))
+        hint_text = text_cache.render(self.font_small, "按 R 重新开始，Esc 返回主菜单", (255, 255, 0))
         hint_rect = hint_text.get_rect(center=(self.WINDOW_WIDTH // 2, self.WINDOW_HEIGHT // 2 + 150))
         self.screen.blit(hint_text, hint_rect)
 
@@ -759,7 +1006,7 @@ class UltimateSnakeGame:
 
         print("🐍 欢迎来到无敌蛇王 - Ultimate Snake Game!")
         print("🌟 特色功能:")
-        print("   • 6种游戏模式：经典、极速、迷宫、对战、生存、禅意")
+        print("   • 7种游戏模式：经典、极速、迷宫、对战、生存、禅意、盛宴")
         print("   • 6种华丽皮肤：经典、彩虹、霓虹、火焰、冰霜、星空")
         print("   • 7种神奇道具：加速、缓慢、无敌、双倍分数、缩小、传送、冰冻")
         print("   • 粒子效果系统、动态音效、成就系统")
@@ -787,7 +1034,19 @@ class UltimateSnakeGame:
                 self.update_game(dt)
 
             # 渲染
-            if self.game_state == 'menu':
+            if self.game_state == 'playing' and self.render_mode == 'dirty' and self.camera is None:
+                rects = self.render_game_dirty()
+                if rects is None:
+                    pygame.display.flip()
+                else:
+                    pygame.display.update(rects)
+                continue
+
+            self.dirty_rects.request_full_redraw()
+            if self.game_state == 'loading':
+                self.update_loading()
+                self.render_loading()
+            elif self.game_state == 'menu':
                 self.render_menu()
             elif self.game_state == 'playing':
                 self.render_game()
@@ -806,7 +1065,40 @@ class UltimateSnakeGame:
 
             pygame.display.flip()
 
-        # 保存统计数据
-        self.save_stats()
+        # 保存统计数据和未结束的录像
+        self.stats_store.close()
+        self.save_replay()
+        self.leaderboard.close()
         pygame.quit()
         print("👋 感谢体验无敌蛇王！")
+
+    def watch_replay(self, player: ReplayPlayer):
+        """观看录像（不计入统计和成就），Esc 或关闭窗口提前结束"""
+        replay = player.replay
+        self.game_mode = replay.mode
+        if replay.skin in self.snake_skin.skins:
+            self.snake_skin.current_skin = replay.skin
+        self.set_sim(player.sim)
+        self.recorder.replay = None
+        self.game_state = 'playing'
+        pygame.display.set_caption(f"🐍 录像回放 ×{player.speed:g} - {replay.mode.value}")
+
+        clock = pygame.time.Clock()
+        running = True
+        while running and not player.finished:
+            dt = clock.tick(60) / 1000.0
+
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and
+                                                 event.key == pygame.K_ESCAPE):
+                    running = False
+
+            player.advance(dt)
+            self.sim.drain_events()
+            self.particle_system.update(dt)
+
+            self.render_game()
+            pygame.display.flip()
+
+        self.game_state = 'game_over' if player.finished else 'menu'
+        pygame.quit()
@@ -0,0 +1,222 @@
+"""
+哈密顿回路AI
+沿覆盖全部格子的回路前进并在安全时抄近路，保证能把整个棋盘填满，
+用于满棋盘的压力测试
+"""
+
+import argparse
+import random
+import sys
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from .enums import Direction, GameMode
+from .occupancy import BLOCKING, SNAKE
+from .snake_body import SnakeBody
+
+# 蛇长（含待生长的段）不到棋盘的这个比例时才抄近路
+SHORTCUT_LIMIT = 0.5
+
+# 抄近路后蛇头前方到蛇尾之间至少还要留出的空格（在待生长的段数之外）
+SHORTCUT_MARGIN = 4
+
+# 玩家蛇吃一个食物增长的段数（吃到的那一步和之后的一步尾巴都不动），
+# 策略的默认值；AI蛇按自己的规则传入 growth
+FOOD_GROWTH = 2
+
+class HamiltonianCycle:
+    """棋盘上的哈密顿回路
+
+    order[i] 是格子下标 i 在回路中的序号，cells[k] 是回路中第 k 个格子。
+    构造方法：高为偶数时，第 0 列作为回程，其余各列按行蛇形往返；
+    高为奇数、宽为偶数时转置构造。宽高都是奇数的棋盘没有哈密顿回路。
+    """
+
+    def __init__(self, width: int, height: int):
+        if width * height < 4 or (width % 2 and height % 2) or min(width, height) < 2:
+            raise ValueError(f"{width}×{height} 的棋盘没有哈密顿回路")
+        self.width = width
+        self.height = height
+        self.size = width * height
+
+        if height % 2 == 0:
+            path = self._serpentine(width, height)
+        else:
+            path = [(y, x) for x, y in self._serpentine(height, width)]
+
+        self.cells = array('i', (y * width + x for x, y in path))
+        self.order = array('i', [0]) * self.size
+        for k, cell in enumerate(self.cells):
+            self.order[cell] = k
+
+    @staticmethod
+    def _serpentine(width: int, height: int) -> List[Tuple[int, int]]:
+        """高为偶数的回路：各行在第 1~width-1 列之间往返，再沿第 0 列回到起点"""
+        path = []
+        for y in range(height):
+            xs = range(1, width) if y % 2 == 0 else range(width - 1, 0, -1)
+            path.extend((x, y) for x in xs)
+        path.extend((0, y) for y in range(height - 1, -1, -1))
+        return path
+
+    def distance(self, a: int, b: int) -> int:
+        """沿回路从格子 a 走到格子 b 的步数"""
+        return (self.order[b] - self.order[a]) % self.size
+
+# 按棋盘大小缓存的回路
+_cycles: Dict[Tuple[int, int], HamiltonianCycle] = {}
+
+def get_cycle(width: int, height: int) -> HamiltonianCycle:
+    """取得某个棋盘大小的哈密顿回路（每种大小只构造一次）"""
+    key = (width, height)
+    cycle = _cycles.get(key)
+    if cycle is None:
+        cycle = _cycles[key] = HamiltonianCycle(width, height)
+    return cycle
+
+class HamiltonianStrategy:
+    """哈密顿回路策略（AISnake 的可选策略）
+
+    以蛇尾在回路中的序号为起点，蛇身各段的相对序号从尾到头严格递增，
+    蛇头前方（相对序号大于蛇头的格子）全是空格。每一步只走到相对序号
+    更大的格子，这个顺序就一直成立，蛇头沿回路前进时永远不会被自己
+    挡住，最终能填满整个棋盘。
+
+    抄近路：在不超过食物的前提下选沿回路离食物最近的邻格。只在蛇长
+    不到棋盘 SHORTCUT_LIMIT 时抄近路，并要求跳过之后蛇头前方仍有足够
+    的空格容纳待生长的段，否则蛇尾来不及让出位置。墙壁和其他蛇会破坏
+    回路，这时只能尽量选择仍然有序的方向。
+
+    growth 是这条蛇吃一个食物增长的段数，用于判断抄近路后蛇尾能否及时
+    让出位置。
+    """
+
+    def __init__(self, grid, shortcuts: bool = True, growth: int = FOOD_GROWTH):
+        self.grid = grid
+        self.shortcuts = shortcuts
+        self.growth = growth
+        self.cycle = get_cycle(grid.width, grid.height)
+
+    def next_direction(self, body: SnakeBody, food_pos: Optional[Tuple[int, int]],
+                       direction: Optional[Direction] = None, grow_pending: int = 0) -> Direction:
+        """选择下一步的方向（不会选择直接掉头的方向）"""
+        grid = self.grid
+        width = grid.width
+        order = self.cycle.order
+        size = self.cycle.size
+
+        head_x, head_y = body[0]
+        tail_x, tail_y = body.tail
+        tail_order = order[tail_y * width + tail_x]
+        head_rel = (order[head_y * width + head_x] - tail_order) % size
+        length = len(body)
+        shortcuts = self.shortcuts and length + grow_pending < size * SHORTCUT_LIMIT
+        food = food_pos[1] * width + food_pos[0] if food_pos is not None else None
+        reverse = (-direction.value[0], -direction.value[1]) if direction is not None else None
+
+        best = None
+        best_key = None
+        fallback = None
+        for candidate in Direction:
+            dx, dy = candidate.value
+            if (dx, dy) == reverse:
+                continue
+            x, y = head_x + dx, head_y + dy
+            if not grid.in_bounds(x, y) or grid.has(x, y, BLOCKING):
+                continue
+            fallback = candidate
+
+            cell = y * width + x
+            rel = (order[cell] - tail_order) % size
+            if length > 1 and rel <= head_rel:
+                continue  # 会打乱蛇身在回路上的顺序
+            if rel != head_rel + 1:
+                # 跳过回路上的若干格：前方剩余的空格要能容纳生长
+                growth = grow_pending + (self.growth if cell == food else 0)
+                if length > 1 and (not shortcuts or size - 1 - rel <= growth + SHORTCUT_MARGIN):
+                    continue
+
+            key = (order[food] - order[cell]) % size if food is not None else size - rel
+            if best_key is None or key < best_key:
+                best_key = key
+                best = candidate
+
+        if best is not None:
+            return best
+        return fallback if fallback is not None else (direction or Direction.RIGHT)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口：无头运行到填满棋盘，报告每秒帧数和最慢的一帧"""
+    from .simulator import SnakeSimulator
+
+    parser = argparse.ArgumentParser(description="哈密顿回路AI满棋盘压力测试")
+    parser.add_argument('--width', type=int, default=40)
+    parser.add_argument('--height', type=int, default=26)
+    parser.add_argument('--mode', default='ZEN', choices=[mode.name for mode in GameMode
+                                                          if mode not in (GameMode.BATTLE, GameMode.MAZE,
+                                                                          GameMode.FEAST)])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-shortcuts', action='store_true', help="只沿回路前进")
+    parser.add_argument('--ai', action='store_true',
+                        help="由对战模式的AI蛇（ai_strategy='hamiltonian'）运行，忽略 --mode")
+    args = parser.parse_args(argv)
+    cells = args.width * args.height
+
+    # 道具会打乱蛇身（缩小、传送），压力测试时关闭
+    rng = random.Random(args.seed)
+    if args.ai:
+        sim = SnakeSimulator(args.width, args.height, GameMode.BATTLE, rng=rng, ai_count=1,
+                             powerups=False, ai_strategy='hamiltonian')
+        # 只推进AI蛇，不动的玩家蛇移出网格，AI蛇才能填满整个棋盘
+        sim.grid.remove(*sim.snake_body.head, SNAKE)
+        ai_snake = sim.ai_snakes[0]
+        ai_snake.strategy.shortcuts = not args.no_shortcuts
+        body = ai_snake.body
+        tick = sim.update_ai_snake
+        # AI蛇被挡住时停在原地而不是死亡，限制总帧数以免死循环
+        max_ticks = cells * cells
+
+        def running() -> bool:
+            return sim.food_pos is not None
+    else:
+        sim = SnakeSimulator(args.width, args.height, GameMode[args.mode], rng=rng, powerups=False)
+        strategy = HamiltonianStrategy(sim.grid, shortcuts=not args.no_shortcuts)
+        body = sim.snake_body
+        max_ticks = None
+
+        def tick():
+            direction = strategy.next_direction(sim.snake_body, sim.food_pos, sim.snake_direction,
+                                                sim.grow_pending)
+            sim.change_direction(direction)
+            sim.step()
+
+        def running() -> bool:
+            return sim.alive
+
+    ticks = 0
+    worst = 0.0
+    worst_tick = 0
+    start = time.perf_counter()
+    while running() and ticks != max_ticks:
+        tick_start = time.perf_counter()
+        tick()
+        elapsed = time.perf_counter() - tick_start
+        ticks += 1
+        if elapsed > worst:
+            worst = elapsed
+            worst_tick = ticks
+    total = time.perf_counter() - start
+
+    full = sim.board_full and len(body) == cells
+    if full:
+        result = "填满棋盘"
+    else:
+        result = "未能填满" if args.ai else "中途死亡"
+    print(f"{args.width}×{args.height}{'（AI蛇）' if args.ai else ''}：{result}，长度 {len(body)}/{cells}，"
+          f"共 {ticks} 帧，用时 {total:.2f} 秒，每秒 {ticks / total:,.0f} 帧，"
+          f"最慢一帧 {worst * 1000:.3f} 毫秒（第 {worst_tick} 帧）")
+    return 0 if full else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
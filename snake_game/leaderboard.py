@@ -0,0 +1,161 @@
+"""
+排行榜和历史记录
+每局游戏存为SQLite中的一行，插入在后台线程完成，菜单读取缓存的各模式前N名
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS games (
+        id INTEGER PRIMARY KEY,
+        mode TEXT NOT NULL,
+        skin TEXT NOT NULL,
+        score INTEGER NOT NULL,
+        level INTEGER NOT NULL,
+        length INTEGER NOT NULL,
+        duration REAL NOT NULL,
+        powerups TEXT NOT NULL,
+        finished_at REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS games_mode_score ON games (mode, score DESC)",
+    "CREATE INDEX IF NOT EXISTS games_finished_at ON games (finished_at)",
+]
+
+INSERT = """INSERT INTO games (mode, skin, score, level, length, duration, powerups, finished_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
+
+# 走 (mode, score DESC) 索引，只读取前N行，与总行数无关
+TOP_QUERY = """SELECT mode, skin, score, level, length, duration, powerups, finished_at
+               FROM games WHERE mode = ? ORDER BY score DESC LIMIT ?"""
+
+# 走 finished_at 索引倒序读取
+RECENT_QUERY = """SELECT mode, skin, score, level, length, duration, powerups, finished_at
+                  FROM games ORDER BY finished_at DESC LIMIT ?"""
+
+@dataclass
+class GameRecord:
+    """一局游戏的记录"""
+    mode: str
+    skin: str
+    score: int
+    level: int
+    length: int
+    duration: float
+    powerups: str = ''
+    finished_at: float = 0.0
+
+    def as_row(self) -> Tuple:
+        """数据库行"""
+        return (self.mode, self.skin, self.score, self.level, self.length,
+                self.duration, self.powerups, self.finished_at)
+
+class Leaderboard:
+    """排行榜
+
+    数据库连接只在后台线程里使用：启动时建表、读取各模式前 top_n 名，
+    之后从队列取出新记录批量插入，并在内存里把新记录合并进对应模式的
+    前N名缓存。渲染线程调用 record() 只是入队，调用 top() 只是读字典，
+    都是常数时间，与表中行数无关。
+    """
+
+    def __init__(self, path: str = 'snake_history.db', modes: Optional[List[str]] = None,
+                 top_n: int = 10):
+        self.path = path
+        self.modes = list(modes or [])
+        self.top_n = top_n
+        self.loaded = False
+        self._top: Dict[str, List[GameRecord]] = {}
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._writer, name='leaderboard-writer', daemon=True)
+        self._thread.start()
+
+    def record(self, record: GameRecord):
+        """记录一局游戏（不阻塞）"""
+        if not record.finished_at:
+            record.finished_at = time.time()
+        self._queue.put(record)
+
+    def top(self, mode: str) -> List[GameRecord]:
+        """某模式的前N名（尚未加载完成时为空列表）"""
+        return self._top.get(mode, [])
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库并建表"""
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        return conn
+
+    def _writer(self):
+        """后台线程：加载前N名缓存，然后批量插入新记录"""
+        try:
+            conn = self._connect()
+            for mode in self.modes:
+                rows = conn.execute(TOP_QUERY, (mode, self.top_n)).fetchall()
+                self._top[mode] = [GameRecord(*row) for row in rows]
+        except sqlite3.Error as e:
+            print(f"排行榜数据库打开失败: {e}")
+            conn = None
+        self.loaded = True
+
+        while True:
+            items = [self._queue.get()]
+            # 一次取出所有积压的记录，合并成一个事务
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in items
+            records = [item for item in items if item is not None]
+            if records:
+                self._merge_top(records)
+                if conn is not None:
+                    try:
+                        with conn:
+                            conn.executemany(INSERT, [r.as_row() for r in records])
+                    except sqlite3.Error as e:
+                        print(f"排行榜记录保存失败: {e}")
+
+            for _ in items:
+                self._queue.task_done()
+            if stop:
+                break
+
+        if conn is not None:
+            conn.close()
+
+    def _merge_top(self, records: List[GameRecord]):
+        """把新记录合并进前N名缓存（整体替换列表，读者不会看到中间状态）"""
+        for record in records:
+            top = self._top.get(record.mode, [])
+            # sorted 是稳定排序，同分时先达到的记录排在前面
+            merged = sorted(top + [record], key=lambda r: r.score, reverse=True)
+            self._top[record.mode] = merged[:self.top_n]
+
+    def recent(self, limit: int = 20) -> List[GameRecord]:
+        """最近的若干局（独立连接查询，供统计和调试使用）"""
+        conn = sqlite3.connect(self.path)
+        try:
+            return [GameRecord(*row) for row in conn.execute(RECENT_QUERY, (limit,))]
+        finally:
+            conn.close()
+
+    def flush(self):
+        """等待队列中的记录全部写入"""
+        self._queue.join()
+
+    def close(self):
+        """写完剩余记录并停止后台线程"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
@@ -0,0 +1,278 @@
+"""
+迷宫引擎
+在粗网格上用递归回溯、Prim 或 Wilson 算法生成迷宫，放大到游戏网格后
+检查连通性并填平不可达的区域，生成结果按 (种子, 尺寸, 算法) 缓存到磁盘
+"""
+
+import os
+import random
+import struct
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+ALGORITHMS = ('backtracker', 'prim', 'wilson')
+
+# 迷宫生成逻辑变化时递增，旧的磁盘缓存自动失效
+MAZE_VERSION = 1
+
+# 缓存文件头：魔数、版本、宽、高
+CACHE_MAGIC = b'SNKM'
+CACHE_HEADER = struct.Struct('<4sBHH')
+
+Cell = Tuple[int, int]
+Edge = Tuple[Cell, Cell]
+
+def _neighbors(cell: Cell, cols: int, rows: int) -> List[Cell]:
+    """粗网格上的相邻格子"""
+    x, y = cell
+    result = []
+    if y > 0:
+        result.append((x, y - 1))
+    if y < rows - 1:
+        result.append((x, y + 1))
+    if x > 0:
+        result.append((x - 1, y))
+    if x < cols - 1:
+        result.append((x + 1, y))
+    return result
+
+def _edge(a: Cell, b: Cell) -> Edge:
+    """无向边（端点排序后作为集合元素）"""
+    return (a, b) if a < b else (b, a)
+
+def recursive_backtracker(cols: int, rows: int, rng: random.Random) -> Set[Edge]:
+    """递归回溯（显式栈的深度优先）：长而曲折的通道"""
+    start = (rng.randrange(cols), rng.randrange(rows))
+    visited = {start}
+    stack = [start]
+    passages = set()
+    while stack:
+        cell = stack[-1]
+        candidates = [n for n in _neighbors(cell, cols, rows) if n not in visited]
+        if not candidates:
+            stack.pop()
+            continue
+        nxt = rng.choice(candidates)
+        visited.add(nxt)
+        passages.add(_edge(cell, nxt))
+        stack.append(nxt)
+    return passages
+
+def prim(cols: int, rows: int, rng: random.Random) -> Set[Edge]:
+    """随机 Prim：分支多、死路短"""
+    start = (rng.randrange(cols), rng.randrange(rows))
+    visited = {start}
+    frontier = [(start, n) for n in _neighbors(start, cols, rows)]
+    passages = set()
+    while frontier:
+        # 随机取出一条边界边（与末尾交换后弹出，O(1)）
+        i = rng.randrange(len(frontier))
+        frontier[i], frontier[-1] = frontier[-1], frontier[i]
+        cell, nxt = frontier.pop()
+        if nxt in visited:
+            continue
+        visited.add(nxt)
+        passages.add(_edge(cell, nxt))
+        frontier.extend((nxt, n) for n in _neighbors(nxt, cols, rows) if n not in visited)
+    return passages
+
+def wilson(cols: int, rows: int, rng: random.Random) -> Set[Edge]:
+    """Wilson 算法（擦除环的随机游走）：所有生成树等概率"""
+    cells = [(x, y) for y in range(rows) for x in range(cols)]
+    in_tree = {rng.choice(cells)}
+    passages = set()
+    for start in cells:
+        if start in in_tree:
+            continue
+        # 随机游走到树上，记录每个格子最后一次离开的方向即完成擦环
+        next_cell = {}
+        cell = start
+        while cell not in in_tree:
+            nxt = rng.choice(_neighbors(cell, cols, rows))
+            next_cell[cell] = nxt
+            cell = nxt
+        cell = start
+        while cell not in in_tree:
+            in_tree.add(cell)
+            passages.add(_edge(cell, next_cell[cell]))
+            cell = next_cell[cell]
+    return passages
+
+GENERATORS = {
+    'backtracker': recursive_backtracker,
+    'prim': prim,
+    'wilson': wilson
+}
+
+def braid(passages: Set[Edge], cols: int, rows: int, rng: random.Random, ratio: float):
+    """按比例打通死路（度为1的格子再开一面墙），形成回路"""
+    degree: Dict[Cell, int] = {}
+    for a, b in passages:
+        degree[a] = degree.get(a, 0) + 1
+        degree[b] = degree.get(b, 0) + 1
+
+    for y in range(rows):
+        for x in range(cols):
+            cell = (x, y)
+            if degree.get(cell, 0) != 1 or rng.random() >= ratio:
+                continue
+            closed = [n for n in _neighbors(cell, cols, rows) if _edge(cell, n) not in passages]
+            if not closed:
+                continue
+            # 优先连到另一个死路，一次消掉两个
+            dead_ends = [n for n in closed if degree.get(n, 0) == 1]
+            nxt = rng.choice(dead_ends or closed)
+            passages.add(_edge(cell, nxt))
+            degree[cell] += 1
+            degree[nxt] = degree.get(nxt, 0) + 1
+
+class MazeGenerator:
+    """迷宫生成器
+
+    游戏网格被划分成 spacing×spacing 的粗格子（spacing-1 宽的通道加
+    一格墙），在粗格子上生成完美迷宫后按 braid_ratio 打通部分死路，
+    再放大成墙壁位图。出生点附近的墙会被清除，最后从出生点做一次
+    洪水填充，把所有不可达的空格也填成墙，保证剩下的空格全部连通，
+    食物只会落在可达的位置。
+
+    结果是 height×width 的布尔位图（True 为墙），内存中按
+    (种子, 尺寸, 算法) 缓存，同时写入 cache_dir 下的文件，
+    重启后直接读取。cache_dir 为 None 时不使用磁盘缓存。
+    """
+
+    def __init__(self, width: int, height: int, spacing: int = 4, braid_ratio: float = 0.6,
+                 cache_dir: Optional[str] = 'maze_cache'):
+        self.width = width
+        self.height = height
+        self.spacing = spacing
+        self.braid_ratio = braid_ratio
+        self.cache_dir = cache_dir
+        self.start = (width // 2, height // 2)
+        self._memory: Dict[Tuple[int, str], np.ndarray] = {}
+
+    def get(self, seed: int, algorithm: str) -> np.ndarray:
+        """取得迷宫位图（依次查内存缓存、磁盘缓存，都没有时生成）"""
+        if algorithm not in GENERATORS:
+            raise ValueError(f"未知的迷宫算法: {algorithm}")
+        key = (seed, algorithm)
+        walls = self._memory.get(key)
+        if walls is None:
+            walls = self._load(seed, algorithm)
+            if walls is None:
+                walls = self.generate(seed, algorithm)
+                self._save(seed, algorithm, walls)
+            self._memory[key] = walls
+        return walls
+
+    def is_loaded(self, seed: int, algorithm: str) -> bool:
+        """迷宫是否已在内存缓存中（get 不会读盘或生成）"""
+        return (seed, algorithm) in self._memory
+
+    def wall_cells(self, seed: int, algorithm: str) -> Set[Tuple[int, int]]:
+        """迷宫的墙壁坐标集合"""
+        ys, xs = np.nonzero(self.get(seed, algorithm))
+        return set(zip(xs.tolist(), ys.tolist()))
+
+    def generate(self, seed: int, algorithm: str) -> np.ndarray:
+        """生成迷宫位图（不使用缓存）"""
+        rng = random.Random(f"{algorithm}:{seed}:{self.width}x{self.height}")
+        cols = max(1, (self.width + 1) // self.spacing)
+        rows = max(1, (self.height + 1) // self.spacing)
+        passages = GENERATORS[algorithm](cols, rows, rng)
+        braid(passages, cols, rows, rng, self.braid_ratio)
+
+        walls = self._rasterize(passages, cols, rows)
+        self._clear_start(walls)
+        self._fill_unreachable(walls)
+        return walls
+
+    def _rasterize(self, passages: Set[Edge], cols: int, rows: int) -> np.ndarray:
+        """把粗网格迷宫放大成墙壁位图"""
+        # 粗格子 c 占据 [xs[c], xs[c+1]-1)，xs[c+1]-1 是墙（最后一个格子延伸到边缘）
+        xs = [c * (self.width + 1) // cols for c in range(cols + 1)]
+        ys = [r * (self.height + 1) // rows for r in range(rows + 1)]
+
+        walls = np.zeros((self.height, self.width), dtype=bool)
+        for c in range(cols - 1):
+            walls[:, xs[c + 1] - 1] = True
+        for r in range(rows - 1):
+            walls[ys[r + 1] - 1, :] = True
+
+        # 打开相邻格子之间的墙（交叉处的柱子保留）
+        for (ax, ay), (bx, by) in passages:
+            if ax != bx:
+                x = xs[max(ax, bx)] - 1
+                walls[ys[ay]:ys[ay + 1] - 1, x] = False
+            else:
+                y = ys[max(ay, by)] - 1
+                walls[y, xs[ax]:xs[ax + 1] - 1] = False
+        return walls
+
+    def _clear_start(self, walls: np.ndarray):
+        """清空出生点周围（蛇向右出发，右侧多留几格）"""
+        x, y = self.start
+        walls[max(0, y - 1):y + 2, max(0, x - 2):x + 5] = False
+
+    def _fill_unreachable(self, walls: np.ndarray):
+        """从出生点洪水填充，把不可达的空格填成墙"""
+        height, width = walls.shape
+        size = width * height
+        # 平铺的状态表：0 空格，1 墙，2 已到达（逐格访问 bytearray 比 NumPy 标量快得多）
+        state = bytearray(walls.astype(np.uint8).tobytes())
+        x, y = self.start
+        start = y * width + x
+        state[start] = 2
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            col = i % width
+            for j in (i - width if i >= width else -1,
+                      i + width if i + width < size else -1,
+                      i - 1 if col > 0 else -1,
+                      i + 1 if col < width - 1 else -1):
+                if j >= 0 and not state[j]:
+                    state[j] = 2
+                    queue.append(j)
+        walls |= np.frombuffer(state, dtype=np.uint8).reshape(height, width) != 2
+
+    def _cache_path(self, seed: int, algorithm: str) -> str:
+        """磁盘缓存文件路径"""
+        name = (f"v{MAZE_VERSION}_{algorithm}_{self.width}x{self.height}"
+                f"_s{self.spacing}_b{int(self.braid_ratio * 100)}_{seed}.maze")
+        return os.path.join(self.cache_dir, name)
+
+    def _load(self, seed: int, algorithm: str) -> Optional[np.ndarray]:
+        """读取磁盘缓存（不存在或损坏时返回None）"""
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._cache_path(seed, algorithm), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        if len(data) < CACHE_HEADER.size:
+            return None
+        magic, version, width, height = CACHE_HEADER.unpack_from(data)
+        size = width * height
+        bits = np.frombuffer(data, dtype=np.uint8, offset=CACHE_HEADER.size)
+        if (magic != CACHE_MAGIC or version != MAZE_VERSION or
+                (width, height) != (self.width, self.height) or len(bits) * 8 < size):
+            return None
+        return np.unpackbits(bits, count=size).astype(bool).reshape(height, width)
+
+    def _save(self, seed: int, algorithm: str, walls: np.ndarray):
+        """写入磁盘缓存（先写临时文件再替换，写入失败时忽略）"""
+        if self.cache_dir is None:
+            return
+        path = self._cache_path(seed, algorithm)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(CACHE_HEADER.pack(CACHE_MAGIC, MAZE_VERSION, self.width, self.height))
+                f.write(np.packbits(walls).tobytes())
+            os.replace(path + '.tmp', path)
+        except OSError:
+            pass  # 忽略保存错误
@@ -0,0 +1,518 @@
+"""
+占用网格系统
+记录每个格子被蛇、AI蛇、墙壁、食物或道具占用的情况
+"""
+
+import random
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 占用标记（位标志，一个格子可以同时有多个标记）
+EMPTY = 0
+SNAKE = 1
+AI_SNAKE = 2
+WALL = 4
+FOOD = 8
+POWERUP = 16
+
+# 会导致碰撞的标记
+BLOCKING = SNAKE | AI_SNAKE | WALL
+
+# 分块网格每块的边长（格子数）
+CHUNK_SIZE = 16
+
+class FreeCellIndex:
+    """空闲格子索引
+
+    cells 是所有格子下标的一个排列，前 count 个是空闲格子；positions
+    记录每个格子在排列中的位置。加入和移除都通过与分界处元素交换完成，
+    均匀采样只需一次随机下标，全部为 O(1)。
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.cells = array('i', range(size))
+        self.positions = array('i', range(size))
+        self.count = size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, index: int) -> bool:
+        return self.positions[index] < self.count
+
+    def reset(self):
+        """所有格子恢复为空闲"""
+        self.cells = array('i', range(self.size))
+        self.positions = array('i', range(self.size))
+        self.count = self.size
+
+    def _swap(self, a: int, b: int):
+        """交换排列中的两个位置"""
+        cells = self.cells
+        cell_a = cells[a]
+        cell_b = cells[b]
+        cells[a] = cell_b
+        cells[b] = cell_a
+        self.positions[cell_b] = a
+        self.positions[cell_a] = b
+
+    def add(self, index: int):
+        """标记格子为空闲"""
+        pos = self.positions[index]
+        if pos >= self.count:
+            self._swap(pos, self.count)
+            self.count += 1
+
+    def discard(self, index: int):
+        """标记格子为占用"""
+        pos = self.positions[index]
+        if pos < self.count:
+            self.count -= 1
+            self._swap(pos, self.count)
+
+    def sample(self, rng: random.Random) -> Optional[int]:
+        """均匀随机取一个空闲格子，没有空闲格子时返回None"""
+        if not self.count:
+            return None
+        return self.cells[rng.randrange(self.count)]
+
+    def discard_positions(self, picked: np.ndarray) -> np.ndarray:
+        """批量标记为占用：picked 是排列中互不相同的位置（都小于 count），
+        返回对应的格子下标
+
+        选中的 k 个格子整体换到分界前的最后 k 个位置：已经在这一段里的
+        不动，其余的与这一段里未被选中的格子一一交换，然后分界左移 k，
+        全部用NumPy向量运算完成。
+        """
+        cells = np.frombuffer(self.cells, dtype=np.intc)
+        positions = np.frombuffer(self.positions, dtype=np.intc)
+        k = len(picked)
+        boundary = self.count - k
+        chosen = cells[picked]
+
+        outside = picked[picked < boundary]
+        tail_free = np.ones(k, dtype=bool)
+        tail_free[picked[picked >= boundary] - boundary] = False
+        targets = boundary + np.flatnonzero(tail_free)
+
+        moved_in = cells[outside]
+        moved_out = cells[targets]
+        cells[outside] = moved_out
+        cells[targets] = moved_in
+        positions[moved_out] = outside
+        positions[moved_in] = targets
+        self.count = boundary
+        return chosen
+
+class OccupancyGrid:
+    """占用网格
+
+    使用大小为 width*height 的 bytearray 按行存储占用标记，随蛇头前进、
+    蛇尾收缩增量更新，所有查询都是 O(1)。无敌状态下蛇身可能重叠，
+    所以蛇和AI蛇两层额外记录每个格子的段数。格子在空闲和占用之间
+    切换时同步维护 FreeCellIndex，用于 O(1) 随机选取空格。
+    wall_version 在墙壁变化时递增，供寻路缓存判断是否失效。
+    开启变化记录后，changes 收集占用发生变化的格子下标（供脏矩形渲染）。
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.cells = bytearray(width * height)
+        self._counts = {
+            SNAKE: bytearray(width * height),
+            AI_SNAKE: bytearray(width * height)
+        }
+        self.free_cells = FreeCellIndex(width * height)
+        self.wall_version = 0
+        self.changes = None
+
+    def clear(self):
+        """清空网格"""
+        size = self.width * self.height
+        self.cells[:] = bytes(size)
+        for counts in self._counts.values():
+            counts[:] = bytes(size)
+        self.free_cells.reset()
+        self.wall_version += 1
+
+    def track_changes(self, enabled: bool = True):
+        """开启或关闭变化记录"""
+        self.changes = set() if enabled else None
+
+    def drain_changes(self) -> set:
+        """取出并清空记录的变化格子下标"""
+        changes = self.changes
+        if changes is None:
+            return set()
+        self.changes = set()
+        return changes
+
+    def index(self, x: int, y: int) -> int:
+        """格子坐标转换为缓冲区下标"""
+        return y * self.width + x
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        """检查坐标是否在网格内"""
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def get(self, x: int, y: int) -> int:
+        """获取格子的占用标记"""
+        return self.cells[y * self.width + x]
+
+    def has(self, x: int, y: int, flags: int) -> bool:
+        """检查格子是否带有任一给定标记"""
+        return self.cells[y * self.width + x] & flags != 0
+
+    def is_free(self, x: int, y: int) -> bool:
+        """检查格子是否完全空闲"""
+        return self.cells[y * self.width + x] == EMPTY
+
+    def add(self, x: int, y: int, flag: int):
+        """给格子添加一个占用标记"""
+        i = y * self.width + x
+        counts = self._counts.get(flag)
+        if counts is not None:
+            counts[i] += 1
+        old = self.cells[i]
+        self.cells[i] = old | flag
+        if self.changes is not None:
+            self.changes.add(i)
+        if not old:
+            self.free_cells.discard(i)
+        if flag == WALL:
+            self.wall_version += 1
+
+    def remove(self, x: int, y: int, flag: int):
+        """移除格子的一个占用标记"""
+        i = y * self.width + x
+        counts = self._counts.get(flag)
+        if counts is not None:
+            counts[i] -= 1
+            if counts[i]:
+                return
+        old = self.cells[i]
+        new = old & ~flag
+        self.cells[i] = new
+        if self.changes is not None:
+            self.changes.add(i)
+        if old and not new:
+            self.free_cells.add(i)
+        if flag == WALL:
+            self.wall_version += 1
+
+    @property
+    def free_count(self) -> int:
+        """空闲格子数量"""
+        return self.free_cells.count
+
+    def sample_free(self, rng: random.Random) -> Optional[Tuple[int, int]]:
+        """均匀随机选取一个空闲格子，棋盘已满时返回None"""
+        index = self.free_cells.sample(rng)
+        if index is None:
+            return None
+        return (index % self.width, index // self.width)
+
+    def claim_free(self, count: int, flag: int, rng: random.Random) -> np.ndarray:
+        """在空闲格子中均匀选取最多 count 个不重复的格子并加上 flag，
+        返回这些格子的下标（批量向量化，不逐个调用 add）"""
+        count = min(count, self.free_cells.count)
+        if count <= 0:
+            return np.empty(0, dtype=np.intc)
+        generator = np.random.default_rng(rng.getrandbits(64))
+        picked = generator.choice(self.free_cells.count, count, replace=False)
+        indices = self.free_cells.discard_positions(picked)
+
+        np.frombuffer(self.cells, dtype=np.uint8)[indices] = flag
+        counts = self._counts.get(flag)
+        if counts is not None:
+            np.frombuffer(counts, dtype=np.uint8)[indices] = 1
+        if self.changes is not None:
+            self.changes.update(indices.tolist())
+        if flag == WALL:
+            self.wall_version += 1
+        return indices
+
+    def load_walls(self, walls: np.ndarray):
+        """批量放置墙壁（(height, width) 布尔位图，已被占用的格子跳过）"""
+        ys, xs = np.nonzero(walls)
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            if self.is_free(x, y):
+                self.add(x, y, WALL)
+
+    def as_array(self) -> np.ndarray:
+        """返回 (height, width) 的NumPy视图（零拷贝）"""
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.height, self.width)
+
+class FenwickTree:
+    """树状数组：单点加减和前缀和都是 O(log n)，并支持按前缀和定位"""
+
+    def __init__(self, values: List[int]):
+        self.size = len(values)
+        self.tree = [0] * (self.size + 1)
+        self.total = 0
+        self.rebuild(values)
+
+    def rebuild(self, values: List[int]):
+        """按给定的值整体重建（O(n)）"""
+        tree = [0] + list(values)
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                tree[parent] += tree[i]
+        self.tree = tree
+        self.total = sum(values)
+
+    def add(self, index: int, delta: int):
+        """第 index 个值加上 delta"""
+        self.total += delta
+        i = index + 1
+        tree = self.tree
+        while i <= self.size:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(self, index: int) -> int:
+        """前 index 个值之和"""
+        result = 0
+        i = index
+        while i > 0:
+            result += self.tree[i]
+            i -= i & -i
+        return result
+
+    def find(self, rank: int) -> int:
+        """前缀和首次超过 rank 的下标（0 <= rank < total）"""
+        pos = 0
+        step = 1 << self.size.bit_length()
+        tree = self.tree
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and tree[nxt] <= rank:
+                pos = nxt
+                rank -= tree[nxt]
+            step >>= 1
+        return pos
+
+class ChunkedOccupancyGrid:
+    """分块占用网格（大棋盘）
+
+    与 OccupancyGrid 接口相同，但把棋盘切成 CHUNK_SIZE×CHUNK_SIZE 的块，
+    每块的占用标记是一个 bytearray，只有块里有东西时才分配，清空后
+    释放，所以内存和 clear() 的开销与占用的格子数（加上块数）成正比，
+    而不是与格子数成正比。每块的空闲格子数记录在树状数组里，随机选取
+    空格时先按空闲数加权选块（O(log 块数)），再在块内按行计数定位，
+    结果在所有空格中均匀分布。
+
+    寻路引擎和流场需要整张平铺网格，分块网格不提供 cells；
+    as_array() 会临时拼出整张网格，开销与棋盘大小成正比。
+    """
+
+    def __init__(self, width: int, height: int, chunk_size: int = CHUNK_SIZE):
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        self.chunks_x = -(-width // chunk_size)
+        self.chunks_y = -(-height // chunk_size)
+
+        # 每块在棋盘内的宽高（右侧和底部的块可能不满）
+        self._chunk_widths = [min(chunk_size, width - cx * chunk_size) for cx in range(self.chunks_x)]
+        self._chunk_heights = [min(chunk_size, height - cy * chunk_size) for cy in range(self.chunks_y)]
+        self._capacity = [w * h for h in self._chunk_heights for w in self._chunk_widths]
+
+        self._chunks: Dict[int, bytearray] = {}
+        self._counts: Dict[int, Dict[int, bytearray]] = {SNAKE: {}, AI_SNAKE: {}}
+        self._occupied = [0] * len(self._capacity)
+        self.free_tree = FenwickTree(self._capacity)
+        self.wall_version = 0
+        self.changes = None
+
+    def clear(self):
+        """清空网格"""
+        self._chunks.clear()
+        for counts in self._counts.values():
+            counts.clear()
+        self._occupied = [0] * len(self._capacity)
+        self.free_tree.rebuild(self._capacity)
+        self.wall_version += 1
+
+    def track_changes(self, enabled: bool = True):
+        """开启或关闭变化记录"""
+        self.changes = set() if enabled else None
+
+    def drain_changes(self) -> set:
+        """取出并清空记录的变化格子下标"""
+        changes = self.changes
+        if changes is None:
+            return set()
+        self.changes = set()
+        return changes
+
+    def index(self, x: int, y: int) -> int:
+        """格子坐标转换为全局下标"""
+        return y * self.width + x
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        """检查坐标是否在网格内"""
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def _locate(self, x: int, y: int) -> Tuple[int, int]:
+        """格子坐标转换为 (块编号, 块内下标)"""
+        size = self.chunk_size
+        cy, ly = divmod(y, size)
+        cx, lx = divmod(x, size)
+        return cy * self.chunks_x + cx, ly * size + lx
+
+    def get(self, x: int, y: int) -> int:
+        """获取格子的占用标记"""
+        chunk_id, local = self._locate(x, y)
+        chunk = self._chunks.get(chunk_id)
+        return chunk[local] if chunk is not None else EMPTY
+
+    def has(self, x: int, y: int, flags: int) -> bool:
+        """检查格子是否带有任一给定标记"""
+        return self.get(x, y) & flags != 0
+
+    def is_free(self, x: int, y: int) -> bool:
+        """检查格子是否完全空闲"""
+        return self.get(x, y) == EMPTY
+
+    def add(self, x: int, y: int, flag: int):
+        """给格子添加一个占用标记"""
+        chunk_id, local = self._locate(x, y)
+        counts = self._counts.get(flag)
+        if counts is not None:
+            layer = counts.get(chunk_id)
+            if layer is None:
+                layer = counts[chunk_id] = bytearray(self.chunk_size * self.chunk_size)
+            layer[local] += 1
+
+        chunk = self._chunks.get(chunk_id)
+        if chunk is None:
+            chunk = self._chunks[chunk_id] = bytearray(self.chunk_size * self.chunk_size)
+        old = chunk[local]
+        chunk[local] = old | flag
+        if self.changes is not None:
+            self.changes.add(y * self.width + x)
+        if not old:
+            self._occupied[chunk_id] += 1
+            self.free_tree.add(chunk_id, -1)
+        if flag == WALL:
+            self.wall_version += 1
+
+    def remove(self, x: int, y: int, flag: int):
+        """移除格子的一个占用标记"""
+        chunk_id, local = self._locate(x, y)
+        counts = self._counts.get(flag)
+        if counts is not None:
+            layer = counts[chunk_id]
+            layer[local] -= 1
+            if layer[local]:
+                return
+
+        chunk = self._chunks[chunk_id]
+        old = chunk[local]
+        new = old & ~flag
+        chunk[local] = new
+        if self.changes is not None:
+            self.changes.add(y * self.width + x)
+        if old and not new:
+            self._occupied[chunk_id] -= 1
+            self.free_tree.add(chunk_id, 1)
+            # 块里没有任何占用时释放（计数层此时也必然全为0）
+            if not self._occupied[chunk_id]:
+                del self._chunks[chunk_id]
+                for layers in self._counts.values():
+                    layers.pop(chunk_id, None)
+        if flag == WALL:
+            self.wall_version += 1
+
+    @property
+    def free_count(self) -> int:
+        """空闲格子数量"""
+        return self.free_tree.total
+
+    def sample_free(self, rng: random.Random) -> Optional[Tuple[int, int]]:
+        """均匀随机选取一个空闲格子，棋盘已满时返回None"""
+        total = self.free_tree.total
+        if not total:
+            return None
+        rank = rng.randrange(total)
+        chunk_id = self.free_tree.find(rank)
+        rank -= self.free_tree.prefix(chunk_id)
+
+        cy, cx = divmod(chunk_id, self.chunks_x)
+        width = self._chunk_widths[cx]
+        chunk = self._chunks.get(chunk_id)
+        if chunk is None:
+            ly, lx = divmod(rank, width)
+        else:
+            # 逐行用 count 统计空格（C 实现），定位到目标行后再逐格查找
+            size = self.chunk_size
+            for ly in range(self._chunk_heights[cy]):
+                row = chunk[ly * size:ly * size + width]
+                free = row.count(0)
+                if rank < free:
+                    break
+                rank -= free
+            lx = 0
+            while row[lx] or rank:
+                if not row[lx]:
+                    rank -= 1
+                lx += 1
+        return (cx * self.chunk_size + lx, cy * self.chunk_size + ly)
+
+    def claim_free(self, count: int, flag: int, rng: random.Random) -> np.ndarray:
+        """在空闲格子中均匀选取最多 count 个不重复的格子并加上 flag，
+        返回这些格子的全局下标（逐个采样，每个 O(log 块数)）"""
+        indices = []
+        for _ in range(min(count, self.free_count)):
+            x, y = self.sample_free(rng)
+            self.add(x, y, flag)
+            indices.append(y * self.width + x)
+        return np.array(indices, dtype=np.intc)
+
+    def chunk_array(self, cx: int, cy: int) -> Optional[np.ndarray]:
+        """某块在棋盘内部分的NumPy视图（零拷贝），空块返回None"""
+        chunk = self._chunks.get(cy * self.chunks_x + cx)
+        if chunk is None:
+            return None
+        size = self.chunk_size
+        view = np.frombuffer(chunk, dtype=np.uint8).reshape(size, size)
+        return view[:self._chunk_heights[cy], :self._chunk_widths[cx]]
+
+    def load_walls(self, walls: np.ndarray):
+        """批量放置墙壁（(height, width) 布尔位图，已被占用的格子跳过）
+
+        直接按块写入，开销与块数和墙壁数成正比；不记录变化格子
+        （墙壁整体变化时渲染层会整屏重绘）。
+        """
+        size = self.chunk_size
+        for cy in range(self.chunks_y):
+            for cx in range(self.chunks_x):
+                block = walls[cy * size:(cy + 1) * size, cx * size:(cx + 1) * size]
+                if not block.any():
+                    continue
+                chunk_id = cy * self.chunks_x + cx
+                if chunk_id not in self._chunks:
+                    self._chunks[chunk_id] = bytearray(size * size)
+                view = self.chunk_array(cx, cy)
+                placed = block & (view == EMPTY)
+                view[placed] = WALL
+                self._occupied[chunk_id] += int(np.count_nonzero(placed))
+
+        self.free_tree.rebuild([capacity - occupied for capacity, occupied
+                                in zip(self._capacity, self._occupied)])
+        self.wall_version += 1
+
+    def as_array(self) -> np.ndarray:
+        """拼出 (height, width) 的整张网格（拷贝，开销与棋盘大小成正比）"""
+        result = np.zeros((self.height, self.width), dtype=np.uint8)
+        size = self.chunk_size
+        for chunk_id in self._chunks:
+            cy, cx = divmod(chunk_id, self.chunks_x)
+            result[cy * size:(cy + 1) * size, cx * size:(cx + 1) * size] = self.chunk_array(cx, cy)
+        return result
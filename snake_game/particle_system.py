@@ -3,64 +3,134 @@
 """
 
 import pygame
-import random
 import math
-from typing import List, Tuple
+import numpy as np
+from typing import Optional, Tuple
+
+from game_common.sprite_atlas import sprite_atlas
+
+# 透明度量化步长（预渲染精灵按量化后的透明度缓存，图集不再二次量化）
+ALPHA_STEP = 16
 
 class ParticleEffect:
-    """粒子效果系统"""
-    
-    def __init__(self):
-        self.particles = []
-    
+    """粒子效果系统
+
+    粒子以结构数组的形式存放在预分配的NumPy池中（x, y, vx, vy, life,
+    size, color 各占一列），更新和死亡粒子的压缩都是向量化的。
+    池满后新粒子直接丢弃。渲染时从共享精灵图集中取预渲染的圆形精灵，
+    一次 blits 调用批量绘制。
+    """
+
+    def __init__(self, max_particles: int = 4000):
+        self.max_particles = max_particles
+        self.count = 0
+
+        self.x = np.zeros(max_particles, dtype=np.float32)
+        self.y = np.zeros(max_particles, dtype=np.float32)
+        self.vx = np.zeros(max_particles, dtype=np.float32)
+        self.vy = np.zeros(max_particles, dtype=np.float32)
+        self.life = np.zeros(max_particles, dtype=np.float32)
+        self.size = np.zeros(max_particles, dtype=np.float32)
+        self.color = np.zeros((max_particles, 3), dtype=np.uint8)
+
+        self._rng = np.random.default_rng()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _reserve(self, count: int) -> slice:
+        """在池尾预留粒子槽位（超出上限的部分丢弃）"""
+        count = max(0, min(count, self.max_particles - self.count))
+        reserved = slice(self.count, self.count + count)
+        self.count += count
+        return reserved
+
     def add_explosion(self, x: int, y: int, color: Tuple[int, int, int], count: int = 15):
         """添加爆炸效果"""
-        for _ in range(count):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(50, 150)
-            vx = math.cos(angle) * speed
-            vy = math.sin(angle) * speed
-            
-            self.particles.append({
-                'x': x, 'y': y, 'vx': vx, 'vy': vy,
-                'color': color, 'life': 1.0, 'size': random.uniform(2, 6)
-            })
-    
+        s = self._reserve(count)
+        n = s.stop - s.start
+        if not n:
+            return
+
+        angle = self._rng.uniform(0, 2 * math.pi, n)
+        speed = self._rng.uniform(50, 150, n)
+        self.x[s] = x
+        self.y[s] = y
+        self.vx[s] = np.cos(angle) * speed
+        self.vy[s] = np.sin(angle) * speed
+        self.life[s] = 1.0
+        self.size[s] = self._rng.uniform(2, 6, n)
+        self.color[s] = color
+
     def add_trail(self, x: int, y: int, color: Tuple[int, int, int]):
         """添加尾迹效果"""
-        for _ in range(3):
-            vx = random.uniform(-20, 20)
-            vy = random.uniform(-20, 20)
-            
-            self.particles.append({
-                'x': x + random.uniform(-5, 5), 
-                'y': y + random.uniform(-5, 5),
-                'vx': vx, 'vy': vy,
-                'color': color, 'life': 0.5, 'size': random.uniform(1, 3)
-            })
-    
+        s = self._reserve(3)
+        n = s.stop - s.start
+        if not n:
+            return
+
+        self.x[s] = x + self._rng.uniform(-5, 5, n)
+        self.y[s] = y + self._rng.uniform(-5, 5, n)
+        self.vx[s] = self._rng.uniform(-20, 20, n)
+        self.vy[s] = self._rng.uniform(-20, 20, n)
+        self.life[s] = 0.5
+        self.size[s] = self._rng.uniform(1, 3, n)
+        self.color[s] = color
+
     def update(self, dt: float):
         """更新粒子"""
-        for particle in self.particles[:]:
-            particle['x'] += particle['vx'] * dt
-            particle['y'] += particle['vy'] * dt
-            particle['life'] -= dt * 2
-            particle['size'] *= 0.98
-            
-            if particle['life'] <= 0:
-                self.particles.remove(particle)
-    
-    def render(self, screen: pygame.Surface):
-        """渲染粒子"""
-        for particle in self.particles:
-            alpha = max(0, min(255, int(particle['life'] * 255)))
-            color = (*particle['color'], alpha)
-            
-            if alpha > 0:
-                size = max(1, int(particle['size']))
-                pos = (int(particle['x']), int(particle['y']))
-                
-                # 使用临时表面来实现透明度
-                temp_surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-                pygame.draw.circle(temp_surface, color, (size, size), size)
-                screen.blit(temp_surface, (pos[0] - size, pos[1] - size))
+        n = self.count
+        if not n:
+            return
+
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += self.vy[:n] * dt
+        self.life[:n] -= dt * 2
+        self.size[:n] *= 0.98
+
+        # 压缩：把存活粒子移到池的前部
+        alive = self.life[:n] > 0
+        alive_count = int(np.count_nonzero(alive))
+        if alive_count < n:
+            for column in (self.x, self.y, self.vx, self.vy, self.life, self.size, self.color):
+                column[:alive_count] = column[:n][alive]
+            self.count = alive_count
+
+    def clear(self):
+        """清空所有粒子"""
+        self.count = 0
+
+    def bounds(self) -> Optional[pygame.Rect]:
+        """所有粒子的包围矩形（没有粒子时返回None）"""
+        n = self.count
+        if not n:
+            return None
+        radius = np.maximum(1, self.size[:n]) + 1
+        left = int(np.min(self.x[:n] - radius)) - 1
+        top = int(np.min(self.y[:n] - radius)) - 1
+        right = int(np.max(self.x[:n] + radius)) + 1
+        bottom = int(np.max(self.y[:n] + radius)) + 1
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def render(self, screen: pygame.Surface, offset: Tuple[int, int] = (0, 0)):
+        """渲染粒子（offset 为粒子坐标到屏幕坐标的偏移）"""
+        n = self.count
+        if not n:
+            return
+
+        alpha = np.clip((self.life[:n] * 255).astype(np.int32), 0, 255)
+        visible = np.flatnonzero(alpha > 0)
+        if not len(visible):
+            return
+
+        # 透明度向上量化，保证可见粒子不会被量化成全透明
+        alpha = np.minimum(255, -(-alpha[visible] // ALPHA_STEP) * ALPHA_STEP).tolist()
+        radius = np.maximum(1, self.size[visible].astype(np.int32)).tolist()
+        px = (self.x[visible].astype(np.int32) + offset[0]).tolist()
+        py = (self.y[visible].astype(np.int32) + offset[1]).tolist()
+        colors = [tuple(c) for c in self.color[visible].tolist()]
+
+        blits = []
+        for r, color, a, x, y in zip(radius, colors, alpha, px, py):
+            blits.append((sprite_atlas.get('circle', r, color, a, quantize=False), (x - r, y - r)))
+        screen.blits(blits, doreturn=False)
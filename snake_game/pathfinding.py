@@ -0,0 +1,150 @@
+"""
+寻路引擎
+基于占用网格的 BFS / A* 寻路，以及缓存的到目标距离场
+"""
+
+import heapq
+from array import array
+from collections import OrderedDict, deque
+from typing import List, Optional, Tuple
+
+from .occupancy import OccupancyGrid, WALL, BLOCKING
+
+# 距离场中不可达格子的取值
+UNREACHABLE = -1
+
+class PathPlanner:
+    """寻路引擎
+
+    distance_field 只考虑墙壁，按 (目标, wall_version) 缓存，
+    所以只有食物或墙壁移动时才需要重新计算。A* 用它作为启发函数：
+    它是忽略蛇身时的精确距离，可采纳且一致，没有蛇挡路时A*几乎直线展开。
+    """
+
+    def __init__(self, grid: OccupancyGrid, cache_size: int = 8):
+        self.grid = grid
+        self.cache_size = cache_size
+        self._fields = OrderedDict()
+
+    def _neighbors(self, index: int):
+        """四邻域格子下标"""
+        width = self.grid.width
+        x = index % width
+        if index >= width:
+            yield index - width
+        if index + width < len(self.grid.cells):
+            yield index + width
+        if x > 0:
+            yield index - 1
+        if x < width - 1:
+            yield index + 1
+
+    def distance_field(self, target: Tuple[int, int]) -> array:
+        """从目标出发、只绕开墙壁的BFS距离场（带缓存）"""
+        grid = self.grid
+        cached = self._fields.get(target)
+        if cached is not None and cached[0] == grid.wall_version:
+            self._fields.move_to_end(target)
+            return cached[1]
+
+        cells = grid.cells
+        width = grid.width
+        size = len(cells)
+        field = array('i', [UNREACHABLE]) * size
+        start = grid.index(*target)
+        field[start] = 0
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            d = field[i] + 1
+            x = i % width
+            for j in (i - width if i >= width else -1,
+                      i + width if i + width < size else -1,
+                      i - 1 if x > 0 else -1,
+                      i + 1 if x < width - 1 else -1):
+                if j >= 0 and field[j] == UNREACHABLE and not cells[j] & WALL:
+                    field[j] = d
+                    queue.append(j)
+
+        self._fields[target] = (grid.wall_version, field)
+        self._fields.move_to_end(target)
+        while len(self._fields) > self.cache_size:
+            self._fields.popitem(last=False)
+        return field
+
+    def _to_path(self, came_from: dict, goal: int) -> List[Tuple[int, int]]:
+        """根据前驱表还原路径（不含起点）"""
+        width = self.grid.width
+        path = []
+        i = goal
+        while came_from[i] is not None:
+            path.append((i % width, i // width))
+            i = came_from[i]
+        path.reverse()
+        return path
+
+    def bfs(self, start: Tuple[int, int], goal: Tuple[int, int],
+            blocked: int = BLOCKING) -> Optional[List[Tuple[int, int]]]:
+        """BFS最短路径（不含起点），无路可走时返回None"""
+        cells = self.grid.cells
+        s = self.grid.index(*start)
+        g = self.grid.index(*goal)
+        came_from = {s: None}
+        queue = deque([s])
+        while queue:
+            i = queue.popleft()
+            if i == g:
+                return self._to_path(came_from, g)
+            for j in self._neighbors(i):
+                if j not in came_from and (j == g or not cells[j] & blocked):
+                    came_from[j] = i
+                    queue.append(j)
+        return None
+
+    def astar(self, start: Tuple[int, int], goal: Tuple[int, int],
+              blocked: int = BLOCKING) -> Optional[List[Tuple[int, int]]]:
+        """A*最短路径（不含起点），以缓存的距离场为启发函数"""
+        field = self.distance_field(goal)
+        cells = self.grid.cells
+        s = self.grid.index(*start)
+        g = self.grid.index(*goal)
+        if field[s] == UNREACHABLE:
+            return None
+
+        cost = {s: 0}
+        came_from = {s: None}
+        # 同f值时优先扩展更深的节点，减少无谓展开
+        heap = [(field[s], 0, s)]
+        while heap:
+            _, neg_cost, i = heapq.heappop(heap)
+            if i == g:
+                return self._to_path(came_from, g)
+            current = -neg_cost
+            if current > cost[i]:
+                continue
+            for j in self._neighbors(i):
+                if field[j] == UNREACHABLE or (j != g and cells[j] & blocked):
+                    continue
+                new_cost = current + 1
+                if new_cost < cost.get(j, new_cost + 1):
+                    cost[j] = new_cost
+                    came_from[j] = i
+                    heapq.heappush(heap, (new_cost + field[j], -new_cost, j))
+        return None
+
+    def reachable_area(self, start: Tuple[int, int], blocked: int = BLOCKING,
+                       limit: Optional[int] = None) -> int:
+        """从起点可到达的格子数，达到limit后提前返回（用于判断死路）"""
+        cells = self.grid.cells
+        s = self.grid.index(*start)
+        seen = {s}
+        queue = deque([s])
+        while queue:
+            if limit is not None and len(seen) >= limit:
+                return len(seen)
+            i = queue.popleft()
+            for j in self._neighbors(i):
+                if j not in seen and not cells[j] & blocked:
+                    seen.add(j)
+                    queue.append(j)
+        return len(seen)
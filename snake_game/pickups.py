@@ -0,0 +1,103 @@
+"""
+拾取物索引
+按格子索引食物、道具等拾取物，支持常数时间的查找、加入、删除和按区域遍历
+"""
+
+from typing import Any, Dict, Iterator, Optional, Tuple, Type
+
+from .occupancy import CHUNK_SIZE
+
+Cell = Tuple[int, int]
+
+class PickupRegistry:
+    """拾取物索引（空间哈希）
+
+    拾取物是任何带 pos 属性的对象（Food、PowerUp 以及以后新增的类型），
+    每个格子最多一个。_cells 按格子查找；_buckets 把格子按
+    bucket_size×bucket_size 分桶，in_region 只访问与区域相交的桶，
+    渲染视口时开销与视口大小有关，与棋盘上的拾取物总数无关；_kinds
+    按类型分组，of_kind 和 count 不需要扫描其他类型。
+    """
+
+    def __init__(self, bucket_size: int = CHUNK_SIZE):
+        self.bucket_size = bucket_size
+        self._cells: Dict[Cell, Any] = {}
+        self._buckets: Dict[Cell, Dict[Cell, Any]] = {}
+        self._kinds: Dict[Type, Dict[Cell, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def __contains__(self, pos: Cell) -> bool:
+        return pos in self._cells
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(list(self._cells.values()))
+
+    def clear(self):
+        """移除所有拾取物"""
+        self._cells.clear()
+        self._buckets.clear()
+        self._kinds.clear()
+
+    def get(self, pos: Cell) -> Optional[Any]:
+        """格子上的拾取物（没有时返回None）"""
+        return self._cells.get(pos)
+
+    def add(self, pickup: Any):
+        """加入拾取物（格子上已有拾取物时报错）"""
+        pos = pickup.pos
+        if pos in self._cells:
+            raise ValueError(f"格子 {pos} 上已有拾取物")
+        self._cells[pos] = pickup
+        bucket = (pos[0] // self.bucket_size, pos[1] // self.bucket_size)
+        self._buckets.setdefault(bucket, {})[pos] = pickup
+        self._kinds.setdefault(type(pickup), {})[pos] = pickup
+
+    def remove(self, pos: Cell) -> Optional[Any]:
+        """移除并返回格子上的拾取物（没有时返回None）"""
+        pickup = self._cells.pop(pos, None)
+        if pickup is None:
+            return None
+        bucket = (pos[0] // self.bucket_size, pos[1] // self.bucket_size)
+        cells = self._buckets[bucket]
+        del cells[pos]
+        if not cells:
+            del self._buckets[bucket]
+        del self._kinds[type(pickup)][pos]
+        return pickup
+
+    def count(self, kind: Type) -> int:
+        """某类拾取物的个数"""
+        return len(self._kinds.get(kind, ()))
+
+    def of_kind(self, kind: Type) -> Iterator[Any]:
+        """遍历某类拾取物（遍历的是快照，可以边遍历边删除）"""
+        return iter(list(self._kinds.get(kind, {}).values()))
+
+    def in_region(self, x0: int, y0: int, x1: int, y1: int) -> Iterator[Any]:
+        """遍历区域 [x0, x1)×[y0, y1) 内的拾取物"""
+        if x1 <= x0 or y1 <= y0:
+            return
+        size = self.bucket_size
+        bx0, by0 = x0 // size, y0 // size
+        bx1, by1 = (x1 - 1) // size, (y1 - 1) // size
+
+        # 区域覆盖的桶比非空的桶还多时，直接遍历全部拾取物更快
+        if (bx1 - bx0 + 1) * (by1 - by0 + 1) > len(self._buckets):
+            for (x, y), pickup in list(self._cells.items()):
+                if x0 <= x < x1 and y0 <= y < y1:
+                    yield pickup
+            return
+
+        for by in range(by0, by1 + 1):
+            for bx in range(bx0, bx1 + 1):
+                cells = self._buckets.get((bx, by))
+                if not cells:
+                    continue
+                # 完全在区域内的桶不需要逐个判断
+                inside = (bx * size >= x0 and (bx + 1) * size <= x1 and
+                          by * size >= y0 and (by + 1) * size <= y1)
+                for (x, y), pickup in list(cells.items()):
+                    if inside or (x0 <= x < x1 and y0 <= y < y1):
+                        yield pickup
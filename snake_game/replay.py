@@ -0,0 +1,279 @@
+"""
+录像回放
+紧凑的二进制录像格式：记录随机种子、模式、皮肤和按逻辑帧编号的输入事件，
+回放时用同一种子重新模拟，可实时观看、倍速观看或无头全速校验
+"""
+
+import argparse
+import random
+import struct
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from .enums import Direction, GameMode
+from .simulator import SnakeSimulator
+
+# 录像中每个逻辑帧的时长（游戏实时运行时也按这个步长推进模拟）
+TICK_DT = 1.0 / 120
+
+# 单帧最多补的模拟时间（窗口拖动等卡顿后丢弃多余的时间）
+MAX_FRAME_TIME = 0.25
+
+# 文件格式
+MAGIC = b'SNKR'
+VERSION = 1
+HEADER = struct.Struct('<4sBQB16sHHI')   # 魔数、版本、种子、模式、皮肤、宽、高、事件数
+FOOTER = struct.Struct('<III')           # 总帧数、分数、食物数
+
+# 事件编码：0~3 为方向（与 Direction 枚举顺序一致），之后是暂停和继续
+DIRECTIONS = list(Direction)
+MODES = list(GameMode)
+EVENT_PAUSE = len(DIRECTIONS)
+EVENT_RESUME = EVENT_PAUSE + 1
+
+# 回放倍速范围（None 表示无头全速）
+MIN_SPEED = 1
+MAX_SPEED = 64
+
+def _write_varint(out: bytearray, value: int):
+    """写入无符号变长整数"""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """读取无符号变长整数，返回 (值, 新偏移)"""
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("录像数据被截断")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+@dataclass
+class Replay:
+    """一局游戏的录像
+
+    events 是 (帧号, 事件编码) 列表，按帧号升序；帧号为该事件之前
+    已经模拟的逻辑帧数。ticks、score、food_eaten 是录制结束时的结果，
+    回放后用来校验。
+    """
+    seed: int
+    mode: GameMode
+    skin: str
+    width: int
+    height: int
+    events: List[Tuple[int, int]] = field(default_factory=list)
+    ticks: int = 0
+    score: int = 0
+    food_eaten: int = 0
+
+    def to_bytes(self) -> bytes:
+        """编码为二进制（事件帧号按差值存为变长整数）"""
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.seed, MODES.index(self.mode),
+                                    self.skin.encode('utf-8'), self.width, self.height,
+                                    len(self.events)))
+        last_tick = 0
+        for tick, code in self.events:
+            _write_varint(out, tick - last_tick)
+            out.append(code)
+            last_tick = tick
+        out += FOOTER.pack(self.ticks, self.score, self.food_eaten)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Replay':
+        """从二进制解码"""
+        if len(data) < HEADER.size + FOOTER.size:
+            raise ValueError("录像数据被截断")
+        magic, version, seed, mode, skin, width, height, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("不是贪吃蛇录像文件")
+        if version != VERSION:
+            raise ValueError(f"不支持的录像版本: {version}")
+        if mode >= len(MODES):
+            raise ValueError(f"未知的游戏模式编号: {mode}")
+
+        offset = HEADER.size
+        events = []
+        tick = 0
+        for _ in range(count):
+            delta, offset = _read_varint(data, offset)
+            if offset >= len(data):
+                raise ValueError("录像数据被截断")
+            tick += delta
+            events.append((tick, data[offset]))
+            offset += 1
+
+        if len(data) - offset != FOOTER.size:
+            raise ValueError("录像数据长度不正确")
+        ticks, score, food_eaten = FOOTER.unpack_from(data, offset)
+        return cls(seed, MODES[mode], skin.rstrip(b'\0').decode('utf-8'), width, height,
+                   events, ticks, score, food_eaten)
+
+    def save(self, path: str):
+        """保存到文件"""
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'Replay':
+        """从文件读取"""
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+class ReplayRecorder:
+    """录像录制器
+
+    游戏在 reset 时调用 start，处理输入时调用 record，
+    一局结束时调用 finish 得到完整录像。
+    """
+
+    def __init__(self):
+        self.replay = None
+
+    @property
+    def recording(self) -> bool:
+        """是否正在录制"""
+        return self.replay is not None
+
+    def start(self, seed: int, mode: GameMode, skin: str, width: int, height: int):
+        """开始录制新的一局"""
+        self.replay = Replay(seed, mode, skin, width, height)
+
+    def record(self, tick: int, code: int):
+        """记录一个输入事件"""
+        if self.replay is not None:
+            self.replay.events.append((tick, code))
+
+    def record_direction(self, tick: int, direction: Direction):
+        """记录一次方向改变"""
+        self.record(tick, DIRECTIONS.index(direction))
+
+    def finish(self, sim: SnakeSimulator, tick: int) -> Optional[Replay]:
+        """结束录制，写入结果并返回录像（没有在录制时返回None）"""
+        replay = self.replay
+        if replay is None:
+            return None
+        replay.ticks = tick
+        replay.score = sim.score
+        replay.food_eaten = sim.food_eaten
+        self.replay = None
+        return replay
+
+class ReplayPlayer:
+    """录像播放器
+
+    用录像中的种子创建独立的随机数生成器和模拟器，按帧号把输入事件
+    重新喂给模拟器，每帧推进 TICK_DT。speed 为 1~64 时 advance(dt)
+    按真实时间的倍速推进，供画面回放使用；speed 为 None 时只用 run()
+    无头全速模拟。
+    """
+
+    def __init__(self, replay: Replay, speed: Optional[float] = 1):
+        if speed is not None and not MIN_SPEED <= speed <= MAX_SPEED:
+            raise ValueError(f"回放倍速必须在 {MIN_SPEED}~{MAX_SPEED} 之间: {speed}")
+        self.replay = replay
+        self.speed = speed
+        self.sim = SnakeSimulator(replay.width, replay.height, replay.mode,
+                                  rng=random.Random(replay.seed))
+        self.tick = 0
+        self.paused = False
+        self._next_event = 0
+        self._accumulator = 0.0
+
+    @property
+    def finished(self) -> bool:
+        """是否已经播放到录像结尾"""
+        return self.tick >= self.replay.ticks
+
+    def step(self):
+        """应用本帧的输入事件并推进一个逻辑帧"""
+        events = self.replay.events
+        while self._next_event < len(events) and events[self._next_event][0] <= self.tick:
+            code = events[self._next_event][1]
+            if code < len(DIRECTIONS):
+                self.sim.change_direction(DIRECTIONS[code])
+            elif code == EVENT_PAUSE:
+                self.paused = True
+            elif code == EVENT_RESUME:
+                self.paused = False
+            self._next_event += 1
+
+        self.sim.update(TICK_DT)
+        self.tick += 1
+
+    def advance(self, dt: float) -> int:
+        """按倍速推进真实时间 dt，返回推进的逻辑帧数"""
+        if self.speed is None:
+            raise ValueError("无头模式请使用 run()")
+        self._accumulator += min(dt, MAX_FRAME_TIME) * self.speed
+        steps = 0
+        while self._accumulator >= TICK_DT and not self.finished:
+            self._accumulator -= TICK_DT
+            self.step()
+            steps += 1
+        return steps
+
+    def run(self) -> bool:
+        """全速模拟到录像结尾，返回结果是否与录像一致"""
+        while not self.finished:
+            self.step()
+        return self.verify()
+
+    def verify(self) -> bool:
+        """检查最终分数和食物数是否与录像一致"""
+        return (self.sim.score == self.replay.score and
+                self.sim.food_eaten == self.replay.food_eaten)
+
+    def describe(self) -> str:
+        """结果对比说明"""
+        return (f"分数 {self.sim.score}/{self.replay.score}，"
+                f"食物 {self.sim.food_eaten}/{self.replay.food_eaten}，"
+                f"帧数 {self.tick}/{self.replay.ticks}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口：观看单个录像，或无头校验一批录像"""
+    parser = argparse.ArgumentParser(description="贪吃蛇录像回放")
+    parser.add_argument('paths', nargs='+', help="录像文件")
+    parser.add_argument('--speed', type=float, default=1, help="回放倍速（1~64）")
+    parser.add_argument('--headless', action='store_true', help="无头全速校验")
+    args = parser.parse_args(argv)
+
+    if not args.headless:
+        from .game_core import UltimateSnakeGame
+        player = ReplayPlayer(Replay.load(args.paths[0]), args.speed)
+        UltimateSnakeGame().watch_replay(player)
+        print(("一致" if player.verify() else "不一致") + "：" + player.describe())
+        return 0 if player.verify() else 1
+
+    failed = 0
+    start = time.perf_counter()
+    total_ticks = 0
+    for path in args.paths:
+        try:
+            player = ReplayPlayer(Replay.load(path), None)
+        except (OSError, ValueError) as e:
+            print(f"{path}: 无法读取 ({e})")
+            failed += 1
+            continue
+        if not player.run():
+            print(f"{path}: 不一致：{player.describe()}")
+            failed += 1
+        total_ticks += player.tick
+
+    elapsed = time.perf_counter() - start
+    print(f"校验 {len(args.paths)} 个录像，{failed} 个失败，"
+          f"共 {total_ticks} 帧，用时 {elapsed:.2f} 秒")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+定时器调度
+按模拟时间触发的定时事件，每次推进只处理已经到期的事件
+"""
+
+import heapq
+import itertools
+from typing import Callable, List, Tuple
+
+class Timer:
+    """一个定时事件（Scheduler.schedule 的返回值，用于取消或查询剩余时间）"""
+
+    __slots__ = ('due', 'callback', 'args', 'active')
+
+    def __init__(self, due: float, callback: Callable, args: Tuple):
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.active = True
+
+    def remaining(self, now: float) -> float:
+        """距离触发的剩余时间"""
+        return max(0.0, self.due - now)
+
+class Scheduler:
+    """定时器调度器（最小堆）
+
+    定时事件按 (到期时间, 登记序号) 放在最小堆中，序号保证同时到期的
+    事件按登记顺序触发，回放结果因此是确定的。run(now) 从堆顶依次弹出
+    due < now 的事件并调用回调；没有到期事件时只比较一次堆顶，开销与
+    登记的定时器数量无关。取消只做标记，弹出时跳过，被取消的定时器
+    占到一半以上时就地重建一次堆。
+
+    时间由调用方传入（模拟器的游戏时间）。游戏暂停时不推进模拟，
+    定时器也就一起暂停，不会像按真实时间计时那样在暂停期间过期。
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self._heap: List[Tuple[float, int, Timer]] = []
+        self._counter = itertools.count()
+        self._cancelled = 0
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._cancelled
+
+    def clear(self):
+        """取消所有定时器并把时间归零"""
+        for _, _, timer in self._heap:
+            timer.active = False
+        self._heap.clear()
+        self._cancelled = 0
+        self.now = 0.0
+
+    def schedule(self, delay: float, callback: Callable, *args) -> Timer:
+        """登记 delay 秒后触发的事件（delay 为 0 时在下一次 run 触发）"""
+        return self.schedule_at(self.now + delay, callback, *args)
+
+    def schedule_at(self, due: float, callback: Callable, *args) -> Timer:
+        """登记在时间 due 之后触发的事件"""
+        timer = Timer(due, callback, args)
+        heapq.heappush(self._heap, (due, next(self._counter), timer))
+        return timer
+
+    def cancel(self, timer: Timer):
+        """取消定时器（已触发或已取消时什么也不做）"""
+        if timer is None or not timer.active:
+            return
+        timer.active = False
+        self._cancelled += 1
+        if self._cancelled > 32 and self._cancelled * 2 > len(self._heap):
+            # 就地修改，run 中的回调取消定时器时 run 持有的仍是同一个列表
+            self._heap[:] = [entry for entry in self._heap if entry[2].active]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def run(self, now: float) -> int:
+        """推进到时间 now，触发所有到期的事件，返回触发的个数"""
+        self.now = now
+        heap = self._heap
+        fired = 0
+        while heap and heap[0][0] < now:
+            timer = heapq.heappop(heap)[2]
+            if not timer.active:
+                self._cancelled -= 1
+                continue
+            timer.active = False
+            timer.callback(*timer.args)
+            fired += 1
+        return fired
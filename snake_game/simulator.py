@@ -0,0 +1,579 @@
+"""
+贪吃蛇模拟核心
+只保存游戏状态，不依赖显示、字体和音频，可在无头环境中高速步进
+"""
+
+import random
+from collections import deque
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .enums import Direction, GameMode, PowerUpType, PowerUp, Food
+from .ai_snake import AISnake
+from .hamiltonian import HamiltonianStrategy
+from .pathfinding import PathPlanner
+from .flow_field import FlowField
+from .snake_body import SnakeBody
+from .occupancy import OccupancyGrid, ChunkedOccupancyGrid, SNAKE, AI_SNAKE, WALL, FOOD, POWERUP
+from .maze import MazeGenerator, ALGORITHMS
+from .scheduler import Scheduler
+from .pickups import PickupRegistry
+
+# 道具颜色
+POWERUP_COLORS = {
+    PowerUpType.SPEED_BOOST: (255, 100, 100),
+    PowerUpType.SLOW_MOTION: (100, 100, 255),
+    PowerUpType.INVINCIBLE: (255, 255, 0),
+    PowerUpType.DOUBLE_SCORE: (255, 165, 0),
+    PowerUpType.SHRINK: (255, 0, 255),
+    PowerUpType.TELEPORT: (0, 255, 255),
+    PowerUpType.FREEZE: (200, 200, 255)
+}
+
+# 各模式的最高速度（每秒移动格数），极速模式不受显示刷新率限制
+MAX_SPEED = {
+    GameMode.SPEED: 60
+}
+DEFAULT_MAX_SPEED = 25
+
+# 超过这个格子数的棋盘使用分块占用网格
+LARGE_BOARD_CELLS = 128 * 128
+
+# 迷宫库大小：每种算法只使用这么多个种子，重开迷宫模式时基本都能命中缓存
+MAZE_LIBRARY_SIZE = 32
+# 大棋盘的迷宫第一次生成要几秒，库更小，几局之后就全部进入磁盘缓存
+LARGE_MAZE_LIBRARY_SIZE = 4
+
+# 道具：最多同时存在的个数、尝试生成的间隔和每次尝试的概率
+MAX_POWERUPS = 3
+POWERUP_SPAWN_INTERVAL = 10.0
+POWERUP_SPAWN_CHANCE = 0.3
+
+# 计分规则：每个食物得 FOOD_SCORE×等级分，每吃 FOODS_PER_LEVEL 个升一级
+FOOD_SCORE = 10
+FOODS_PER_LEVEL = 5
+
+# AI蛇吃一个食物增长的段数（吃到的那一步尾巴不动）
+AI_FOOD_GROWTH = 1
+
+# AI蛇的可选策略（None 为默认的A*寻路，多条AI蛇时共享流场）
+AI_STRATEGIES = (None, 'hamiltonian')
+
+# 盛宴模式：食物占空格的比例和上限、补充食物的间隔
+FEAST_DENSITY = 0.2
+FEAST_MAX_FOOD = 4000
+FEAST_REFILL_INTERVAL = 0.25
+
+# 生存成就需要存活的时间（秒）
+SURVIVOR_TIME = 300.0
+
+# 累加器比较的容差（避免浮点误差让到期的移动推迟一帧）
+TIME_EPSILON = 1e-9
+
+class SnakeSimulator:
+    """贪吃蛇模拟器
+
+    随机数生成器可注入，便于按种子复现。道具效果到期、道具消失、道具
+    生成尝试和生存成就都登记在按游戏时间推进的定时器调度器中，每次
+    update 只处理到期的事件；暂停时不调用 update，计时也随之暂停。
+    渲染层通过 events 获取吃食物、拾取道具、死亡等事件来播放音效和
+    粒子效果。powerups 为 False 时不生成道具（压力测试和基准测试用）。
+
+    移动使用固定步长调度：update(dt) 把时间累加到累加器里，到期几次
+    就移动几次（每次 1/speed 秒），单次调用最多补 max_catch_up 次，
+    积压的时间直接丢弃。逻辑频率因此与显示刷新率无关；move_alpha
+    给出距离下一次移动的进度，供渲染层插值。
+
+    盛宴模式同时有大量食物，保存在 food_mask（(height, width) 布尔数组）
+    中而不是 food_pos，定时按批补充：一次从空闲格子中向量化选取一批，
+    不逐个采样。
+
+    大棋盘（超过 LARGE_BOARD_CELLS 格）使用分块占用网格，每步的开销
+    只与变化的格子有关；墙壁只保存在网格中，walls 集合为空。
+    AI寻路需要整张网格，所以对战模式不支持大棋盘。ai_strategy 为
+    'hamiltonian' 时AI蛇改用哈密顿回路策略（棋盘宽高不能都是奇数）。
+    """
+
+    def __init__(self, grid_width: int = 40, grid_height: int = 26,
+                 game_mode: GameMode = GameMode.CLASSIC,
+                 rng: Optional[random.Random] = None,
+                 ai_count: int = 1, ai_speed: float = 60,
+                 max_catch_up: int = 8, maze_cache: Optional[str] = 'maze_cache',
+                 powerups: bool = True, ai_strategy: Optional[str] = None):
+        if ai_strategy not in AI_STRATEGIES:
+            raise ValueError(f"未知的AI策略: {ai_strategy}")
+        self.GRID_WIDTH = grid_width
+        self.GRID_HEIGHT = grid_height
+        self.game_mode = game_mode
+        self.ai_count = ai_count
+        self.ai_speed = ai_speed
+        self.ai_strategy = ai_strategy
+        self.max_catch_up = max_catch_up
+        self.powerups_enabled = powerups
+        self.rng = rng if rng is not None else random.Random()
+        self.timers = Scheduler()
+        self.pickups = PickupRegistry()
+
+        # 事件队列（有上限，无人消费时不会无限增长）
+        self.events = deque(maxlen=256)
+
+        # 占用网格和寻路引擎
+        self.large_board = grid_width * grid_height > LARGE_BOARD_CELLS
+        if self.large_board:
+            self.grid = ChunkedOccupancyGrid(grid_width, grid_height)
+        else:
+            self.grid = OccupancyGrid(grid_width, grid_height)
+        self.planner = PathPlanner(self.grid)
+        self.flow_field = FlowField(self.grid)
+        self.maze = MazeGenerator(grid_width, grid_height, cache_dir=maze_cache)
+        self.maze_key = None
+        self.walls = set()
+        self.reset()
+
+    def reset(self):
+        """重置模拟状态"""
+        if self.large_board and self.game_mode == GameMode.BATTLE:
+            raise ValueError("对战模式不支持大棋盘")
+        self.grid.clear()
+        self.timers.clear()
+        self.pickups.clear()
+
+        # 蛇的初始化
+        center_x = self.GRID_WIDTH // 2
+        center_y = self.GRID_HEIGHT // 2
+        self.snake_body = SnakeBody([(center_x, center_y)])
+        self.snake_direction = Direction.RIGHT
+        self.grow_pending = 0
+        self.previous_tail = None
+        self.grid.add(center_x, center_y, SNAKE)
+
+        # AI蛇（对战模式）
+        self.ai_snakes = []
+        if self.game_mode == GameMode.BATTLE:
+            self.spawn_ai_snakes(self.ai_count, (center_x, center_y + 5))
+
+        # 迷宫模式的墙壁（先于食物生成，避免食物落在墙上）
+        self.walls = set()
+        self.maze_key = None
+        if self.game_mode == GameMode.MAZE:
+            self.generate_maze()
+
+        # 食物和道具（盛宴模式的食物在 food_mask 中）
+        self.food_pos = None
+        self.food_mask = None
+        self.food_count = 0
+        self.board_full = False
+        if self.game_mode == GameMode.FEAST:
+            self.food_mask = np.zeros((self.GRID_HEIGHT, self.GRID_WIDTH), dtype=bool)
+        else:
+            self.place_food()
+        self.powerup_timers = {}  # 道具位置 -> 消失定时器
+        self.active_effects = {}  # 效果类型 -> 到期定时器
+
+        # 游戏参数
+        self.score = 0
+        self.max_speed = MAX_SPEED.get(self.game_mode, DEFAULT_MAX_SPEED)
+        self.speed_step = 3 if self.game_mode == GameMode.SPEED else 1
+        self.base_speed = 10 if self.game_mode == GameMode.SPEED else 5
+        self.speed = self.base_speed
+        self.level = 1
+        self.food_eaten = 0
+        self.alive = True
+
+        # 时间管理
+        self.game_time = 0
+        self.tick_count = 0
+        self.move_accumulator = 0.0
+        self.ai_accumulator = 0.0
+        if self.powerups_enabled:
+            self.timers.schedule(POWERUP_SPAWN_INTERVAL, self.try_spawn_powerup)
+        self.timers.schedule(SURVIVOR_TIME, self.events.append, ('survived', None))
+        if self.food_mask is not None:
+            self.refill_food()
+
+        # 特殊效果
+        self.invincible = False
+        self.frozen = False
+
+        self.events.clear()
+
+    def spawn_ai_snakes(self, count: int, first_pos: Tuple[int, int]):
+        """生成AI蛇：第一条在固定位置（小棋盘上超出边界时随机放置），其余随机放在空闲格子"""
+        for i in range(count):
+            pos = first_pos if i == 0 and self.grid.in_bounds(*first_pos) else self.grid.sample_free(self.rng)
+            if pos is None or not self.grid.is_free(*pos):
+                continue
+            self.ai_snakes.append(AISnake(pos, self.grid, self.planner, self.create_ai_strategy()))
+            self.grid.add(*pos, AI_SNAKE)
+
+    def create_ai_strategy(self):
+        """按 ai_strategy 创建AI蛇的策略（默认寻路时返回None）"""
+        if self.ai_strategy == 'hamiltonian':
+            return HamiltonianStrategy(self.grid, growth=AI_FOOD_GROWTH)
+        return None
+
+    @property
+    def powerups(self):
+        """棋盘上的道具列表"""
+        return list(self.pickups.of_kind(PowerUp))
+
+    def drain_events(self):
+        """取出并清空待处理的事件"""
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+    def change_direction(self, direction: Direction) -> bool:
+        """改变方向（不允许直接掉头）"""
+        dx, dy = self.snake_direction.value
+        if direction.value == (-dx, -dy):
+            return False
+        self.snake_direction = direction
+        return True
+
+    def generate_food(self) -> Optional[Tuple[int, int]]:
+        """在空闲格子中均匀选取食物位置，棋盘已满时返回None"""
+        return self.grid.sample_free(self.rng)
+
+    def place_food(self):
+        """移除旧食物并放置新食物，棋盘已满时报告并结束游戏"""
+        if self.food_pos is not None:
+            self.pickups.remove(self.food_pos)
+            self.grid.remove(*self.food_pos, FOOD)
+        self.food_pos = self.generate_food()
+        if self.food_pos is not None:
+            self.pickups.add(Food(self.food_pos))
+            self.grid.add(*self.food_pos, FOOD)
+        elif not self.board_full:
+            self.board_full = True
+            self.events.append(('board_full', None))
+
+    def refill_food(self):
+        """盛宴模式：把食物补充到目标数量（一次批量放置），然后定时再补"""
+        target = min(FEAST_MAX_FOOD, int((self.grid.free_count + self.food_count) * FEAST_DENSITY))
+        if target > self.food_count:
+            indices = self.grid.claim_free(target - self.food_count, FOOD, self.rng)
+            self.food_mask.reshape(-1)[indices] = True
+            self.food_count += len(indices)
+        self.timers.schedule(FEAST_REFILL_INTERVAL, self.refill_food)
+
+    def take_food(self, pos: Tuple[int, int]):
+        """盛宴模式：移除被吃掉的食物"""
+        self.food_mask[pos[1], pos[0]] = False
+        self.food_count -= 1
+        self.grid.remove(*pos, FOOD)
+
+    def choose_maze(self) -> Tuple[int, str]:
+        """从迷宫库中随机选择 (种子, 算法)"""
+        seed = self.rng.randrange(LARGE_MAZE_LIBRARY_SIZE if self.large_board else MAZE_LIBRARY_SIZE)
+        algorithm = self.rng.choice(ALGORITHMS)
+        return seed, algorithm
+
+    def peek_maze(self) -> Tuple[int, str]:
+        """下一次 reset 将要使用的迷宫（不消耗随机数）
+
+        迷宫模式下 reset 中第一次使用随机数就是选择迷宫，调用方可以先
+        在后台准备好这个迷宫，reset 时就不会因为生成大迷宫而卡住。
+        """
+        state = self.rng.getstate()
+        key = self.choose_maze()
+        self.rng.setstate(state)
+        return key
+
+    def generate_maze(self):
+        """从迷宫库中随机取一个迷宫（所有空格连通，不可达区域已填成墙）"""
+        seed, algorithm = self.choose_maze()
+        self.maze_key = (seed, algorithm)
+
+        # 出生点附近已清空，load_walls 跳过已占用格子只是防御性检查
+        walls = self.maze.get(seed, algorithm)
+        self.grid.load_walls(walls)
+        if not self.large_board:
+            self.walls = self.maze.wall_cells(seed, algorithm)
+
+    def try_spawn_powerup(self):
+        """定时尝试生成道具：按概率生成，没有生成时下一次 update 再试"""
+        if self.rng.random() < POWERUP_SPAWN_CHANCE:
+            self.spawn_powerup()
+            self.timers.schedule(POWERUP_SPAWN_INTERVAL, self.try_spawn_powerup)
+        else:
+            self.timers.schedule(0, self.try_spawn_powerup)
+
+    def spawn_powerup(self):
+        """生成道具"""
+        if self.pickups.count(PowerUp) >= MAX_POWERUPS:
+            return
+
+        # 随机选择道具类型
+        powerup_type = self.rng.choice(list(PowerUpType))
+
+        # 生成位置（没有空闲格子时不生成）
+        pos = self.grid.sample_free(self.rng)
+        if pos is None:
+            return
+
+        powerup = PowerUp(
+            pos=pos,
+            type=powerup_type,
+            color=POWERUP_COLORS[powerup_type],
+            lifetime=15.0  # 15秒后消失
+        )
+        self.pickups.add(powerup)
+        self.grid.add(*pos, POWERUP)
+        self.powerup_timers[pos] = self.timers.schedule(powerup.lifetime, self.despawn_powerup, powerup)
+
+    def despawn_powerup(self, powerup: PowerUp):
+        """道具到时间消失"""
+        del self.powerup_timers[powerup.pos]
+        self.pickups.remove(powerup.pos)
+        self.grid.remove(*powerup.pos, POWERUP)
+
+    def collect_powerup(self, powerup: PowerUp):
+        """拾取道具：应用效果并取消消失定时器"""
+        self.apply_powerup(powerup)
+        self.timers.cancel(self.powerup_timers.pop(powerup.pos))
+        self.pickups.remove(powerup.pos)
+        self.grid.remove(*powerup.pos, POWERUP)
+
+    def apply_powerup(self, powerup: PowerUp):
+        """应用道具效果"""
+        effect_type = powerup.type
+        duration = powerup.effect_duration
+
+        # 重复拾取同类道具时重新计时
+        self.timers.cancel(self.active_effects.get(effect_type))
+        self.active_effects[effect_type] = self.timers.schedule(duration, self.expire_effect, effect_type)
+
+        if effect_type == PowerUpType.SPEED_BOOST:
+            self.speed = min(max(30, self.max_speed), self.base_speed * 2)
+        elif effect_type == PowerUpType.SLOW_MOTION:
+            self.speed = max(3, self.base_speed // 2)
+        elif effect_type == PowerUpType.INVINCIBLE:
+            self.invincible = True
+        elif effect_type == PowerUpType.SHRINK:
+            if len(self.snake_body) > 3:
+                keep = len(self.snake_body) // 2
+                for i in range(keep, len(self.snake_body)):
+                    self.grid.remove(*self.snake_body[i], SNAKE)
+                self.snake_body.shrink_to(keep)
+                self.previous_tail = None
+        elif effect_type == PowerUpType.TELEPORT:
+            # 随机传送蛇头（没有空闲格子时不传送）
+            new_pos = self.grid.sample_free(self.rng)
+            if new_pos is not None:
+                self.grid.remove(*self.snake_body[0], SNAKE)
+                self.snake_body[0] = new_pos
+                self.grid.add(*new_pos, SNAKE)
+        elif effect_type == PowerUpType.FREEZE:
+            self.frozen = True
+
+        self.events.append(('powerup', powerup))
+
+    def expire_effect(self, effect_type: PowerUpType):
+        """道具效果到期"""
+        del self.active_effects[effect_type]
+
+        # 移除效果
+        if effect_type in [PowerUpType.SPEED_BOOST, PowerUpType.SLOW_MOTION]:
+            self.speed = self.base_speed
+        elif effect_type == PowerUpType.INVINCIBLE:
+            self.invincible = False
+        elif effect_type == PowerUpType.FREEZE:
+            self.frozen = False
+
+    def effect_remaining(self, effect_type: PowerUpType) -> float:
+        """道具效果的剩余时间（未生效时为0）"""
+        timer = self.active_effects.get(effect_type)
+        return timer.remaining(self.game_time) if timer is not None else 0.0
+
+    def update(self, dt: float):
+        """按时间推进模拟"""
+        if not self.alive:
+            return
+
+        self.game_time += dt
+
+        # 触发到期的定时事件（效果到期、道具消失、道具生成、生存成就）
+        self.timers.run(self.game_time)
+
+        # 移动蛇（如果没有被冰冻）：到期几次移动几次
+        if self.frozen:
+            self.move_accumulator = 0.0
+        else:
+            self.move_accumulator += dt
+            ticks = 0
+            while self.alive and self.move_accumulator >= 1.0 / self.speed - TIME_EPSILON:
+                if ticks == self.max_catch_up:
+                    # 补帧上限：丢弃积压的时间
+                    self.move_accumulator %= 1.0 / self.speed
+                    break
+                self.move_accumulator -= 1.0 / self.speed
+                self.step()
+                ticks += 1
+
+        # 更新AI蛇（对战模式，按AI自己的频率移动）
+        if self.game_mode == GameMode.BATTLE:
+            self.ai_accumulator += dt
+            ticks = 0
+            while self.alive and self.ai_accumulator >= 1.0 / self.ai_speed - TIME_EPSILON:
+                if ticks == self.max_catch_up:
+                    self.ai_accumulator %= 1.0 / self.ai_speed
+                    break
+                self.ai_accumulator -= 1.0 / self.ai_speed
+                self.update_ai_snake()
+                ticks += 1
+
+    def advance_tick(self):
+        """无头运行：推进恰好一次移动的时间（冰冻时只推进时间）"""
+        self.update(max(0.0, 1.0 / self.speed - self.move_accumulator))
+
+    @property
+    def move_alpha(self) -> float:
+        """距离下一次移动的进度（0~1），用于渲染插值"""
+        if not self.alive or self.frozen:
+            return 1.0
+        return min(1.0, max(0.0, self.move_accumulator * self.speed))
+
+    def step(self):
+        """推进一个逻辑帧：蛇移动一格"""
+        if not self.alive:
+            return
+
+        self.tick_count += 1
+
+        # 计算新头部位置
+        head_x, head_y = self.snake_body[0]
+        dx, dy = self.snake_direction.value
+        new_head = (head_x + dx, head_y + dy)
+
+        # 边界处理
+        if self.game_mode == GameMode.CLASSIC:
+            # 经典模式：穿墙
+            new_head = (new_head[0] % self.GRID_WIDTH, new_head[1] % self.GRID_HEIGHT)
+        else:
+            # 其他模式：撞墙死亡
+            if (new_head[0] < 0 or new_head[0] >= self.GRID_WIDTH or
+                new_head[1] < 0 or new_head[1] >= self.GRID_HEIGHT):
+                if not self.invincible:
+                    self.game_over()
+                    return
+                else:
+                    # 无敌状态下反弹
+                    new_head = (head_x, head_y)
+                    self.snake_direction = Direction((-dx, -dy))
+
+        grid = self.grid
+        cell = grid.get(*new_head)
+
+        # 检查撞到自己（新头部不可能与当前头部重合，除非无敌反弹）
+        if cell & SNAKE and not self.invincible:
+            self.game_over()
+            return
+
+        # 检查撞到墙壁
+        if cell & WALL and not self.invincible:
+            self.game_over()
+            return
+
+        # 添加新头部（吃到食物时尾部不动）
+        self.previous_tail = None
+        self.snake_body.push_front(new_head)
+        grid.add(*new_head, SNAKE)
+        self.events.append(('move', new_head))
+
+        # 检查吃到食物
+        if new_head == self.food_pos:
+            self.eat_food()
+        elif cell & FOOD and self.food_mask is not None:
+            self.take_food(new_head)
+            self.eat_food()
+        else:
+            # 检查吃到道具
+            if cell & POWERUP:
+                self.collect_powerup(self.pickups.get(new_head))
+
+            # 移除尾部（如果没有待生长的段）
+            if self.grow_pending > 0:
+                self.grow_pending -= 1
+                self.previous_tail = None
+            else:
+                self.previous_tail = self.snake_body.pop_back()
+                grid.remove(*self.previous_tail, SNAKE)
+
+    def eat_food(self):
+        """吃到食物"""
+        self.score += FOOD_SCORE * self.level
+
+        # 双倍分数效果
+        if PowerUpType.DOUBLE_SCORE in self.active_effects:
+            self.score += FOOD_SCORE * self.level
+
+        self.food_eaten += 1
+        self.grow_pending += 1
+
+        # 生成新食物（盛宴模式定时批量补充）
+        if self.food_mask is None:
+            self.place_food()
+        elif not self.food_count and not self.grid.free_count:
+            self.board_full = True
+            self.events.append(('board_full', None))
+
+        # 增加速度和等级
+        if self.food_eaten % FOODS_PER_LEVEL == 0:
+            self.level += 1
+            self.base_speed = min(self.max_speed, self.base_speed + self.speed_step)
+            if PowerUpType.SPEED_BOOST not in self.active_effects and PowerUpType.SLOW_MOTION not in self.active_effects:
+                self.speed = self.base_speed
+
+        self.events.append(('eat', self.food_pos or self.snake_body[0]))
+
+        # 棋盘已满：蛇已无处可去，游戏结束
+        if self.board_full:
+            self.game_over()
+
+    def update_ai_snake(self):
+        """更新AI蛇"""
+        # 多条AI蛇共享一个流场，单条AI蛇使用A*寻路
+        use_flow_field = len(self.ai_snakes) > 1
+
+        for ai_snake in self.ai_snakes:
+            if self.food_pos is None:
+                return
+
+            if ai_snake.strategy is not None:
+                new_direction = ai_snake.strategy.next_direction(ai_snake.body, self.food_pos,
+                                                                 ai_snake.direction)
+            elif use_flow_field:
+                self.flow_field.update([self.food_pos])
+                new_direction = self.flow_field.next_direction(ai_snake.body[0])
+            else:
+                # AI：沿A*路径朝食物移动，避开死路
+                new_direction = ai_snake.find_path_to_food(self.food_pos)
+
+            if not new_direction:
+                continue
+            ai_snake.direction = new_direction
+
+            # 移动AI蛇
+            head_x, head_y = ai_snake.body[0]
+            dx, dy = ai_snake.direction.value
+            new_head = (head_x + dx, head_y + dy)
+
+            # 边界检查
+            if (self.grid.in_bounds(*new_head) and
+                not self.grid.has(*new_head, AI_SNAKE | WALL)):
+
+                ai_snake.body.push_front(new_head)
+                self.grid.add(*new_head, AI_SNAKE)
+
+                # 检查AI吃到食物
+                if new_head == self.food_pos:
+                    self.place_food()
+                else:
+                    self.grid.remove(*ai_snake.body.pop_back(), AI_SNAKE)
+
+    def game_over(self):
+        """游戏结束"""
+        self.alive = False
+        self.events.append(('game_over', None))
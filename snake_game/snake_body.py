@@ -0,0 +1,117 @@
+"""
+蛇身环形缓冲区
+"""
+
+from array import array
+from itertools import chain
+from typing import Iterable, Iterator, Tuple
+
+class SnakeBody:
+    """环形缓冲区蛇身
+
+    x、y 坐标分别存放在两个 array('i') 中，用头部下标和长度描述有效区间。
+    头部插入、尾部弹出和截断到 N 段都是 O(1)，迭代顺序为从头到尾。
+    容量不足时按两倍扩容（均摊 O(1)）。
+    """
+
+    __slots__ = ('_xs', '_ys', '_head', '_length', '_capacity')
+
+    def __init__(self, segments: Iterable[Tuple[int, int]] = (), capacity: int = 16):
+        segments = list(segments)
+        capacity = max(1, capacity)
+        while capacity < len(segments):
+            capacity *= 2
+
+        self._capacity = capacity
+        self._xs = array('i', [0]) * capacity
+        self._ys = array('i', [0]) * capacity
+        self._head = 0
+        self._length = len(segments)
+        for i, (x, y) in enumerate(segments):
+            self._xs[i] = x
+            self._ys[i] = y
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __bool__(self) -> bool:
+        return self._length > 0
+
+    def _slot(self, index: int) -> int:
+        """逻辑下标（0为头部，支持负数）转换为缓冲区下标"""
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("snake body index out of range")
+        return (self._head + index) % self._capacity
+
+    def __getitem__(self, index: int) -> Tuple[int, int]:
+        j = self._slot(index)
+        return (self._xs[j], self._ys[j])
+
+    def __setitem__(self, index: int, pos: Tuple[int, int]):
+        j = self._slot(index)
+        self._xs[j], self._ys[j] = pos
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        """从头到尾迭代"""
+        start = self._head
+        end = start + self._length
+        if end <= self._capacity:
+            return zip(self._xs[start:end], self._ys[start:end])
+        end -= self._capacity
+        return chain(zip(self._xs[start:], self._ys[start:]),
+                     zip(self._xs[:end], self._ys[:end]))
+
+    def __contains__(self, pos) -> bool:
+        """线性查找（热路径请使用占用网格）"""
+        return any(segment == pos for segment in self)
+
+    def __repr__(self) -> str:
+        return f"SnakeBody({list(self)!r})"
+
+    @property
+    def head(self) -> Tuple[int, int]:
+        """蛇头位置"""
+        return self[0]
+
+    @property
+    def tail(self) -> Tuple[int, int]:
+        """蛇尾位置"""
+        return self[-1]
+
+    def _grow(self):
+        """容量翻倍，并把有效区间整理到缓冲区开头"""
+        segments = list(self)
+        self._capacity *= 2
+        self._xs = array('i', [0]) * self._capacity
+        self._ys = array('i', [0]) * self._capacity
+        for i, (x, y) in enumerate(segments):
+            self._xs[i] = x
+            self._ys[i] = y
+        self._head = 0
+
+    def push_front(self, pos: Tuple[int, int]):
+        """在头部加入一段"""
+        if self._length == self._capacity:
+            self._grow()
+        self._head = (self._head - 1) % self._capacity
+        self._xs[self._head], self._ys[self._head] = pos
+        self._length += 1
+
+    def pop_back(self) -> Tuple[int, int]:
+        """移除并返回尾部一段"""
+        if not self._length:
+            raise IndexError("pop from empty snake body")
+        self._length -= 1
+        j = (self._head + self._length) % self._capacity
+        return (self._xs[j], self._ys[j])
+
+    def shrink_to(self, length: int):
+        """截断到前 length 段"""
+        self._length = max(0, min(length, self._length))
+
+    def clear(self):
+        """清空蛇身"""
+        self._head = 0
+        self._length = 0
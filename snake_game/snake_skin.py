@@ -5,12 +5,38 @@
 import pygame
 import random
 import math
-from typing import Tuple
+import numpy as np
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from game_common.sprite_atlas import sprite_atlas
+from .enums import Direction
+
+# 动态皮肤的颜色量化步长（每个通道按该步长分桶，图块按桶缓存）
+COLOR_STEP = 8
+
+# 星空皮肤预渲染的星星图块数量
+STAR_VARIANTS = 6
+
+# 蛇头精灵相对朝上的旋转角度
+HEAD_ROTATION = {
+    Direction.UP: 0,
+    Direction.LEFT: 90,
+    Direction.DOWN: 180,
+    Direction.RIGHT: 270
+}
 
 class SnakeSkin:
-    """蛇皮肤系统"""
-    
-    def __init__(self):
+    """蛇皮肤系统
+
+    身体颜色可以用 get_body_colors 一次向量化算出整条蛇的颜色。
+    渲染时所有部件都来自预渲染的精灵：蛇头按方向各一张，身体图块
+    按颜色缓存（动态皮肤的颜色先量化到 COLOR_STEP 的桶里），星空
+    皮肤的星星来自几张预先画好的变体，每段只需一次 blit。
+    皮肤或格子大小变化时精灵缓存整体失效。
+    """
+
+    def __init__(self, max_tiles: int = 2048):
         self.skins = {
             'classic': {
                 'head': (0, 255, 0),
@@ -44,7 +70,18 @@ class SnakeSkin:
             }
         }
         self.current_skin = 'classic'
+
+        # 精灵缓存：身体图块 (颜色, 星星变体) -> 图块，蛇头 方向 -> 精灵
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+        self._heads = {}
+        self._cache_key = None
+        self._rng = np.random.default_rng()
     
+    def is_animated(self) -> bool:
+        """当前皮肤的身体颜色或纹理是否随时间变化"""
+        return self.skins[self.current_skin]['pattern'] in ('rainbow', 'fire', 'ice', 'stars')
+
     def get_body_color(self, segment_index: int, total_segments: int, time: float) -> Tuple[int, int, int]:
         """获取身体段的颜色"""
         skin = self.skins[self.current_skin]
@@ -72,55 +109,174 @@ class SnakeSkin:
         
         else:
             return skin['body'] or (0, 200, 0)
-    
-    def render_segment(self, screen: pygame.Surface, rect: pygame.Rect, 
-                      is_head: bool, segment_index: int, total_segments: int, time: float):
-        """渲染蛇的一段"""
+
+    def get_body_colors(self, total_segments: int, time: float,
+                        indices: Optional[Iterable[int]] = None) -> np.ndarray:
+        """一次算出多段身体的颜色，返回 (N, 3) 的 uint8 数组
+
+        indices 默认为 0..total_segments-1。运算顺序与 get_body_color
+        逐段计算完全相同（彩虹色按 pygame.Color 的HSV换算公式展开），
+        所以结果逐位一致。
+        """
         skin = self.skins[self.current_skin]
-        
+        if indices is None:
+            index = np.arange(total_segments, dtype=np.float64)
+        else:
+            index = np.fromiter(indices, dtype=np.float64)
+        count = len(index)
+
+        if skin['pattern'] == 'rainbow':
+            # 彩虹效果（S=V=100 时 pygame 的 HSV 换算：p=0, q=1-f, t=1-(1-f)）
+            hue = (index / max(1, total_segments) + time * 0.5) % 1.0
+            sector = (hue * 360) / 60
+            hi = np.floor(sector)
+            f = sector - hi
+            q = (1 - f) * 255
+            t = (1 - (1 - f)) * 255
+            v = np.full(count, 255.0)
+            p = np.zeros(count)
+            hi = hi.astype(np.int64) % 6
+            channels = [
+                np.choose(hi, [v, q, p, p, t, v]),
+                np.choose(hi, [t, v, v, q, p, p]),
+                np.choose(hi, [p, p, t, v, v, q])
+            ]
+            return np.stack(channels, axis=1).astype(np.uint8)
+
+        elif skin['pattern'] == 'fire':
+            # 火焰效果
+            intensity = 1.0 - (index / max(1, total_segments))
+            r = 255 * intensity
+            g = 100 * intensity * (0.5 + 0.5 * np.sin(time * 5 + index))
+            return np.stack([r, g, np.zeros(count)], axis=1).astype(np.uint8)
+
+        elif skin['pattern'] == 'ice':
+            # 冰霜效果
+            flicker = 0.8 + 0.2 * np.sin(time * 3 + index * 0.5)
+            base_color = np.array(skin['body'], dtype=np.float64)
+            return (base_color[np.newaxis, :] * flicker[:, np.newaxis]).astype(np.uint8)
+
+        else:
+            colors = np.empty((count, 3), dtype=np.uint8)
+            colors[:] = skin['body'] or (0, 200, 0)
+            return colors
+
+    def _validate_cache(self, size: Tuple[int, int]):
+        """皮肤或格子大小变化时清空精灵缓存"""
+        key = (self.current_skin, size)
+        if key != self._cache_key:
+            self._cache_key = key
+            self._tiles.clear()
+            self._heads.clear()
+
+    def _quantize_colors(self, colors: np.ndarray) -> np.ndarray:
+        """动态皮肤的颜色量化到桶中心（静态皮肤只有一种颜色，保持原样）"""
+        if self.skins[self.current_skin]['pattern'] not in ('rainbow', 'fire', 'ice'):
+            return colors
+        buckets = colors.astype(np.int32) // COLOR_STEP * COLOR_STEP + COLOR_STEP // 2
+        return np.minimum(buckets, 255).astype(np.uint8)
+
+    def _body_tile(self, size: Tuple[int, int], color: Tuple[int, int, int],
+                   variant: int) -> pygame.Surface:
+        """生成身体图块（发光皮肤的图块四周多出1像素发光边，variant>0 时带一颗星星）"""
+        glow = self.skins[self.current_skin]['pattern'] == 'glow'
+        if glow:
+            tile = pygame.Surface((size[0] + 2, size[1] + 2), pygame.SRCALPHA)
+            pygame.draw.rect(tile, (*color, 80), tile.get_rect(), border_radius=5)
+            body_rect = pygame.Rect(1, 1, size[0], size[1])
+        else:
+            tile = pygame.Surface(size, pygame.SRCALPHA)
+            body_rect = pygame.Rect(0, 0, size[0], size[1])
+        pygame.draw.rect(tile, color, body_rect, border_radius=5)
+
+        if variant:
+            # 星星位置在生成图块时随机决定
+            star_x = body_rect.centerx + random.randint(-size[0]//4, size[0]//4)
+            star_y = body_rect.centery + random.randint(-size[1]//4, size[1]//4)
+            pygame.draw.circle(tile, (255, 255, 255), (star_x, star_y), 1)
+
+        self._tiles[(color, variant)] = tile
+        if len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def _head_sprite(self, size: Tuple[int, int], direction: Direction) -> pygame.Surface:
+        """生成蛇头精灵（先画朝上的蛇头，再按方向旋转）"""
+        skin = self.skins[self.current_skin]
+        color = skin['head']
+        glow = skin['pattern'] == 'glow'
+        margin = 4 if glow else 0
+        sprite = pygame.Surface((size[0] + margin * 2, size[1] + margin * 2), pygame.SRCALPHA)
+        rect = pygame.Rect(margin, margin, size[0], size[1])
+
+        # 头部特效
+        if glow:
+            # 发光效果
+            for i in range(3):
+                glow_rect = rect.inflate(i * 4, i * 4)
+                alpha = 100 - i * 30
+                layer = sprite_atlas.get('rect', glow_rect.size, color, alpha, border_radius=5)
+                sprite.blit(layer, glow_rect.topleft)
+
+        pygame.draw.rect(sprite, color, rect, border_radius=8)
+
+        # 眼睛
+        eye_size = rect.width // 6
+        eye_y = rect.centery - eye_size // 2
+        left_eye = (rect.centerx - rect.width // 4, eye_y)
+        right_eye = (rect.centerx + rect.width // 4, eye_y)
+
+        pygame.draw.circle(sprite, (255, 255, 255), left_eye, eye_size)
+        pygame.draw.circle(sprite, (255, 255, 255), right_eye, eye_size)
+        pygame.draw.circle(sprite, (0, 0, 0), left_eye, eye_size // 2)
+        pygame.draw.circle(sprite, (0, 0, 0), right_eye, eye_size // 2)
+
+        sprite = pygame.transform.rotate(sprite, HEAD_ROTATION[direction])
+        self._heads[direction] = sprite
+        return sprite
+
+    def render_head(self, screen: pygame.Surface, rect: pygame.Rect,
+                    direction: Direction = Direction.UP):
+        """渲染蛇头（眼睛朝向移动方向）"""
+        self._validate_cache(rect.size)
+        sprite = self._heads.get(direction)
+        if sprite is None:
+            sprite = self._head_sprite(rect.size, direction)
+        screen.blit(sprite, sprite.get_rect(center=rect.center))
+
+    def render_body(self, screen: pygame.Surface, rects: List[pygame.Rect],
+                    indices: Iterable[int], total_segments: int, time: float):
+        """批量渲染身体段（rects 与 indices 一一对应，按顺序绘制，每段一次 blit）"""
+        if not rects:
+            return
+        size = rects[0].size
+        self._validate_cache(size)
+        skin = self.skins[self.current_skin]
+        colors = self._quantize_colors(self.get_body_colors(total_segments, time, indices)).tolist()
+
+        # 纹理效果：10%概率显示星星，星星来自预渲染的变体
+        if skin['pattern'] == 'stars':
+            rolls = self._rng.integers(0, STAR_VARIANTS * 10, len(rects))
+            variants = np.where(rolls < STAR_VARIANTS, rolls + 1, 0).tolist()
+        else:
+            variants = [0] * len(rects)
+
+        offset = 1 if skin['pattern'] == 'glow' else 0
+        tiles = self._tiles
+        blits = []
+        for rect, color, variant in zip(rects, colors, variants):
+            key = (tuple(color), variant)
+            tile = tiles.get(key)
+            if tile is None:
+                tile = self._body_tile(size, key[0], variant)
+            blits.append((tile, (rect.x - offset, rect.y - offset)))
+        screen.blits(blits, doreturn=False)
+
+    def render_segment(self, screen: pygame.Surface, rect: pygame.Rect,
+                      is_head: bool, segment_index: int, total_segments: int, time: float,
+                      direction: Direction = Direction.UP):
+        """渲染蛇的一段"""
         if is_head:
-            color = skin['head']
-            # 头部特效
-            if skin['pattern'] == 'glow':
-                # 发光效果
-                for i in range(3):
-                    glow_rect = rect.inflate(i * 4, i * 4)
-                    alpha = 100 - i * 30
-                    temp_surface = pygame.Surface(glow_rect.size, pygame.SRCALPHA)
-                    pygame.draw.rect(temp_surface, (*color, alpha), 
-                                   (0, 0, glow_rect.width, glow_rect.height), border_radius=5)
-                    screen.blit(temp_surface, glow_rect.topleft)
-            
-            pygame.draw.rect(screen, color, rect, border_radius=8)
-            
-            # 眼睛
-            eye_size = rect.width // 6
-            eye_y = rect.centery - eye_size // 2
-            left_eye = (rect.centerx - rect.width // 4, eye_y)
-            right_eye = (rect.centerx + rect.width // 4, eye_y)
-            
-            pygame.draw.circle(screen, (255, 255, 255), left_eye, eye_size)
-            pygame.draw.circle(screen, (255, 255, 255), right_eye, eye_size)
-            pygame.draw.circle(screen, (0, 0, 0), left_eye, eye_size // 2)
-            pygame.draw.circle(screen, (0, 0, 0), right_eye, eye_size // 2)
-            
+            self.render_head(screen, rect, direction)
         else:
-            color = self.get_body_color(segment_index, total_segments, time)
-            
-            # 身体特效
-            if skin['pattern'] == 'glow':
-                # 发光效果
-                glow_rect = rect.inflate(2, 2)
-                temp_surface = pygame.Surface(glow_rect.size, pygame.SRCALPHA)
-                pygame.draw.rect(temp_surface, (*color, 80), 
-                               (0, 0, glow_rect.width, glow_rect.height), border_radius=5)
-                screen.blit(temp_surface, glow_rect.topleft)
-            
-            pygame.draw.rect(screen, color, rect, border_radius=5)
-            
-            # 纹理效果
-            if skin['pattern'] == 'stars':
-                if random.random() < 0.1:  # 10%概率显示星星
-                    star_x = rect.centerx + random.randint(-rect.width//4, rect.width//4)
-                    star_y = rect.centery + random.randint(-rect.height//4, rect.height//4)
-                    pygame.draw.circle(screen, (255, 255, 255), (star_x, star_y), 1)
+            self.render_body(screen, [rect], [segment_index], total_segments, time)
@@ -0,0 +1,274 @@
+"""
+向量化训练环境
+N 块独立的棋盘保存在堆叠的NumPy数组中，一次调用同时推进所有棋盘，
+供在CPU上训练智能体使用
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .enums import Direction, GameMode
+from .occupancy import EMPTY, SNAKE, WALL, FOOD
+from .simulator import FOOD_SCORE, FOODS_PER_LEVEL
+from .maze import MazeGenerator
+
+# 动作编号与 Direction 枚举顺序一致（与录像的方向编码相同）
+DIRECTIONS = list(Direction)
+DX = np.array([d.value[0] for d in DIRECTIONS], dtype=np.int32)
+DY = np.array([d.value[1] for d in DIRECTIONS], dtype=np.int32)
+OPPOSITE = np.array([DIRECTIONS.index(Direction((-d.value[0], -d.value[1]))) for d in DIRECTIONS],
+                    dtype=np.int8)
+
+# 向量环境不支持的模式（对战需要AI蛇，盛宴有多个食物）
+UNSUPPORTED_MODES = (GameMode.BATTLE, GameMode.FEAST)
+
+# 食物拒绝采样的轮数，之后仍未放下食物的棋盘（几乎已满）逐个精确采样
+SAMPLE_ROUNDS = 4
+
+class VectorSnakeEnv:
+    """向量化贪吃蛇环境（Gym 风格）
+
+    规则与 SnakeSimulator 的移动和吃食物一致：经典模式穿墙，其他模式
+    撞墙死亡；撞到自己（包括尚未移走的尾巴）或墙壁死亡；每个食物得
+    FOOD_SCORE×等级分，每吃 FOODS_PER_LEVEL 个升一级；吃到食物的那一步
+    和之后的一步尾巴都不动；棋盘放不下新食物时一局结束。没有道具，
+    对战和盛宴模式不支持。
+
+    状态全部是按棋盘堆叠的数组：occupancy (N, H, W) 是与 OccupancyGrid
+    相同的占用标记，heads (N, 2) 和 food (N, 2) 是 (x, y) 坐标（没有
+    食物时为 -1），directions 是动作编号，scores 是分数。蛇身是每块
+    棋盘一个环形缓冲区（存放平铺的格子下标）加头指针和长度，每步只
+    改动新蛇头和旧蛇尾两个格子。
+
+    step(actions) 同时推进所有棋盘，一局结束的棋盘立即重置，返回的
+    观测已经是新一局的初始状态，结束时的分数和长度放在 info 中。
+    观测是内部数组本身（零拷贝），下一次 step 会原地修改它们，
+    需要保存时请自行复制。
+    """
+
+    def __init__(self, num_envs: int, grid_width: int = 40, grid_height: int = 26,
+                 game_mode: GameMode = GameMode.CLASSIC, seed: Optional[int] = None,
+                 max_steps: Optional[int] = None, death_reward: float = -1.0,
+                 maze_cache: Optional[str] = 'maze_cache'):
+        if game_mode in UNSUPPORTED_MODES:
+            raise ValueError(f"向量环境不支持{game_mode.value}")
+        self.num_envs = num_envs
+        self.width = grid_width
+        self.height = grid_height
+        self.game_mode = game_mode
+        self.max_steps = max_steps
+        self.death_reward = death_reward
+        self.wrap = game_mode == GameMode.CLASSIC
+        self.rng = np.random.default_rng(seed)
+
+        cells = grid_width * grid_height
+        self.cells = cells
+        self._base = np.arange(num_envs, dtype=np.int64) * cells
+        self._start = (grid_height // 2) * grid_width + grid_width // 2
+
+        # 墙壁模板（迷宫模式固定使用迷宫库中的第一个迷宫）
+        self._walls = np.zeros(cells, dtype=np.uint8)
+        if game_mode == GameMode.MAZE:
+            maze = MazeGenerator(grid_width, grid_height, cache_dir=maze_cache)
+            self._walls[maze.get(0, 'backtracker').reshape(-1)] = WALL
+        self._wall_count = int(np.count_nonzero(self._walls))
+
+        # 观测数组
+        self.occupancy = np.zeros((num_envs, grid_height, grid_width), dtype=np.uint8)
+        self.heads = np.zeros((num_envs, 2), dtype=np.int32)
+        self.directions = np.zeros(num_envs, dtype=np.int8)
+        self.food = np.full((num_envs, 2), -1, dtype=np.int32)
+        self.scores = np.zeros(num_envs, dtype=np.int64)
+
+        # 内部状态
+        self._occ = self.occupancy.reshape(-1)
+        self._body = np.zeros((num_envs, cells), dtype=np.int32)
+        self._head_ptr = np.zeros(num_envs, dtype=np.int64)
+        self.lengths = np.zeros(num_envs, dtype=np.int64)
+        self._grow = np.zeros(num_envs, dtype=np.int64)
+        self.levels = np.zeros(num_envs, dtype=np.int64)
+        self.food_eaten = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+
+    @property
+    def observation(self) -> Dict[str, np.ndarray]:
+        """观测（内部数组的零拷贝引用）"""
+        return {
+            'occupancy': self.occupancy,
+            'heads': self.heads,
+            'directions': self.directions,
+            'food': self.food,
+            'scores': self.scores
+        }
+
+    def reset(self, seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """重置所有棋盘，返回观测"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_envs(np.arange(self.num_envs))
+        return self.observation
+
+    def _reset_envs(self, envs: np.ndarray):
+        """重置部分棋盘：蛇在中心向右出发，随机放置食物"""
+        if not len(envs):
+            return
+        flat = self._occ.reshape(self.num_envs, self.cells)
+        flat[envs] = self._walls
+        flat[envs, self._start] = SNAKE
+        self._body[envs, 0] = self._start
+        self._head_ptr[envs] = 0
+        self.lengths[envs] = 1
+        self._grow[envs] = 0
+        self.heads[envs] = (self.width // 2, self.height // 2)
+        self.directions[envs] = DIRECTIONS.index(Direction.RIGHT)
+        self.scores[envs] = 0
+        self.levels[envs] = 1
+        self.food_eaten[envs] = 0
+        self.steps[envs] = 0
+        self._place_food(envs)
+
+    def _place_food(self, envs: np.ndarray) -> np.ndarray:
+        """给每块棋盘在空格中均匀放一个食物，返回已满（放不下）的棋盘"""
+        free = self.cells - self._wall_count - self.lengths[envs]
+        full = envs[free <= 0]
+        self.food[full] = -1
+        pending = envs[free > 0]
+
+        # 拒绝采样：随机取格子，是空格就接受，空格占多数时几轮就能放完
+        for _ in range(SAMPLE_ROUNDS):
+            if not len(pending):
+                break
+            cells = self.rng.integers(0, self.cells, len(pending))
+            ok = self._occ[self._base[pending] + cells] == EMPTY
+            self._put_food(pending[ok], cells[ok])
+            pending = pending[~ok]
+
+        # 剩下的棋盘几乎已满：在空格列表中精确采样
+        for env in pending.tolist():
+            cells = np.flatnonzero(self._occ[self._base[env]:self._base[env] + self.cells] == EMPTY)
+            self._put_food(np.array([env]), cells[self.rng.integers(len(cells))][None])
+        return full
+
+    def _put_food(self, envs: np.ndarray, cells: np.ndarray):
+        """在给定棋盘的给定格子放食物"""
+        self._occ[self._base[envs] + cells] = FOOD
+        self.food[envs, 0] = cells % self.width
+        self.food[envs, 1] = cells // self.width
+
+    def step(self, actions: np.ndarray) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray,
+                                                 np.ndarray, Dict[str, np.ndarray]]:
+        """所有棋盘各走一步
+
+        actions 是 (N,) 的动作编号（Direction 的顺序），直接掉头的动作
+        被忽略。返回 (观测, 奖励, 终止, 截断, info)：奖励是本步得分，
+        死亡时为 death_reward；info 中 final_scores 和 final_lengths
+        是本步结束的棋盘在重置前的分数和长度（未结束的为 0）。
+        """
+        actions = np.asarray(actions, dtype=np.int8)
+        directions = self.directions
+        turn = actions != OPPOSITE[directions]
+        directions[turn] = actions[turn]
+
+        # 新蛇头
+        width, height = self.width, self.height
+        x = self.heads[:, 0] + DX[directions]
+        y = self.heads[:, 1] + DY[directions]
+        if self.wrap:
+            x %= width
+            y %= height
+            dead = np.zeros(self.num_envs, dtype=bool)
+        else:
+            dead = (x < 0) | (x >= width) | (y < 0) | (y >= height)
+            np.clip(x, 0, width - 1, out=x)
+            np.clip(y, 0, height - 1, out=y)
+        cells = y * width + x
+        target = self._base + cells
+
+        # 碰撞（尾巴此时还在原位，撞尾巴也算撞到自己）
+        flags = self._occ[target]
+        dead |= (flags & (SNAKE | WALL)) != 0
+        alive = np.flatnonzero(~dead)
+        ate = alive[(flags[alive] & FOOD) != 0]
+
+        # 蛇头前进一格
+        ptr = (self._head_ptr[alive] + 1) % self.cells
+        self._head_ptr[alive] = ptr
+        self._body[alive, ptr] = cells[alive]
+        self._occ[target[alive]] = SNAKE
+        self.heads[alive, 0] = x[alive]
+        self.heads[alive, 1] = y[alive]
+        self.lengths[alive] += 1
+        self.steps += 1
+
+        # 没吃到食物：有待生长的段就消耗一段，否则移走尾巴
+        moved = alive[(flags[alive] & FOOD) == 0]
+        pending = self._grow[moved] > 0
+        self._grow[moved[pending]] -= 1
+        shrink = moved[~pending]
+        tail_ptr = (self._head_ptr[shrink] - self.lengths[shrink] + 1) % self.cells
+        self._occ[self._base[shrink] + self._body[shrink, tail_ptr]] = EMPTY
+        self.lengths[shrink] -= 1
+
+        # 吃到食物：计分、升级、生长，再放新食物
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        gained = FOOD_SCORE * self.levels[ate]
+        self.scores[ate] += gained
+        rewards[ate] = gained
+        self.food_eaten[ate] += 1
+        self._grow[ate] += 1
+        self.levels[ate] += self.food_eaten[ate] % FOODS_PER_LEVEL == 0
+        full = self._place_food(ate)
+
+        # 结束判定和重置
+        rewards[dead] = self.death_reward
+        terminated = dead
+        terminated[full] = True  # 棋盘已满（蛇填满了所有空格）
+        if self.max_steps is not None:
+            truncated = ~terminated & (self.steps >= self.max_steps)
+        else:
+            truncated = np.zeros(self.num_envs, dtype=bool)
+        done = np.flatnonzero(terminated | truncated)
+
+        final_scores = np.zeros(self.num_envs, dtype=np.int64)
+        final_lengths = np.zeros(self.num_envs, dtype=np.int64)
+        final_scores[done] = self.scores[done]
+        final_lengths[done] = self.lengths[done]
+        self._reset_envs(done)
+
+        info = {'final_scores': final_scores, 'final_lengths': final_lengths}
+        return self.observation, rewards, terminated, truncated, info
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口：随机策略测速"""
+    parser = argparse.ArgumentParser(description="向量化贪吃蛇环境测速")
+    parser.add_argument('--envs', type=int, default=4096, help="棋盘数")
+    parser.add_argument('--steps', type=int, default=1000, help="每块棋盘的步数")
+    parser.add_argument('--width', type=int, default=40)
+    parser.add_argument('--height', type=int, default=26)
+    parser.add_argument('--mode', default='CLASSIC', choices=[mode.name for mode in GameMode
+                                                             if mode not in UNSUPPORTED_MODES])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env = VectorSnakeEnv(args.envs, args.width, args.height, GameMode[args.mode], seed=args.seed)
+    env.reset()
+    actions = np.random.default_rng(args.seed).integers(0, len(DIRECTIONS), (args.steps, args.envs),
+                                                        dtype=np.int8)
+    episodes = 0
+    start = time.perf_counter()
+    for i in range(args.steps):
+        _, _, terminated, truncated, _ = env.step(actions[i])
+        episodes += int(np.count_nonzero(terminated | truncated))
+    elapsed = time.perf_counter() - start
+
+    total = args.envs * args.steps
+    print(f"{args.envs} 块棋盘 × {args.steps} 步，共 {total} 步，{episodes} 局结束，"
+          f"用时 {elapsed:.2f} 秒，每秒 {total / elapsed:,.0f} 步")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
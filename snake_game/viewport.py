@@ -0,0 +1,123 @@
+"""
+视口
+大棋盘的摄像机、可见区域裁剪和分块背景表面缓存
+"""
+
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterator, Tuple
+
+import pygame
+
+class Camera:
+    """跟随蛇头的摄像机
+
+    x、y 是视口左上角在棋盘像素坐标中的位置，始终夹在棋盘范围内
+    （棋盘比视口小的方向上居中）。
+    """
+
+    def __init__(self, view_size: Tuple[int, int], board_size: Tuple[int, int]):
+        self.view_width, self.view_height = view_size
+        self.board_width, self.board_height = board_size
+        self.x = 0
+        self.y = 0
+
+    def _clamp(self, value: int, view: int, board: int) -> int:
+        """把视口坐标夹在棋盘范围内"""
+        if board <= view:
+            return -((view - board) // 2)
+        return max(0, min(value, board - view))
+
+    def follow(self, center: Tuple[int, int]):
+        """让视口中心对准给定的棋盘像素坐标"""
+        self.x = self._clamp(center[0] - self.view_width // 2, self.view_width, self.board_width)
+        self.y = self._clamp(center[1] - self.view_height // 2, self.view_height, self.board_height)
+
+    @property
+    def offset(self) -> Tuple[int, int]:
+        """棋盘像素坐标到屏幕坐标的偏移"""
+        return (-self.x, -self.y)
+
+    def visible_cells(self, grid_size: int, margin: int = 1) -> Tuple[int, int, int, int]:
+        """视口内的格子范围 (x0, y0, x1, y1)，右下不含，四周多留 margin 格"""
+        columns = self.board_width // grid_size
+        rows = self.board_height // grid_size
+        x0 = max(0, self.x // grid_size - margin)
+        y0 = max(0, self.y // grid_size - margin)
+        x1 = min(columns, (self.x + self.view_width) // grid_size + 1 + margin)
+        y1 = min(rows, (self.y + self.view_height) // grid_size + 1 + margin)
+        return x0, y0, x1, y1
+
+    def visible_chunks(self, chunk_pixels: int, margin: int = 0) -> Iterator[Tuple[int, int]]:
+        """与视口相交的块坐标，四周多留 margin 块"""
+        columns = -(-self.board_width // chunk_pixels)
+        rows = -(-self.board_height // chunk_pixels)
+        x0 = max(0, self.x // chunk_pixels - margin)
+        y0 = max(0, self.y // chunk_pixels - margin)
+        x1 = min(columns, (self.x + self.view_width - 1) // chunk_pixels + 1 + margin)
+        y1 = min(rows, (self.y + self.view_height - 1) // chunk_pixels + 1 + margin)
+        for cy in range(y0, y1):
+            for cx in range(x0, x1):
+                yield cx, cy
+
+class ChunkSurfaceCache:
+    """分块背景表面缓存
+
+    每块背景由 render_chunk(cx, cy) 绘制成一张表面，按最近使用淘汰，
+    最多保留 max_chunks 张。key 变化（墙壁、模式或格子大小变化）时
+    清空全部缓存。prefetch 用于在视口外一圈提前绘制，每帧限量，
+    摄像机移动到新区域时不会集中绘制造成卡顿。
+    """
+
+    def __init__(self, render_chunk: Callable[[int, int], pygame.Surface], max_chunks: int = 48):
+        self.render_chunk = render_chunk
+        self.max_chunks = max_chunks
+        self.key = None
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def validate(self, key: Hashable):
+        """key 变化时清空缓存"""
+        if key != self.key:
+            self._surfaces.clear()
+            self.key = key
+
+    def clear(self):
+        """清空缓存"""
+        self._surfaces.clear()
+        self.key = None
+
+    def get(self, cx: int, cy: int) -> pygame.Surface:
+        """取得一块的背景表面（没有时立即绘制）"""
+        surface = self._surfaces.get((cx, cy))
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end((cx, cy))
+            return surface
+
+        self.misses += 1
+        surface = self.render_chunk(cx, cy)
+        self._store((cx, cy), surface)
+        return surface
+
+    def prefetch(self, chunks: Iterator[Tuple[int, int]], budget: int = 2) -> int:
+        """提前绘制尚未缓存的块，最多 budget 块，返回绘制的块数"""
+        drawn = 0
+        for chunk in chunks:
+            if drawn >= budget:
+                break
+            if chunk in self._surfaces:
+                continue
+            self._store(chunk, self.render_chunk(*chunk))
+            drawn += 1
+        return drawn
+
+    def _store(self, chunk: Tuple[int, int], surface: pygame.Surface):
+        """加入缓存并淘汰最久未使用的表面"""
+        self._surfaces[chunk] = surface
+        self._surfaces.move_to_end(chunk)
+        while len(self._surfaces) > self.max_chunks:
+            self._surfaces.popitem(last=False)